@@ -0,0 +1,1064 @@
+import io
+import os
+import time
+import sys
+import random
+import tempfile
+import contextlib
+import tracemalloc
+from array import array
+import xml.dom.minidom
+import xml.etree.ElementTree as ET
+from lexer import Lexer, Token
+from parser import SLRParser, PARSE_ENGINES
+from incremental import IncrementalParser, IncrementalAnalyzer
+from lowering import lower, count_nodes
+from parsetrace import ParseTracer, TRACE_OFF
+from parallelparse import parse_parallel, split_top_level_decls
+from parallelanalysis import analyze_parallel
+from parsergen import load_generated_parser
+from syntaxtree import SyntaxTreeArena, NO_NODE
+from xmlwriter import write_syntax_tree_xml, write_token_stream_xml
+from xmlreader import iter_token_stream_xml, iter_syntax_tree_leaves_xml
+from binformat import SyntaxTreeReader, write_syntax_tree_binary, write_token_stream_binary
+from translate import translate_condition
+from treewalk import preorder
+from semantic import SymbolTable, SemanticError, TypeCheckError, analyze_syntax_tree, GLOBAL_HOPS
+from syntaxdirected import SinglePassChecker, check_single_pass
+from symbolindex import SymbolIndex
+
+'''
+===========================================================================================
+Benchmarks for the compiler phases. Run with: python benchmark.py
+===========================================================================================
+'''
+
+# Statement templates cycled through when generating the main algorithm
+STATEMENT_TEMPLATES = [
+    "V_x = add ( V_x , 1 ) ;",
+    "print V_x ;",
+    "V_y < input ;",
+    "if eq ( V_x , 1 ) then begin skip ; end else begin halt ; end ;",
+    "V_z = F_f0 ( V_x , 1 , 2 ) ;",
+    "V_z = mul ( sqrt ( V_y ) , sub ( V_x , 2 ) ) ;",
+]
+
+FUNCTION_TEMPLATE = """num F_f{index} ( V_a , V_b , V_c )
+{{
+num V_p , num V_q , num V_r ,
+begin
+  V_p = add ( V_a , V_b ) ;
+  V_q = mul ( V_p , V_c ) ;
+  return V_q ;
+end
+}}
+end
+"""
+
+
+def generate_program(n_statements, n_functions=1):
+    """
+    Generates a valid program with n_statements statements in the main algorithm
+    followed by n_functions function declarations.
+    """
+    lines = ["main", "num V_x , num V_y , num V_z ,", "begin"]
+    for i in range(n_statements):
+        lines.append("  " + STATEMENT_TEMPLATES[i % len(STATEMENT_TEMPLATES)])
+    lines.append("end")
+    for i in range(n_functions):
+        lines.append(FUNCTION_TEMPLATE.format(index=i))
+    return "\n".join(lines) + "\n"
+
+
+def make_parser(text, name="benchmark"):
+    """
+    Lexes the text and returns an SLRParser ready to parse it.
+    """
+    tokens = Lexer(text).tokenize()
+    return SLRParser(None, text, name, tokens=tokens)
+
+
+def time_call(func, repeat=3):
+    """
+    Returns (best time in seconds, result) over several runs of func.
+    """
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+'''
+------------------------------------------------------------------------------------------
+Parse loop: string-keyed dict tables vs SLRParser.parse_tables on integer-coded dense tables
+'''
+def parse_with_dict_tables(parser):
+    """
+    The parse loop as SLRParser.parse ran it before the dense tables: (state, token class)
+    dict lookups, string action tags, a symbol/state stack and a node stack re-sliced on
+    every reduce. Builds the same tree as parser.parse_tables() into parser.syntax_tree and
+    returns the number of reductions.
+    """
+    action_table = parser.action_table
+    goto_table = parser.goto_table
+    grammar_rules = parser.grammar_rules
+    tables = parser.dense_tables
+    nonterminal_ids = tables.nonterminal_ids
+    terminal_ids = {name: n_terminal for n_terminal, name in enumerate(tables.terminals)}
+    n_nonterminals = tables.n_nonterminals
+    prod_is_list = tables.prod_is_list
+    tree = parser.syntax_tree
+    tokens = parser.tokens
+    stack = [0]
+    node_stack = []
+    index = 0
+    reductions = 0
+    while True:
+        token = tokens[index]
+        action = action_table.get((stack[-1], token.type))
+        if action is None:
+            raise SyntaxError(f"Unexpected token {token}")
+        if action[0] == 'shift':
+            stack.append(token.type)
+            stack.append(action[1])
+            node_stack.append(tree.add_leaf(n_nonterminals + terminal_ids[token.type], index))
+            index += 1
+        elif action[0] == 'reduce':
+            production_number = action[1]
+            production = grammar_rules[production_number]
+            rhs_length = len(production.rhs)
+            for _ in range(2 * rhs_length):
+                stack.pop()
+            children = node_stack[-rhs_length:] if rhs_length > 0 else []
+            node_stack = node_stack[:-rhs_length] if rhs_length > 0 else node_stack
+            if prod_is_list[production_number]:
+                inner_node = children[0]
+                tree.append_children(inner_node, children[1:])
+            else:
+                inner_node = tree.add_inner(nonterminal_ids[production.lhs], children)
+            reductions += 1
+            if production.lhs == 'PROG':
+                tree.root = inner_node
+                return reductions
+            node_stack.append(inner_node)
+            state = stack[-1]
+            stack.append(production.lhs)
+            stack.append(goto_table[(state, production.lhs)])
+        else:
+            tree.root = node_stack.pop()
+            return reductions
+
+
+def time_parse(text, tokens, parse, repeat=3):
+    """
+    Returns (best time in seconds, parser) of parse(parser) over fresh parsers for the
+    tokens; building the parser and writing the XML are not timed.
+    """
+    best = None
+    parser = None
+    for _ in range(repeat):
+        parser = SLRParser(None, text, "benchmark", tokens=tokens)
+        parser.accept = lambda: True
+        with contextlib.redirect_stdout(io.StringIO()):
+            elapsed, _ = time_call(lambda: parse(parser), repeat=1)
+        best = elapsed if best is None else min(best, elapsed)
+    return best, parser
+
+
+def benchmark_parse_loop(n_statements=20000):
+    text = generate_program(n_statements, n_functions=n_statements // 100)
+    tokens = Lexer(text).tokenize()
+    reductions = []
+    dict_time, dict_parser = time_parse(text, tokens, lambda parser: reductions.append(parse_with_dict_tables(parser)))
+    dense_time, dense_parser = time_parse(text, tokens, SLRParser.parse_tables)
+    assert same_tree(dict_parser.syntax_tree, dense_parser.syntax_tree)
+
+    print(f"Parse loop ({len(tokens)} tokens, {reductions[0]} reductions, same tree)")
+    print(f"  before: dict tables, symbol/state stack:      {reductions[0] / dict_time:12,.0f} reductions/s")
+    print(f"  after:  SLRParser.parse_tables, dense tables: {reductions[0] / dense_time:12,.0f} reductions/s")
+
+
+def parse_quietly(parser):
+    """
+    Runs parser.parse() with its progress output suppressed and returns the parser.
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        parser.parse()
+    return parser
+
+
+'''
+------------------------------------------------------------------------------------------
+Syntax tree memory: one Python object per node vs the array-backed arena
+'''
+class ObjectNode:
+    """
+    Per-node object with the same fields the parser used to store on InnerNode/LeafNode.
+    """
+    def __init__(self, unid, parent, symb, children, terminal):
+        self.unid = unid
+        self.parent = parent
+        self.symb = symb
+        self.children = children
+        self.terminal = terminal
+
+
+def benchmark_tree_memory(n_statements=5000):
+    parser = parse_quietly(make_parser(generate_program(n_statements, n_functions=n_statements // 100)))
+    tree = parser.syntax_tree
+
+    # Tokens and symbol names are shared by both layouts, so they are not counted
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [ObjectNode(unid, tree.parent[unid], tree.symb(unid), tree.children(unid), tree.terminal(unid))
+               for unid in range(len(tree))]
+    object_bytes = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del objects
+
+    arena_bytes = tree.memory_usage()
+    print(f"Syntax tree memory ({len(tree)} nodes)")
+    print(f"  node objects: {object_bytes / len(tree):8.1f} bytes/node")
+    print(f"  arena:        {arena_bytes / len(tree):8.1f} bytes/node")
+
+
+'''
+------------------------------------------------------------------------------------------
+Syntax tree XML: ElementTree + minidom pretty-printing vs the streaming writer
+'''
+def legacy_syntax_tree_xml(tree, output_file):
+    """
+    The previous writer: builds an ElementTree, serializes it, re-parses it with minidom
+    and pretty-prints that.
+    """
+    syntree = ET.Element('SYNTREE')
+    root_elem = ET.SubElement(syntree, 'ROOT')
+    ET.SubElement(root_elem, 'UNID').text = str(tree.root)
+    ET.SubElement(root_elem, 'SYMB').text = tree.symb(tree.root)
+    children_elem = ET.SubElement(root_elem, 'CHILDREN')
+    for child_id in tree.iter_children(tree.root):
+        ET.SubElement(children_elem, 'ID').text = str(child_id)
+
+    innernodes_elem = ET.SubElement(syntree, 'INNERNODES')
+    for unid in tree.inner_unids():
+        parent = tree.parent[unid]
+        in_elem = ET.SubElement(innernodes_elem, 'IN')
+        ET.SubElement(in_elem, 'PARENT').text = str(parent) if parent != NO_NODE else 'None'
+        ET.SubElement(in_elem, 'UNID').text = str(unid)
+        ET.SubElement(in_elem, 'SYMB').text = tree.symb(unid)
+        children_elem = ET.SubElement(in_elem, 'CHILDREN')
+        for child_id in tree.iter_children(unid):
+            ET.SubElement(children_elem, 'ID').text = str(child_id)
+
+    leafnodes_elem = ET.SubElement(syntree, 'LEAFNODES')
+    for unid in tree.leaf_unids():
+        terminal = tree.terminal(unid)
+        leaf_elem = ET.SubElement(leafnodes_elem, 'LEAF')
+        ET.SubElement(leaf_elem, 'PARENT').text = str(tree.parent[unid])
+        ET.SubElement(leaf_elem, 'UNID').text = str(unid)
+        terminal_elem = ET.SubElement(leaf_elem, 'TERMINAL')
+        ET.SubElement(terminal_elem, 'ID').text = terminal.type
+        ET.SubElement(terminal_elem, 'CLASS').text = terminal.type
+        ET.SubElement(terminal_elem, 'WORD').text = terminal.value
+        ET.SubElement(terminal_elem, 'LINE').text = str(terminal.line_num)
+        ET.SubElement(terminal_elem, 'COL').text = str(terminal.col_num)
+
+    dom = xml.dom.minidom.parseString(ET.tostring(syntree, encoding='utf-8'))
+    with open(output_file, 'w', encoding='utf-8') as f:
+        f.write(dom.toprettyxml(indent="    "))
+
+
+def measure_writer(writer, tree, output_file):
+    """
+    Returns (seconds, peak traced bytes) for writing the tree with the given writer.
+    """
+    start = time.perf_counter()
+    writer(tree, output_file)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    writer(tree, output_file)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def tree_with_nodes(n_nodes):
+    """
+    Parses a generated program with roughly n_nodes syntax tree nodes.
+    """
+    n_statements = max(1, n_nodes // 24)
+    return parse_quietly(make_parser(generate_program(n_statements, n_functions=n_statements // 100))).syntax_tree
+
+
+def benchmark_xml_writers(n_nodes=1000000, legacy_nodes=50000):
+    with tempfile.TemporaryDirectory() as directory:
+        output_file = os.path.join(directory, 'syntaxtree.xml')
+
+        small_tree = tree_with_nodes(legacy_nodes)
+        legacy_time, legacy_peak = measure_writer(legacy_syntax_tree_xml, small_tree, output_file)
+        with open(output_file, 'rb') as f:
+            legacy_output = f.read()
+        small_time, small_peak = measure_writer(write_syntax_tree_xml, small_tree, output_file)
+        with open(output_file, 'rb') as f:
+            assert f.read() == legacy_output, "streaming writer output differs from the legacy writer"
+
+        print(f"Syntax tree XML ({len(small_tree)} nodes)")
+        print(f"  ElementTree + minidom: {legacy_time:7.2f}s, peak {legacy_peak / 2**20:8.1f} MiB")
+        print(f"  streaming writer:      {small_time:7.2f}s, peak {small_peak / 2**20:8.1f} MiB")
+
+        large_tree = tree_with_nodes(n_nodes)
+        large_time, large_peak = measure_writer(write_syntax_tree_xml, large_tree, output_file)
+        print(f"Syntax tree XML ({len(large_tree)} nodes, {os.path.getsize(output_file) / 2**20:.0f} MiB)")
+        print(f"  streaming writer:      {large_time:7.2f}s, peak {large_peak / 2**20:8.1f} MiB")
+
+
+'''
+------------------------------------------------------------------------------------------
+Syntax tree artifacts: XML with ET.parse/findall vs the mmap-based binary reader
+'''
+def load_leaves_from_xml(xml_file):
+    root = ET.parse(xml_file).getroot()
+    return [(leaf.find("UNID").text, leaf.find("TERMINAL/CLASS").text, leaf.find("TERMINAL/WORD").text)
+            for leaf in root.findall(".//LEAF")]
+
+
+def load_leaves_from_binary(binary_file):
+    with SyntaxTreeReader(binary_file) as reader:
+        return [(str(unid), class_name, word) for unid, class_name, word in reader.leaves()]
+
+
+def benchmark_binary_formats(n_nodes=500000):
+    tree = tree_with_nodes(n_nodes)
+    with tempfile.TemporaryDirectory() as directory:
+        xml_file = os.path.join(directory, 'syntaxtree.xml')
+        binary_file = os.path.join(directory, 'syntaxtree.bin')
+        write_syntax_tree_xml(tree, xml_file)
+        write_syntax_tree_binary(tree, binary_file)
+
+        xml_time, xml_leaves = time_call(lambda: load_leaves_from_xml(xml_file), repeat=1)
+        binary_time, binary_leaves = time_call(lambda: load_leaves_from_binary(binary_file))
+        assert xml_leaves == binary_leaves
+
+        print(f"Syntax tree artifacts ({len(tree)} nodes, {len(xml_leaves)} leaves)")
+        print(f"  XML:    {os.path.getsize(xml_file) / 2**20:8.1f} MiB, leaves loaded in {xml_time:6.2f}s")
+        print(f"  binary: {os.path.getsize(binary_file) / 2**20:8.1f} MiB, leaves loaded in {binary_time:6.2f}s")
+
+
+'''
+------------------------------------------------------------------------------------------
+Reparsing after a one-line edit: full parse vs IncrementalParser
+'''
+def same_tree(a, b):
+    return a.root == b.root and all(getattr(a, name) == getattr(b, name)
+                                    for name in ('symbol', 'parent', 'first_child', 'next_sibling', 'token'))
+
+
+def benchmark_incremental_reparse(sizes=(1000, 4000, 16000)):
+    print("Reparse after a one-line edit in the middle of main")
+    for n_statements in sizes:
+        text = generate_program(n_statements, n_functions=n_statements // 100)
+        lines = text.split("\n")
+        edited_line = 3 + n_statements // 2
+        lines[edited_line] = "  print V_y ;"
+        edited_text = "\n".join(lines)
+        edited_tokens = Lexer(edited_text).tokenize()
+
+        incremental = IncrementalParser(text, "benchmark", Lexer(text).tokenize())
+        incremental.parse()
+        previous = (incremental.syntax_tree, incremental.tokens, incremental.shift_states,
+                    incremental.leaf_of_token)
+
+        def reparse():
+            incremental.syntax_tree, incremental.tokens, incremental.shift_states, incremental.leaf_of_token = previous
+            return incremental.reparse(edited_text, edited_tokens)
+
+        full_time, full = time_call(lambda: parse_quietly(SLRParser(None, edited_text, "benchmark", tokens=edited_tokens)))
+        reparse_time, _ = time_call(reparse)
+        assert same_tree(incremental.syntax_tree, full.syntax_tree)
+
+        print(f"  {len(edited_tokens):7} tokens: full parse {full_time * 1000:8.1f} ms, "
+              f"incremental {reparse_time * 1000:8.1f} ms "
+              f"({incremental.reused_nodes / len(incremental.syntax_tree):.1%} of nodes reused)")
+
+
+def benchmark_incremental_analysis(sizes=(100, 400, 1600)):
+    print("Semantic analysis after editing one function: full vs IncrementalAnalyzer")
+    for n_functions in sizes:
+        text = generate_program(200, n_functions=n_functions)
+        edited_text = text.replace("V_q = mul ( V_p , V_c ) ;", "V_q = mul ( V_c , V_p ) ;", 1)
+        tree = parse_quietly(make_parser(text)).syntax_tree
+        edited_tree = parse_quietly(make_parser(edited_text)).syntax_tree
+
+        analyzer = IncrementalAnalyzer()
+        analyzer.analyze(tree)
+        cache = analyzer.cache
+
+        def reanalyze():
+            analyzer.cache = dict(cache)
+            return analyzer.analyze(edited_tree)
+
+        full_time, (symbol_table, bindings) = time_call(lambda: analyze_syntax_tree(edited_tree))
+        incremental_time, (cached_table, cached_bindings) = time_call(reanalyze)
+        assert cached_bindings.declaration == bindings.declaration and cached_bindings.slot == bindings.slot
+        assert [scope.symbols for scope in cached_table.scopes] == [scope.symbols for scope in symbol_table.scopes]
+
+        print(f"  {n_functions:5} functions: full {full_time * 1000:7.1f} ms, "
+              f"incremental {incremental_time * 1000:7.1f} ms "
+              f"({analyzer.checked} checked, {analyzer.reused} reused)")
+
+
+'''
+------------------------------------------------------------------------------------------
+Syntax-directed reduction hooks: hook values and SinglePassChecker vs the semantic analysis
+'''
+FUNCTION_DECL = "num {name} ( V_a , V_b , V_c ) {{ num V_p , {local} V_q , num V_r , begin {algo} end }} end"
+
+SINGLE_PASS_PROGRAMS = {
+    'sibling call': ("main num V_x , begin V_x = F_a ( V_x , 1 , 2 ) ; end "
+                     + FUNCTION_DECL.format(name="F_a", local="num", algo="V_p = F_b ( V_a , 1 , 2 ) ; return V_p ;") + " "
+                     + FUNCTION_DECL.format(name="F_b", local="num", algo="return V_a ;")),
+    'void function': "main begin skip ; end void F_v ( V_a , V_b , V_c ) { num V_p , num V_q , num V_r , begin skip ; end } end",
+    'undeclared variable': "main num V_x , begin V_y = 1 ; end",
+    'duplicate global': "main num V_x , text V_x , begin skip ; end",
+    'undeclared function': "main begin F_h ( 1 , 2 , 3 ) ; end",
+    'duplicate parameter': "main begin skip ; end num F_g ( V_a , V_a , V_c ) { num V_p , num V_q , num V_r , begin skip ; end } end",
+    'duplicate function': ("main begin skip ; end " + FUNCTION_DECL.format(name="F_g", local="num", algo="skip ;") + " "
+                           + FUNCTION_DECL.format(name="F_g", local="num", algo="skip ;")),
+    'sibling scope': ("main begin skip ; end " + FUNCTION_DECL.format(name="F_g", local="num", algo="skip ;") + " "
+                      + FUNCTION_DECL.format(name="F_h", local="num", algo="V_p = V_q ; V_p = V_z ;")),
+    'assignment type': "main text V_y , begin V_y = 1 ; end",
+    'input type': "main text V_y , begin V_y < input ; end",
+    'return type': "main begin skip ; end " + FUNCTION_DECL.format(name="F_g", local="text", algo="return V_q ;"),
+    'operator type': "main text V_y , num V_x , begin V_x = add ( V_x , V_y ) ; end",
+    'return in main': "main text V_y , begin return V_y ; end",
+}
+
+
+def check_reduction_hooks():
+    """
+    Registers hooks by non-terminal and by production and checks the values they receive
+    and synthesize on a real parse, including parser.result.
+    """
+    parser = make_parser("main num V_x , text V_y ,\nbegin\n  V_x = add ( 1 , V_x ) ;\n  print \"hi\" ;\nend\n")
+    constants = []
+
+    def constant(values, production_number, unid):
+        assert parser.syntax_tree.symb(unid) == 'CONST'
+        constants.append((parser.grammar_rules[production_number].rhs[0], values[0].value))
+        return values[0].value
+
+    parser.on_reduce('CONST', constant)
+    parser.on_reduce(parser.production_number('GLOBVARS', ['GLOBVARS', 'VTYP', 'VNAME', 'COMMA']),
+                     lambda values, *_: (values[0] or []) + [(values[1].value, values[2].value)])
+    parser.on_reduce(parser.production_number('OP', ['BINOP', 'LPAREN', 'ARG', 'COMMA', 'ARG', 'RPAREN']),
+                     lambda values, *_: (values[0].value, values[2], values[4].value))
+    operations = []
+    parser.on_reduce('ASSIGN', lambda values, *_: operations.append(values[2]))
+    parser.on_reduce('PROG', lambda values, *_: values[1])
+    parse_quietly(parser)
+    assert constants == [('CONST_N', '1'), ('CONST_T', '"hi"')], constants
+    assert operations == [('add', '1', 'V_x')], operations
+    assert parser.result == [('num', 'V_x'), ('text', 'V_y')], parser.result
+
+
+def check_single_pass_checker():
+    """
+    SinglePassChecker must accept exactly the programs the semantic analysis accepts, and
+    report the analysis' error for the others. Returns the number of programs checked.
+    """
+    example_folder = os.path.join(os.path.dirname(os.path.abspath(__file__)), "inputholder")
+    programs = dict(SINGLE_PASS_PROGRAMS)
+    for name in EXAMPLE_INPUTS:
+        with open(os.path.join(example_folder, name)) as f:
+            programs[name] = f.read()
+    for name, text in programs.items():
+        checker = check_single_pass(text, name)
+        try:
+            analyze_syntax_tree(parse_quietly(make_parser(text)).syntax_tree)
+            detail = None
+        except (SemanticError, TypeCheckError) as e:
+            detail = e.detail
+        assert (detail is None) == (not checker.errors), (name, detail, checker.errors)
+        if name in SINGLE_PASS_PROGRAMS and detail is not None:
+            assert any(message.endswith(detail) for message in checker.errors), (name, detail, checker.errors)
+    return len(programs)
+
+
+def benchmark_reduction_hooks(n_statements=20000):
+    check_reduction_hooks()
+    n_programs = check_single_pass_checker()
+    text = generate_program(n_statements, n_functions=n_statements // 100)
+    tokens = Lexer(text).tokenize()
+
+    def single_pass():
+        parser = SLRParser(None, text, "benchmark", tokens=tokens)
+        checker = SinglePassChecker(parser)
+        parse_quietly(parser)
+        return checker
+
+    def parse_then_analyze():
+        analyze_syntax_tree(parse_quietly(SLRParser(None, text, "benchmark", tokens=tokens)).syntax_tree)
+
+    single_pass_time, checker = time_call(single_pass)
+    assert not checker.errors, checker.errors[:3]
+    two_pass_time, _ = time_call(parse_then_analyze)
+    print(f"Reduction hooks ({len(tokens)} tokens; hooks and checker agree with the analysis on {n_programs} programs)")
+    print(f"  parse with SinglePassChecker hooks: {single_pass_time:.2f}s")
+    print(f"  parse, then semantic analysis:      {two_pass_time:.2f}s")
+
+
+'''
+------------------------------------------------------------------------------------------
+Concrete syntax tree vs lowered AST
+'''
+EXAMPLE_INPUTS = ["example1.txt", "example3.txt", "random_input.txt"]
+
+
+def benchmark_ast_lowering(n_statements=20000):
+    print("Concrete syntax tree vs AST")
+    example_folder = os.path.join(os.path.dirname(os.path.abspath(__file__)), "inputholder")
+    for name in EXAMPLE_INPUTS:
+        with open(os.path.join(example_folder, name)) as f:
+            tree = parse_quietly(make_parser(f.read(), name)).syntax_tree
+        ast_nodes = count_nodes(lower(tree))
+        print(f"  {name:20} {len(tree):7} CST nodes -> {ast_nodes:6} AST nodes ({len(tree) / ast_nodes:.1f}x fewer)")
+
+    tree = parse_quietly(make_parser(generate_program(n_statements, n_functions=n_statements // 100))).syntax_tree
+    lower_time, program = time_call(lambda: lower(tree), repeat=1)
+    ast_nodes = count_nodes(program)
+    print(f"  generated: {len(tree)} CST nodes -> {ast_nodes} AST nodes ({len(tree) / ast_nodes:.1f}x fewer), "
+          f"lowered in {lower_time:.2f}s")
+
+
+'''
+------------------------------------------------------------------------------------------
+Parser stack depth and syntax tree depth for long statement lists
+'''
+class StackDepthTracer(ParseTracer):
+    """
+    Records the deepest parser stack seen at a shift.
+    """
+    def __init__(self):
+        super().__init__(TRACE_OFF)
+        self.parser = None
+        self.max_depth = 0
+
+    def shift(self, state, token_index, token_type, next_state):
+        self.max_depth = max(self.max_depth, len(self.parser.stack))
+
+
+def tree_depth(tree):
+    return 1 + max(depth for _, depth in preorder(tree.root, lambda unid: list(tree.iter_children(unid))))
+
+
+def benchmark_list_depth(sizes=(1000, 50000)):
+    print("Stack and tree depth for long statement lists")
+    for n_statements in sizes:
+        parser = make_parser(generate_program(n_statements, n_functions=n_statements // 100))
+        parser.tracer = tracer = StackDepthTracer()
+        tracer.parser = parser
+        parse_quietly(parser)
+        print(f"  {n_statements:6} statements: max stack depth {tracer.max_depth:4}, "
+              f"tree depth {tree_depth(parser.syntax_tree):4}")
+
+
+'''
+------------------------------------------------------------------------------------------
+Reading XML artifacts: ET.parse of the whole document vs streaming iterparse readers
+'''
+def measure_reader(reader, xml_file):
+    """
+    Returns (seconds, peak traced bytes, records read) for reading the file with reader.
+    """
+    start = time.perf_counter()
+    count = reader(xml_file)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    reader(xml_file)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak, count
+
+
+def benchmark_xml_readers(n_nodes=500000):
+    tree = tree_with_nodes(n_nodes)
+    with tempfile.TemporaryDirectory() as directory:
+        token_file = os.path.join(directory, 'lexer_output.xml')
+        tree_file = os.path.join(directory, 'syntaxtree.xml')
+        write_token_stream_xml(tree.tokens, token_file)
+        write_syntax_tree_xml(tree, tree_file)
+
+        readers = [
+            ("tokens, ET.parse", token_file, lambda path: len(ET.parse(path).getroot().findall('TOK'))),
+            ("tokens, streaming", token_file, lambda path: sum(1 for _ in iter_token_stream_xml(path))),
+            ("leaves, ET.parse", tree_file, lambda path: sum(1 for _ in ET.parse(path).getroot().iter('LEAF'))),
+            ("leaves, streaming", tree_file, lambda path: sum(1 for _ in iter_syntax_tree_leaves_xml(path))),
+        ]
+        print(f"Reading XML artifacts ({os.path.getsize(tree_file) / 2**20:.1f} MiB syntax tree)")
+        for name, path, reader in readers:
+            elapsed, peak, count = measure_reader(reader, path)
+            print(f"  {name:18} {count:8} records in {elapsed:6.2f}s, peak {peak / 2**20:8.1f} MiB")
+
+
+'''
+------------------------------------------------------------------------------------------
+Sequential parse vs parallel parse split at top-level DECLs
+'''
+def benchmark_parallel_parse(n_statements=1000, n_functions=8000):
+    text = generate_program(n_statements, n_functions)
+    tokens = Lexer(text).tokenize()
+    sequential_time, sequential = time_call(
+        lambda: parse_quietly(SLRParser(None, text, "benchmark", tokens=tokens)), repeat=1)
+
+    parallel_time, parallel_parser = time_call(
+        lambda: parse_quietly(SLRParser(None, text, "benchmark", tokens=tokens, engine='parallel')), repeat=1)
+    assert same_tree(parallel_parser.syntax_tree, sequential.syntax_tree)
+
+    # With error recovery, a syntax error in a function is reported like the sequential parser does
+    broken = generate_program(10, 4).replace("return V_q ;", "return ;", 1)
+    diagnostics = []
+    for engine in ('table', 'parallel'):
+        parser = parse_quietly(SLRParser(None, broken, "benchmark", tokens=Lexer(broken).tokenize(),
+                                         error_recovery=True, engine=engine))
+        diagnostics.append([diagnostic.message for diagnostic in parser.diagnostics])
+    assert diagnostics[0] and diagnostics[0] == diagnostics[1], diagnostics
+
+    print(f"Parallel parse ({len(sequential.tokens)} tokens, {len(split_top_level_decls(sequential.tokens))} "
+          f"top-level functions, {os.cpu_count()} CPUs)")
+    print(f"  sequential: {sequential_time:6.2f}s")
+    print(f"  parallel:   {parallel_time:6.2f}s (identical tree)")
+
+
+'''
+------------------------------------------------------------------------------------------
+Table-driven parse loop vs the generated specialized parser
+'''
+def benchmark_generated_parser(n_statements=20000):
+    parser = make_parser(generate_program(n_statements, n_functions=n_statements // 100))
+    parser.accept = lambda: True  # Time the parse loops only, not the XML output
+    tables = parser.dense_tables
+    module = load_generated_parser(tables, parser.grammar_rules)
+    symbol_names = parser.syntax_tree.symbol_names
+
+    def table_driven():
+        parser.syntax_tree = SyntaxTreeArena(symbol_names, parser.tokens)
+        parser.current_token_index = 0
+        return parse_quietly(parser).syntax_tree
+
+    def specialized():
+        tree = SyntaxTreeArena(symbol_names, parser.tokens)
+        tree.root = module.parse(tables.encode_tokens(parser.tokens), tree)
+        return tree
+
+    table_time, table_tree = time_call(table_driven)
+    generated_time, generated_tree = time_call(specialized)
+    assert same_tree(generated_tree, table_tree)
+
+    print(f"Generated parser ({len(parser.tokens)} tokens, {len(table_tree)} nodes, identical trees)")
+    print(f"  table-driven: {len(parser.tokens) / table_time:12,.0f} tokens/s")
+    print(f"  generated:    {len(parser.tokens) / generated_time:12,.0f} tokens/s")
+
+
+'''
+------------------------------------------------------------------------------------------
+Parse engines: deep and wide programs
+'''
+def parse_with_engine(tokens, engine):
+    """
+    Parses tokens with the given engine without writing the XML. Returns (parser, error).
+    """
+    parser = SLRParser(None, "", "benchmark", tokens=tokens, engine=engine)
+    parser.accept = lambda: True
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            parser.parse()
+    except SyntaxError as e:
+        return parser, str(e)
+    return parser, None
+
+
+def nested_program(depth):
+    """
+    A program whose statements nest expressions and branches depth levels deep.
+    """
+    expression = "V_x"
+    for i in range(depth):
+        expression = f"add ( {expression} , {i} )" if i % 2 else f"sqrt ( {expression} )"
+    branch = "skip ;"
+    for _ in range(depth // 4):
+        branch = f"if eq ( V_x , 1 ) then begin {branch} end else begin halt ; end ;"
+    return "\n".join(["main", "num V_x ,", "begin"] + [f"  V_x = {expression} ;", "  " + branch] * 50 + ["end"]) + "\n"
+
+
+def benchmark_parse_engines():
+    print("Parse engines (identical trees)")
+    programs = [("wide", generate_program(20000, n_functions=200)), ("deep", nested_program(100))]
+    for name, text in programs:
+        tokens = Lexer(text).tokenize()
+        times = {}
+        trees = {}
+        for engine in PARSE_ENGINES:
+            times[engine], (parser, error) = time_call(lambda: parse_with_engine(tokens, engine))
+            assert error is None, error
+            trees[engine] = parser.syntax_tree
+        assert all(same_tree(trees[engine], trees['table']) for engine in PARSE_ENGINES)
+        print(f"  {name} ({len(tokens)} tokens): " + ", ".join(
+            f"{engine} {len(tokens) / times[engine]:,.0f} tokens/s" for engine in PARSE_ENGINES))
+
+
+'''
+------------------------------------------------------------------------------------------
+Syntax tree memory: arena vs hash-consed tree
+'''
+def parse_traced(text, **options):
+    """
+    Parses text without writing the XML. Returns (parser, seconds, bytes still allocated
+    by the parser afterwards).
+    """
+    tokens = Lexer(text).tokenize()
+
+    def parse():
+        parser = SLRParser(None, text, "benchmark", tokens=tokens, **options)
+        parser.accept = lambda: True
+        return parse_quietly(parser)
+
+    elapsed, _ = time_call(parse, repeat=1)
+    tracemalloc.start()
+    parser = parse()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return parser, elapsed, size
+
+
+def benchmark_hash_consing(n_statements=20000):
+    print("Hash-consed syntax trees")
+    example_folder = os.path.join(os.path.dirname(os.path.abspath(__file__)), "inputholder")
+    programs = []
+    for name in EXAMPLE_INPUTS:
+        with open(os.path.join(example_folder, name)) as f:
+            programs.append((name, f.read()))
+    programs.append(("generated", generate_program(n_statements, n_functions=n_statements // 100)))
+
+    for name, text in programs:
+        arena_parser, arena_time, arena_size = parse_traced(text)
+        shared_parser, shared_time, shared_size = parse_traced(text, hash_cons=True)
+        shared = shared_parser.syntax_tree
+        assert same_tree(shared.expand(), arena_parser.syntax_tree)
+        parallel_parser = SLRParser(None, text, name, tokens=Lexer(text).tokenize(), hash_cons=True)
+        with contextlib.redirect_stdout(io.StringIO()):
+            parse_parallel(parallel_parser, max_workers=2, min_decls=1)
+        assert same_tree(parallel_parser.syntax_tree.expand(), arena_parser.syntax_tree)
+        print(f"  {name:20} {shared.occurrences:7} nodes -> {len(shared):6} unique, "
+              f"{arena_size / 2**20:7.2f} MiB -> {shared_size / 2**20:6.2f} MiB, "
+              f"parse {arena_time:.2f}s -> {shared_time:.2f}s")
+
+    # A per-subtree computation (subtree sizes) memoized per unique node vs run per node
+    arena = arena_parser.syntax_tree
+    def arena_sizes():
+        sizes = array('i', [1]) * len(arena)
+        pending = [(arena.root, False)]
+        while pending:
+            unid, expanded = pending.pop()
+            if expanded:
+                sizes[unid] += sum(sizes[child] for child in arena.iter_children(unid))
+            else:
+                pending.append((unid, True))
+                pending.extend((child, False) for child in arena.iter_children(unid))
+        return sizes[arena.root]
+
+    per_node_time, total = time_call(arena_sizes)
+    memo_time, sizes = time_call(lambda: shared.fold(lambda node, child_sizes: 1 + sum(child_sizes)))
+    assert total == sizes[shared.root] == shared.occurrences
+    print(f"  subtree sizes: per node {per_node_time * 1000:.1f} ms, per unique subtree {memo_time * 1000:.1f} ms")
+
+
+'''
+------------------------------------------------------------------------------------------
+Deep nesting: every phase walks trees with explicit stacks (treewalk.py)
+'''
+def deep_expression(depth):
+    """
+    A depth-level "sqrt ( add ( ... , 1 ) )" expression in token-separated source form.
+    """
+    parts = []
+    for i in range(depth):
+        parts.append("add ( " if i % 2 else "sqrt ( ")
+    closing = [" , 1 )" if i % 2 else " )" for i in reversed(range(depth))]
+    return "".join(parts) + "V_x" + "".join(closing)
+
+
+def deep_condition(depth):
+    """
+    A depth-level "and(or(...), eq(V_x, 1))" condition as found in the translator input.
+    """
+    return "and(" * depth + "eq(V_x, 1)" + "".join(f", eq(V_y, {i}))" for i in range(depth))
+
+
+def compile_deep_program(depth, directory):
+    """
+    Runs every phase over a depth-level nested expression; returns the CST node count.
+    """
+    text = "\n".join(["main", "num V_x ,", "begin", f"  V_x = {deep_expression(depth)} ;", "end"]) + "\n"
+    parser = parse_quietly(make_parser(text))
+    tree = parser.syntax_tree
+    parser.generate_syntax_tree_xml(os.path.join(directory, "syntaxtree.xml"))
+    # Program, Decl, 3 Vars, Assign, one node per level and a constant per add level
+    assert count_nodes(lower(tree)) == 6 + depth + depth // 2
+
+    analyze_syntax_tree(tree, text.splitlines(), "benchmark")
+    assert translate_condition(deep_condition(depth)).count(" And ") == depth
+    return len(tree)
+
+
+def benchmark_deep_nesting(depths=(25000, 50000, 100000), recursion_limit=200):
+    print(f"Deep nesting (recursion limit {recursion_limit}): lex, parse, XML, lower, type check, translate")
+    limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(recursion_limit)
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            for depth in depths:
+                elapsed, nodes = time_call(lambda: compile_deep_program(depth, directory), repeat=1)
+                print(f"  depth {depth:6}: {nodes:8} CST nodes in {elapsed:.2f}s "
+                      f"({elapsed / depth * 1e6:.1f} us per level)")
+    finally:
+        sys.setrecursionlimit(limit)
+
+
+'''
+------------------------------------------------------------------------------------------
+Semantic analysis over the syntax tree
+'''
+def benchmark_semantic_analysis(sizes=(5000, 20000, 80000)):
+    print("Semantic analysis and type checking (one tree walk)")
+    for n_statements in sizes:
+        text = generate_program(n_statements, n_functions=n_statements // 100)
+        tree = parse_quietly(make_parser(text)).syntax_tree
+        with contextlib.redirect_stdout(io.StringIO()):
+            elapsed, (symbol_table, bindings) = time_call(lambda: analyze_syntax_tree(tree))
+        print(f"  {n_statements:6} statements, {len(tree):8} nodes: {elapsed:.2f}s "
+              f"({len(tree) / elapsed:,.0f} nodes/s)")
+
+    # The bindings only depend on the tree, not on how the source is laid out
+    text = generate_program(200, n_functions=5)
+    one_line = " ".join(text.split())
+    bindings = [analyze_syntax_tree(parse_quietly(make_parser(source)).syntax_tree)[1].declaration
+                for source in (text, one_line)]
+    assert bindings[0] == bindings[1]
+    print("  same bindings for the program reformatted onto one line")
+
+
+def long_functions_program(n_functions, n_statements):
+    """
+    Generates a program whose work is in n_functions functions of n_statements statements each.
+    """
+    body = "\n".join("  " + statement for statement in
+                     ["V_p = add ( V_a , V_x ) ;", "V_q = mul ( V_p , sub ( V_b , V_y ) ) ;",
+                      "if eq ( V_p , V_q ) then begin V_r = V_c ; end else begin V_z = F_f0 ( V_p , 1 , 2 ) ; end ;"]
+                     * (n_statements // 3))
+    functions = [f"num F_f{index} ( V_a , V_b , V_c )\n{{\nnum V_p , num V_q , num V_r ,\nbegin\n{body}\n"
+                 f"  return V_q ;\nend\n}}\nend" for index in range(n_functions)]
+    return "\n".join(["main", "num V_x , num V_y , num V_z ,", "begin", "  skip ;", "end"] + functions) + "\n"
+
+
+def same_analysis(a, b):
+    (table_a, bindings_a), (table_b, bindings_b) = a, b
+    return (table_a.scope_records() == table_b.scope_records()
+            and bindings_a.declaration == bindings_b.declaration
+            and bindings_a.hops == bindings_b.hops and bindings_a.slot == bindings_b.slot)
+
+
+def benchmark_parallel_analysis(n_functions=4000, n_statements=30):
+    tree = parse_quietly(make_parser(long_functions_program(n_functions, n_statements))).syntax_tree
+    sequential_time, sequential = time_call(lambda: analyze_syntax_tree(tree), repeat=1)
+    print(f"Parallel semantic analysis ({len(tree)} nodes, {n_functions} functions, {os.cpu_count()} CPUs)")
+    print(f"  sequential:            {sequential_time:6.2f}s")
+    with tempfile.TemporaryDirectory() as directory:
+        tree_file = os.path.join(directory, "tree.bin")
+        write_syntax_tree_binary(tree, tree_file)
+        for workers in sorted({1, 2, os.cpu_count() or 1}):
+            parallel_time, parallel = time_call(lambda: analyze_parallel(tree, max_workers=workers), repeat=1)
+            assert same_analysis(parallel, sequential)
+            reader = SyntaxTreeReader(tree_file)
+            mapped_time, mapped = time_call(lambda: analyze_parallel(reader, max_workers=workers), repeat=1)
+            assert same_analysis(mapped, sequential)
+            del mapped
+            reader.close()
+            print(f"  {workers:2} workers: arena {parallel_time:6.2f}s, mapped binary tree {mapped_time:6.2f}s (same tables and bindings)")
+
+
+def benchmark_interning(n_statements=20000):
+    print("Identifier interning")
+    text = generate_program(n_statements, n_functions=n_statements // 100)
+    lexer = Lexer(text)
+    tokens = lexer.tokenize()
+    interner = lexer.interner
+    words = {id(token.value): token.value for token in tokens}
+    print(f"  {interner.summary()}")
+    print(f"  token words: {len(words)} string objects, {sum(map(sys.getsizeof, words.values())) / 1024:.1f} KiB "
+          f"(vs {len(tokens)} objects, {sum(sys.getsizeof(token.value) for token in tokens) / 1024:.1f} KiB unshared)")
+
+    # The word IDs survive the binary artifacts, so the analysis resolves names by int ID
+    with tempfile.TemporaryDirectory() as directory:
+        token_file = os.path.join(directory, "tokens.bin")
+        tree_file = os.path.join(directory, "syntaxtree.bin")
+        write_token_stream_binary(tokens, token_file)
+        parser = parse_quietly(SLRParser(token_file, text, "benchmark"))
+        write_syntax_tree_binary(parser.syntax_tree, tree_file)
+        with SyntaxTreeReader(tree_file) as reader:
+            assert list(reader.word_ids) == [token.word_id for token in tokens]
+            elapsed, _ = time_call(lambda: analyze_syntax_tree(reader))
+        print(f"  analysis of the binary syntax tree ({len(parser.syntax_tree)} nodes) by word ID: {elapsed:.2f}s")
+
+
+def nested_functions_program(depth, n_uses):
+    """
+    A program whose only function nests depth levels of SUBFUNCS; the innermost one reads a
+    global and a parameter of the outermost function n_uses times.
+    """
+    body = " ".join([f"V_p{depth - 1} = add ( V_g , V_a0 ) ;"] * n_uses)
+    function = ""
+    for level in reversed(range(depth)):
+        algo = body if level == depth - 1 else "skip ;"
+        function = (f"num F_f{level} ( V_a{level} , V_b{level} , V_c{level} )\n"
+                    f"{{ num V_p{level} , num V_q{level} , num V_r{level} ,\n"
+                    f"begin {algo} end }}\n{function}end\n")
+    return f"main num V_g ,\nbegin skip ; end\n{function}"
+
+
+def benchmark_lexical_addressing(depths=(1, 50, 200), n_uses=5000):
+    print("Variable lookup in nested functions: scope chain vs lexical address")
+    for depth in depths:
+        tree = parse_quietly(make_parser(nested_functions_program(depth, n_uses))).syntax_tree
+        symbol_table, bindings = analyze_syntax_tree(tree)
+        uses = [unid for unid in tree.leaf_unids()
+                if bindings.declaration[unid] not in (NO_NODE, unid) and tree.symb(unid) == 'V']
+        names = [tree.terminal(unid).value for unid in uses]
+        innermost = symbol_table.scopes[-1]
+        chain_time, _ = time_call(lambda: [innermost.lookup(name) for name in names])
+
+        # One frame per active function, as an interpreter would keep them
+        globals = [0] * len(symbol_table.global_scope.symbols)
+        frames = [[0] * len(scope.symbols) for scope in symbol_table.scopes[1:]]
+        hops = bindings.hops
+        slot = bindings.slot
+        address_time, _ = time_call(lambda: [globals[slot[unid]] if hops[unid] == GLOBAL_HOPS
+                                             else frames[-1 - hops[unid]][slot[unid]] for unid in uses])
+        print(f"  depth {depth:3}: {len(uses)} uses, chain {chain_time * 1e9 / len(uses):6.0f} ns/use, "
+              f"address {address_time * 1e9 / len(uses):4.0f} ns/use")
+
+
+def enter_blocks(symbol_table, n_blocks, depth):
+    """
+    Opens and closes n_blocks empty block scopes, nested depth deep, under the current scope.
+    """
+    for _ in range(n_blocks // depth):
+        for level in range(depth):
+            symbol_table.enter_scope(f"Block_Level_{level}")
+        for _ in range(depth):
+            symbol_table.exit_scope()
+
+
+def benchmark_scope_churn(sizes=(10000, 100000, 1000000), depth=8):
+    print("Empty block scopes: per-block cost and table size")
+    for n_blocks in sizes:
+        symbol_table = SymbolTable()
+        symbol_table.declare_symbol("V_x", "var", NO_NODE, data_type="num")
+        elapsed, _ = time_call(lambda: enter_blocks(symbol_table, n_blocks, depth), repeat=1)
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        enter_blocks(symbol_table, n_blocks, depth)
+        retained = tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.stop()
+        print(f"  {n_blocks:8} blocks: {elapsed * 1e9 / n_blocks:5.0f} ns/block, {len(symbol_table.scopes)} scopes, "
+              f"{len(symbol_table.free_blocks)} pooled, {retained} bytes retained")
+
+
+'''
+------------------------------------------------------------------------------------------
+Symbol index queries
+'''
+def check_symbol_index(index, tree, bindings, points):
+    """
+    Compares the index answers at the given positions with a scan over all leaves and scopes.
+    """
+    leaves = {}
+    for unid in tree.leaf_unids():
+        if bindings.declaration[unid] != NO_NODE:
+            terminal = tree.terminal(unid)
+            for col in range(terminal.col_num, terminal.col_num + len(terminal.value)):
+                leaves[terminal.line_num, col] = unid
+    for line, col in points:
+        unid = leaves.get((line, col))
+        definition = index.definition(line, col)
+        assert (definition.unid if definition else NO_NODE) == (bindings.declaration[unid] if unid is not None else NO_NODE)
+        if unid is not None:
+            expected = [leaf for leaf in tree.leaf_unids() if bindings.declaration[leaf] == bindings.declaration[unid]]
+            assert [reference.unid for reference in index.references(line, col)] == expected
+        containing = [scope for scope in index.scopes if scope[2] <= (line, col) <= scope[3]]
+        innermost = max(containing, key=lambda scope: scope[2])[0] if containing else None
+        scope = index.scope_at(line, col)
+        assert (scope.name if scope else None) == innermost
+
+
+def benchmark_symbol_index(n_statements=20000, n_queries=20000):
+    text = generate_program(n_statements, n_functions=n_statements // 20)
+    tree = parse_quietly(make_parser(text)).syntax_tree
+    symbol_table, bindings = analyze_syntax_tree(tree)
+    build_time, index = time_call(lambda: SymbolIndex.build(tree, symbol_table, bindings), repeat=1)
+
+    rng = random.Random(45)
+    n_lines = text.count("\n") + 1
+    points = [(rng.randint(1, n_lines), rng.randint(1, 30)) for _ in range(n_queries)]
+    check_symbol_index(index, tree, bindings, points[:300])
+    print(f"Symbol index: {len(index.occurrence_unid)} occurrences, {len(index.scopes)} scopes, "
+          f"built in {build_time:.2f}s")
+    queries = [
+        ("go-to-definition", lambda: [index.definition(line, col) for line, col in points]),
+        ("find-all-references", lambda: [index.references(line, col) for line, col in points]),
+        ("scope at position", lambda: [index.scope_at(line, col) for line, col in points]),
+        ("definitions by name", lambda: [index.definitions(f"V_{name}") for name in "xyzpqr" * (n_queries // 6)]),
+    ]
+    for name, query in queries:
+        elapsed, answers = time_call(query)
+        results = sum(len(answer) if isinstance(answer, list) else answer is not None for answer in answers)
+        print(f"  {name:20} {elapsed / n_queries * 1e6:7.2f} us/query, {results / n_queries:7.1f} results/query")
+    elapsed, functions = time_call(index.functions)
+    print(f"  {'list functions':20} {elapsed * 1e3:6.2f} ms for {len(functions)} functions")
+
+    with tempfile.TemporaryDirectory() as directory:
+        index_file = os.path.join(directory, 'symbolindex.bin')
+        save_time, _ = time_call(lambda: index.save(index_file), repeat=1)
+        load_time, loaded = time_call(lambda: SymbolIndex.load(index_file), repeat=1)
+        check_symbol_index(loaded, tree, bindings, points[:100])
+        print(f"  saved {os.path.getsize(index_file) / 2**20:.2f} MiB in {save_time:.2f}s, "
+              f"loaded in {load_time:.2f}s")
+
+
+if __name__ == "__main__":
+    benchmark_parse_loop()
+    benchmark_tree_memory()
+    benchmark_xml_writers()
+    benchmark_binary_formats()
+    benchmark_incremental_reparse()
+    benchmark_incremental_analysis()
+    benchmark_reduction_hooks()
+    benchmark_ast_lowering()
+    benchmark_list_depth()
+    benchmark_xml_readers()
+    benchmark_parallel_parse()
+    benchmark_generated_parser()
+    benchmark_parse_engines()
+    benchmark_hash_consing()
+    benchmark_deep_nesting()
+    benchmark_semantic_analysis()
+    benchmark_parallel_analysis()
+    benchmark_interning()
+    benchmark_lexical_addressing()
+    benchmark_scope_churn()
+    benchmark_symbol_index()
@@ -0,0 +1,287 @@
+import mmap
+import struct
+import sys
+from array import array
+from lexer import Token, Interner
+
+'''
+===========================================================================================
+Compact binary formats for the token stream and the syntax tree.
+
+Both artifacts share one versioned layout (all integers little-endian, 4-byte aligned):
+
+    header          magic (4 bytes), version (u16), reserved (u16),
+                    n_strings (u32), n_tokens (u32), n_nodes (u32), root (i32)
+    string offsets  (n_strings + 1) x u32, offsets into the string blob
+    string blob     UTF-8 bytes of every distinct string, padded to 4 bytes
+    token records   n_tokens x (class string ID, word string ID, line, col) as u32
+    node records    n_nodes x (symbol string ID, parent, first child, next sibling,
+                    token index) as i32, -1 meaning "none" (same as the arena)
+
+Token stream files have no node records. Readers mmap the file and index the records
+through memoryviews, so nothing is decoded until it is asked for.
+
+The words are interned first, in token order, so their string IDs are the word IDs the
+lexer's Interner gave them, and the word string ID of a token record is its word_id.
+===========================================================================================
+'''
+
+FORMAT_VERSION = 1
+TOKEN_STREAM_MAGIC = b'RSTK'
+SYNTAX_TREE_MAGIC = b'RSTR'
+
+HEADER = struct.Struct('<4sHHIIIi')
+TOKEN_FIELDS = 4
+NODE_FIELDS = 5
+
+
+class BinaryFormatError(Exception):
+    """Exception raised for unreadable or incompatible binary artifacts."""
+
+
+def is_binary_artifact(path):
+    """
+    Returns True if the file starts with one of the binary artifact magics.
+    """
+    with open(path, 'rb') as f:
+        return f.read(4) in (TOKEN_STREAM_MAGIC, SYNTAX_TREE_MAGIC)
+
+
+'''
+------------------------------------------------------------------------------------------
+Writers
+'''
+class StringTableBuilder(Interner):
+    """
+    Interns strings and assigns them dense IDs in first-seen order.
+    """
+    def encode(self):
+        """
+        Returns (offsets, blob) with the blob padded to a multiple of 4 bytes.
+        """
+        offsets = array('I', [0])
+        chunks = []
+        position = 0
+        for text in self.strings:
+            data = text.encode('utf-8')
+            chunks.append(data)
+            position += len(data)
+            offsets.append(position)
+        blob = b''.join(chunks)
+        blob += b'\0' * (-len(blob) % 4)
+        return offsets, blob
+
+
+def token_records(tokens, strings):
+    word_ids = [strings.intern(token.value) for token in tokens]
+    records = array('I')
+    for token, word_id in zip(tokens, word_ids):
+        records.extend((strings.intern(token.type), word_id, token.line_num, token.col_num))
+    return records
+
+
+def write_artifact(output_path, magic, strings, tokens_records, n_tokens, node_records, n_nodes, root):
+    offsets, blob = strings.encode()
+    for records in (offsets, tokens_records, node_records):
+        if sys.byteorder != 'little':
+            records.byteswap()
+    with open(output_path, 'wb') as f:
+        f.write(HEADER.pack(magic, FORMAT_VERSION, 0, len(strings.strings), n_tokens, n_nodes, root))
+        f.write(offsets.tobytes())
+        f.write(blob)
+        f.write(tokens_records.tobytes())
+        f.write(node_records.tobytes())
+
+
+def write_token_stream_binary(tokens, output_path):
+    """
+    Writes the token stream in the binary format.
+    """
+    strings = StringTableBuilder()
+    records = token_records(tokens, strings)
+    write_artifact(output_path, TOKEN_STREAM_MAGIC, strings, records, len(tokens), array('i'), 0, -1)
+
+
+def write_syntax_tree_binary(tree, output_path):
+    """
+    Writes a SyntaxTreeArena (including the tokens its leaves refer to) in the binary format.
+    """
+    strings = StringTableBuilder()
+    records = token_records(tree.tokens, strings)
+    symbol_ids = [strings.intern(name) for name in tree.symbol_names]
+
+    nodes = array('i', bytes(4 * NODE_FIELDS * len(tree)))
+    nodes[0::NODE_FIELDS] = array('i', [symbol_ids[symbol] for symbol in tree.symbol])
+    nodes[1::NODE_FIELDS] = tree.parent
+    nodes[2::NODE_FIELDS] = tree.first_child
+    nodes[3::NODE_FIELDS] = tree.next_sibling
+    nodes[4::NODE_FIELDS] = tree.token
+    write_artifact(output_path, SYNTAX_TREE_MAGIC, strings, records, len(tree.tokens), nodes, len(tree), tree.root)
+
+
+'''
+------------------------------------------------------------------------------------------
+Readers
+'''
+class StringTable:
+    """
+    Lazily decoded view of the string table of a binary artifact.
+    """
+    def __init__(self, offsets, blob):
+        self.offsets = offsets
+        self.blob = blob
+        self.cache = {}
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, string_id):
+        text = self.cache.get(string_id)
+        if text is None:
+            text = self.cache[string_id] = str(self.blob[self.offsets[string_id]:self.offsets[string_id + 1]], 'utf-8')
+        return text
+
+
+class TokenSequence:
+    """
+    Sequence of Tokens decoded on access from the token records of a binary artifact.
+    """
+    def __init__(self, records, strings):
+        self.records = records
+        self.strings = strings
+
+    def __len__(self):
+        return len(self.records) // TOKEN_FIELDS
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        base = index * TOKEN_FIELDS
+        records = self.records
+        if base < 0 or base >= len(records):
+            raise IndexError(index)
+        return Token(self.strings[records[base]], self.strings[records[base + 1]], records[base + 2], records[base + 3],
+                     records[base + 1])
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def token_class(self, index):
+        return self.strings[self.records[index * TOKEN_FIELDS]]
+
+    def word(self, index):
+        return self.strings[self.records[index * TOKEN_FIELDS + 1]]
+
+    def word_id(self, index):
+        return self.records[index * TOKEN_FIELDS + 1]
+
+
+class BinaryArtifactReader:
+    """
+    Memory-maps a binary artifact and exposes its string table, tokens and (for syntax
+    trees) node arrays without copying them. Use as a context manager or call close().
+    """
+    def __init__(self, path, expected_magic=None):
+        self.file = open(path, 'rb')
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, n_strings, n_tokens, n_nodes, root = HEADER.unpack_from(self.map, 0)
+        if magic not in (TOKEN_STREAM_MAGIC, SYNTAX_TREE_MAGIC) or (expected_magic and magic != expected_magic):
+            self.close()
+            raise BinaryFormatError(f"{path} is not a {expected_magic or 'binary'} artifact.")
+        if version != FORMAT_VERSION:
+            self.close()
+            raise BinaryFormatError(f"{path} has format version {version}, expected {FORMAT_VERSION}.")
+
+        self.magic = magic
+        self.root = root
+        self.views = []  # Every memoryview into the map, released on close()
+        self.view = self.track(memoryview(self.map))
+
+        position = HEADER.size
+        offsets = self.int_view(position, n_strings + 1, 'I')
+        position += 4 * (n_strings + 1)
+        blob_size = offsets[n_strings] + (-offsets[n_strings] % 4)
+        self.strings = StringTable(offsets, self.track(self.view[position:position + offsets[n_strings]]))
+        position += blob_size
+
+        self.tokens = TokenSequence(self.int_view(position, n_tokens * TOKEN_FIELDS, 'I'), self.strings)
+        position += 4 * n_tokens * TOKEN_FIELDS
+
+        nodes = self.int_view(position, n_nodes * NODE_FIELDS, 'i')
+        self.nodes = nodes
+        self.n_nodes = n_nodes
+
+    def int_view(self, position, count, typecode):
+        """
+        Returns a zero-copy view of count 4-byte ints at position (a copy on big-endian hosts).
+        """
+        view = self.track(self.track(self.view[position:position + 4 * count]).cast(typecode))
+        if sys.byteorder != 'little':
+            view = array(typecode, view)
+            view.byteswap()
+        return view
+
+    def track(self, view):
+        if isinstance(view, memoryview):
+            self.views.append(view)
+        return view
+
+    def close(self):
+        for view in reversed(getattr(self, 'views', [])):
+            view.release()
+        self.views = []
+        self.strings = self.tokens = None
+        if getattr(self, 'map', None) is not None:
+            try:
+                self.map.close()
+            except BufferError:
+                pass  # Views handed out to callers are still alive; the map closes with them
+            self.map = None
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class SyntaxTreeReader(BinaryArtifactReader):
+    """
+    Reader for binary syntax trees. Exposes the same attributes as SyntaxTreeArena
+    (symbol, parent, first_child, next_sibling, token, symbol_names, tokens, word_ids, root), so the
+    tree can be walked, or exported with xmlwriter.write_syntax_tree_xml, directly from the map.
+    """
+    def __init__(self, path):
+        super().__init__(path, SYNTAX_TREE_MAGIC)
+        nodes = self.nodes
+        self.symbol = self.track(nodes[0::NODE_FIELDS])
+        self.parent = self.track(nodes[1::NODE_FIELDS])
+        self.first_child = self.track(nodes[2::NODE_FIELDS])
+        self.next_sibling = self.track(nodes[3::NODE_FIELDS])
+        self.token = self.track(nodes[4::NODE_FIELDS])
+        self.symbol_names = self.strings
+        self.word_ids = self.track(self.tokens.records[1::TOKEN_FIELDS])  # Token index -> word ID
+
+    def __len__(self):
+        return self.n_nodes
+
+    def leaves(self):
+        """
+        Yields (unid, token class, word) for every leaf in UNID order.
+        """
+        token = self.token
+        tokens = self.tokens
+        for unid in range(self.n_nodes):
+            index = token[unid]
+            if index != -1:
+                yield unid, tokens.token_class(index), tokens.word(index)
+
+
+def read_token_stream_binary(path):
+    """
+    Loads the token list from a binary token stream file.
+    """
+    with BinaryArtifactReader(path, TOKEN_STREAM_MAGIC) as reader:
+        return list(reader.tokens)
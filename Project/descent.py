@@ -0,0 +1,284 @@
+'''
+===========================================================================================
+Predictive recursive-descent parser.
+
+Apart from COND, every choice in the grammar is decided by the next token: statements start
+with distinct keywords, and FNAME, UNOP and BINOP are single tokens. COND needs two more
+tokens: "BINOP ( ATOMIC" is a SIMPLE, "BINOP ( BINOP" or a UNOP is a COMPOSIT.
+
+DescentParser builds exactly the syntax tree SLRParser builds. The SLR parser creates a leaf
+when it shifts a token and an inner node when it reduces, i.e. in post-order, and creates
+the node of an empty list (GLOBVARS, INSTRUC, FUNCTIONS) when it reduces the empty
+production before the first element. Each method below creates its children first and its
+own node last, and list methods create the list node first and append the elements to it,
+so the UNIDs come out in the same order.
+
+Both parsers stop at the first token that cannot continue a valid program (LL and LR both
+detect errors at the earliest possible token). parse_descent() reports errors, and programs
+nested deeper than the Python recursion limit, through the table-driven parser.
+===========================================================================================
+'''
+
+TYPE_TOKENS = ('NUM_TYPE', 'TEXT_TYPE')
+FUNCTION_TYPE_TOKENS = ('NUM_TYPE', 'VOID')
+CONST_TOKENS = ('CONST_N', 'CONST_T')
+ATOMIC_TOKENS = ('V', 'CONST_N', 'CONST_T')
+UNOP_TOKENS = ('NOT', 'SQRT')
+BINOP_TOKENS = ('OR', 'AND', 'EQ', 'GRT', 'ADD', 'SUB', 'MUL', 'DIV')
+COMMAND_TOKENS = ('SKIP', 'HALT', 'PRINT', 'RETURN', 'V', 'FNAME', 'IF')
+
+
+class DescentError(Exception):
+    """
+    Raised at the first token the descent parser cannot accept.
+    """
+    def __init__(self, position):
+        super().__init__(f"Unexpected token at index {position}")
+        self.position = position
+
+
+class DescentParser:
+    def __init__(self, tables, tree, tokens):
+        self.types = [token.type for token in tokens]
+        self.position = 0
+        self.tree = tree
+        self.add_inner = tree.add_inner
+        self.append_children = tree.append_children
+        self.add_leaf = tree.add_leaf
+        # Leaf symbol ID per token class (see SLRParser.syntax_tree)
+        self.leaf_symbols = {terminal: tables.n_nonterminals + terminal_id
+                             for terminal, terminal_id in tables.terminal_ids.items()}
+        # Symbol ID of every nonterminal as an attribute (self.PROG, self.VNAME, ...)
+        for nonterminal, symbol_id in tables.nonterminal_ids.items():
+            setattr(self, nonterminal, symbol_id)
+
+    def peek(self, offset=0):
+        position = self.position + offset
+        return self.types[position] if position < len(self.types) else None
+
+    def expect(self, token_type):
+        """
+        Consumes the next token, which must be of the given class, and returns its leaf.
+        """
+        position = self.position
+        if self.types[position] != token_type:
+            raise DescentError(position)
+        self.position = position + 1
+        return self.add_leaf(self.leaf_symbols[token_type], position)
+
+    def consume(self):
+        """
+        Consumes the next token (already checked by the caller) and returns its leaf.
+        """
+        position = self.position
+        self.position = position + 1
+        return self.add_leaf(self.leaf_symbols[self.types[position]], position)
+
+    '''
+    ------------------------------------------------------------------------------------------
+    Program structure
+    '''
+    def prog(self):
+        children = [self.expect('MAIN'), self.globvars(), self.algo(), self.functions()]
+        if self.peek() != 'EOF':
+            raise DescentError(self.position)
+        return self.add_inner(self.PROG, children)
+
+    def globvars(self):
+        node = self.add_inner(self.GLOBVARS, ())
+        while self.peek() in TYPE_TOKENS:
+            self.append_children(node, [self.vtyp(), self.vname(), self.expect('COMMA')])
+        return node
+
+    def vtyp(self):
+        if self.peek() not in TYPE_TOKENS:
+            raise DescentError(self.position)
+        return self.add_inner(self.VTYP, [self.consume()])
+
+    def vname(self):
+        return self.add_inner(self.VNAME, [self.expect('V')])
+
+    def algo(self):
+        return self.add_inner(self.ALGO, [self.expect('BEGIN'), self.instruc(), self.expect('END')])
+
+    def instruc(self):
+        node = self.add_inner(self.INSTRUC, ())
+        while self.peek() in COMMAND_TOKENS:
+            self.append_children(node, [self.command(), self.expect('SEMICOLON')])
+        return node
+
+    '''
+    ------------------------------------------------------------------------------------------
+    Commands
+    '''
+    def command(self):
+        token_type = self.peek()
+        if token_type in ('SKIP', 'HALT'):
+            children = [self.consume()]
+        elif token_type in ('PRINT', 'RETURN'):
+            children = [self.consume(), self.atomic()]
+        elif token_type == 'V':
+            children = [self.assign()]
+        elif token_type == 'FNAME':
+            children = [self.call()]
+        else:
+            children = [self.branch()]  # IF, the only remaining command token
+        return self.add_inner(self.COMMAND, children)
+
+    def assign(self):
+        vname = self.vname()
+        token_type = self.peek()
+        if token_type == 'INPUT_OP':
+            children = [vname, self.consume(), self.expect('INPUT')]
+        elif token_type == 'ASSIGN':
+            children = [vname, self.consume(), self.term()]
+        else:
+            raise DescentError(self.position)
+        return self.add_inner(self.ASSIGN, children)
+
+    def call(self):
+        return self.add_inner(self.CALL, [
+            self.fname(), self.expect('LPAREN'),
+            self.atomic(), self.expect('COMMA'),
+            self.atomic(), self.expect('COMMA'),
+            self.atomic(), self.expect('RPAREN')])
+
+    def fname(self):
+        return self.add_inner(self.FNAME, [self.expect('FNAME')])
+
+    def branch(self):
+        return self.add_inner(self.BRANCH, [
+            self.expect('IF'), self.cond(), self.expect('THEN'),
+            self.algo(), self.expect('ELSE'), self.algo()])
+
+    '''
+    ------------------------------------------------------------------------------------------
+    Expressions
+    '''
+    def atomic(self):
+        token_type = self.peek()
+        if token_type == 'V':
+            child = self.vname()
+        elif token_type in CONST_TOKENS:
+            child = self.add_inner(self.CONST, [self.consume()])
+        else:
+            raise DescentError(self.position)
+        return self.add_inner(self.ATOMIC, [child])
+
+    def term(self):
+        token_type = self.peek()
+        if token_type in ATOMIC_TOKENS:
+            child = self.atomic()
+        elif token_type == 'FNAME':
+            child = self.call()
+        else:
+            child = self.op()
+        return self.add_inner(self.TERM, [child])
+
+    def op(self):
+        token_type = self.peek()
+        if token_type in UNOP_TOKENS:
+            children = [self.unop(), self.expect('LPAREN'), self.arg(), self.expect('RPAREN')]
+        elif token_type in BINOP_TOKENS:
+            children = [self.binop(), self.expect('LPAREN'), self.arg(), self.expect('COMMA'),
+                        self.arg(), self.expect('RPAREN')]
+        else:
+            raise DescentError(self.position)
+        return self.add_inner(self.OP, children)
+
+    def arg(self):
+        child = self.atomic() if self.peek() in ATOMIC_TOKENS else self.op()
+        return self.add_inner(self.ARG, [child])
+
+    def cond(self):
+        if self.peek() in BINOP_TOKENS and self.peek(2) in ATOMIC_TOKENS:
+            child = self.simple()
+        else:
+            child = self.composit()
+        return self.add_inner(self.COND, [child])
+
+    def simple(self):
+        return self.add_inner(self.SIMPLE, [
+            self.binop(), self.expect('LPAREN'), self.atomic(), self.expect('COMMA'),
+            self.atomic(), self.expect('RPAREN')])
+
+    def composit(self):
+        if self.peek() in UNOP_TOKENS:
+            children = [self.unop(), self.expect('LPAREN'), self.simple(), self.expect('RPAREN')]
+        else:
+            children = [self.binop(), self.expect('LPAREN'), self.simple(), self.expect('COMMA'),
+                        self.simple(), self.expect('RPAREN')]
+        return self.add_inner(self.COMPOSIT, children)
+
+    def unop(self):
+        if self.peek() not in UNOP_TOKENS:
+            raise DescentError(self.position)
+        return self.add_inner(self.UNOP, [self.consume()])
+
+    def binop(self):
+        if self.peek() not in BINOP_TOKENS:
+            raise DescentError(self.position)
+        return self.add_inner(self.BINOP, [self.consume()])
+
+    '''
+    ------------------------------------------------------------------------------------------
+    Functions
+    '''
+    def functions(self):
+        node = self.add_inner(self.FUNCTIONS, ())
+        while self.peek() in FUNCTION_TYPE_TOKENS:
+            self.append_children(node, [self.decl()])
+        return node
+
+    def decl(self):
+        return self.add_inner(self.DECL, [self.header(), self.body()])
+
+    def header(self):
+        return self.add_inner(self.HEADER, [
+            self.ftyp(), self.fname(), self.expect('LPAREN'),
+            self.vname(), self.expect('COMMA'),
+            self.vname(), self.expect('COMMA'),
+            self.vname(), self.expect('RPAREN')])
+
+    def ftyp(self):
+        if self.peek() not in FUNCTION_TYPE_TOKENS:
+            raise DescentError(self.position)
+        return self.add_inner(self.FTYP, [self.consume()])
+
+    def body(self):
+        return self.add_inner(self.BODY, [
+            self.add_inner(self.PROLOG, [self.expect('LBRACE')]),
+            self.locvars(), self.algo(),
+            self.add_inner(self.EPILOG, [self.expect('RBRACE')]),
+            self.add_inner(self.SUBFUNCS, [self.functions()]),
+            self.expect('END')])
+
+    def locvars(self):
+        children = []
+        for _ in range(3):
+            children += [self.vtyp(), self.vname(), self.expect('COMMA')]
+        return self.add_inner(self.LOCVARS, children)
+
+
+'''
+------------------------------------------------------------------------------------------
+'''
+def parse_descent(parser):
+    """
+    Parses parser.tokens like parser.parse_tables(), with the recursive-descent parser.
+    Returns the same value as parser.parse_tables() and leaves an identical syntax tree in
+    parser.syntax_tree.
+    """
+    if parser.tracer is not None or parser.error_recovery or any(parser.reduction_hooks):
+        return parser.parse_tables()
+    tree = parser.syntax_tree
+    try:
+        root = DescentParser(parser.dense_tables, tree, parser.tokens).prog()
+    except (DescentError, RecursionError, IndexError):
+        # Report the error exactly like the table-driven parser, on a fresh arena
+        parser.syntax_tree = parser.new_syntax_tree()
+        return parser.parse_tables()
+
+    tree.root = root
+    parser.current_token_index = len(parser.tokens) - 1
+    return parser.accept()
@@ -0,0 +1,201 @@
+from array import array
+from syntaxtree import SyntaxTreeArena, NO_NODE
+
+'''
+===========================================================================================
+Hash-consed syntax tree.
+
+HashConsedTree is a drop-in tree builder for the parser (same add_leaf / add_inner /
+append_children interface as SyntaxTreeArena) that stores every structurally identical
+subtree once. A node is identified by its symbol and, for leaves, the token text, for inner
+nodes, the IDs of its children, so every "add ( V_x , 1 )" or "num V_p , num V_q , ..."
+in a program becomes one shared node, whatever its position.
+
+Positions live in a side table: positions holds the token index of every leaf in document
+order (the order the parser shifts them), so walking the shared tree from the root and
+counting leaves recovers the token of every occurrence. expand() rebuilds the exact
+SyntaxTreeArena the parser would have built, UNIDs included.
+
+Node IDs are handed out bottom-up (children before parents), so fold() can compute a value
+per unique subtree in one pass over the IDs, and later phases can memoize per unique
+subtree instead of per occurrence.
+
+List nodes (GLOBVARS, INSTRUC, FUNCTIONS) keep growing after they are created, so they are
+held as open handles (OPEN_LIST_BASE - k) in open_lists until they become the child of
+another node, and only then interned.
+===========================================================================================
+'''
+
+OPEN_LIST_BASE = -2  # Handles of open list nodes are OPEN_LIST_BASE, OPEN_LIST_BASE - 1, ...
+
+
+class HashConsedTree:
+    def __init__(self, symbol_names, tokens, list_symbols=()):
+        self.symbol_names = symbol_names
+        self.tokens = tokens
+        self.list_symbols = frozenset(list_symbols)  # Symbol IDs of flat list nodes
+
+        # One entry per unique node
+        self.symbol = array('i')
+        self.word = array('i')  # Leaves: index into words; inner nodes: NO_NODE
+        self.child_start = array('i')  # Offset of the node's children in child_ids
+        self.child_count = array('i')
+        self.child_ids = array('i')
+        self.leaf_count = array('i')  # Leaves in the subtree (1 for a leaf)
+
+        self.words = []  # Distinct token texts
+        self.word_ids = {}
+        self.interned = {}  # (symbol, word) or (symbol, *children) -> node ID
+        self.open_lists = {}  # Open list handle -> [symbol, child IDs or handles]
+        self.next_handle = OPEN_LIST_BASE
+
+        self.positions = array('i')  # Token index of every leaf occurrence, in document order
+        self.occurrences = 0  # Nodes in the unshared tree
+        self.root = NO_NODE
+
+    def __len__(self):
+        return len(self.symbol)
+
+    def intern(self, key, symbol_id, word, children, leaf_count):
+        node = self.interned.get(key)
+        if node is None:
+            node = self.interned[key] = len(self.symbol)
+            self.symbol.append(symbol_id)
+            self.word.append(word)
+            self.child_start.append(len(self.child_ids))
+            self.child_count.append(len(children))
+            self.child_ids.extend(children)
+            self.leaf_count.append(leaf_count)
+        return node
+
+    def close(self, child):
+        """
+        Returns the node ID of a child, interning it first if it is an open list.
+        """
+        if child > OPEN_LIST_BASE:
+            return child
+        symbol_id, children = self.open_lists.pop(child)
+        return self.add_node(symbol_id, children)
+
+    def add_node(self, symbol_id, children):
+        children = [self.close(child) for child in children]
+        leaf_count = self.leaf_count
+        return self.intern((symbol_id, *children), symbol_id, NO_NODE, children,
+                           sum(leaf_count[child] for child in children))
+
+    '''
+    ------------------------------------------------------------------------------------------
+    Builder interface used by the parse engines (see SyntaxTreeArena)
+    '''
+    def add_leaf(self, symbol_id, token_index):
+        self.positions.append(token_index)
+        self.occurrences += 1
+        text = self.tokens[token_index].value
+        word = self.word_ids.get(text)
+        if word is None:
+            word = self.word_ids[text] = len(self.words)
+            self.words.append(text)
+        return self.intern((symbol_id, text), symbol_id, word, (), 1)
+
+    def add_inner(self, symbol_id, children):
+        self.occurrences += 1
+        if symbol_id in self.list_symbols:
+            handle = self.next_handle
+            self.next_handle -= 1
+            self.open_lists[handle] = [symbol_id, list(children)]
+            return handle
+        return self.add_node(symbol_id, children)
+
+    def append_children(self, handle, children):
+        self.open_lists[handle][1].extend(children)
+
+    '''
+    ------------------------------------------------------------------------------------------
+    '''
+    def symb(self, node):
+        return self.symbol_names[self.symbol[node]]
+
+    def is_leaf(self, node):
+        return self.word[node] != NO_NODE
+
+    def text(self, node):
+        """
+        Returns the token text of a leaf, or None for inner nodes.
+        """
+        word = self.word[node]
+        return self.words[word] if word != NO_NODE else None
+
+    def children(self, node):
+        start = self.child_start[node]
+        return self.child_ids[start:start + self.child_count[node]]
+
+    def fold(self, function):
+        """
+        Computes function(node, child_results) once per unique node, children first, and
+        returns the results indexed by node ID.
+        """
+        results = []
+        child_ids = self.child_ids
+        for node in range(len(self.symbol)):
+            start = self.child_start[node]
+            results.append(function(node, [results[child] for child in
+                                           child_ids[start:start + self.child_count[node]]]))
+        return results
+
+    def first_tokens(self):
+        """
+        Yields (node ID, index of its first token) for every occurrence in document order
+        (pre-order); empty subtrees report the token that follows them.
+        """
+        positions = self.positions
+        pending = [self.root]
+        leaves_before = 0
+        while pending:
+            node = pending.pop()
+            yield node, positions[leaves_before] if leaves_before < len(positions) else NO_NODE
+            if self.word[node] != NO_NODE:
+                leaves_before += 1
+            else:
+                pending.extend(reversed(self.children(node)))
+
+    def expand(self):
+        """
+        Rebuilds the unshared SyntaxTreeArena, with the UNIDs the parser would have given it.
+        """
+        tree = SyntaxTreeArena(self.symbol_names, self.tokens)
+        positions = self.positions
+        list_symbols = self.list_symbols
+        leaves = 0
+        # (node, UNID of its list node or NO_NODE, where its children start in results or None)
+        pending = [(self.root, NO_NODE, None)]
+        results = []
+        while pending:
+            node, list_unid, created = pending.pop()
+            if created is None:
+                if self.word[node] != NO_NODE:
+                    results.append(tree.add_leaf(self.symbol[node], positions[leaves]))
+                    leaves += 1
+                    continue
+                if self.symbol[node] in list_symbols:
+                    # List nodes are created before their elements
+                    list_unid = tree.add_inner(self.symbol[node], ())
+                pending.append((node, list_unid, len(results)))
+                pending.extend((child, NO_NODE, None) for child in reversed(self.children(node)))
+                continue
+            children = results[created:]
+            del results[created:]
+            if list_unid != NO_NODE:
+                tree.append_children(list_unid, children)
+                results.append(list_unid)
+            else:
+                results.append(tree.add_inner(self.symbol[node], children))
+        tree.root = results[0]
+        return tree
+
+    def memory_usage(self):
+        """
+        Returns the number of bytes used by the node and position arrays.
+        """
+        return sum(a.itemsize * len(a) for a in
+                   (self.symbol, self.word, self.child_start, self.child_count, self.child_ids,
+                    self.leaf_count, self.positions))
@@ -0,0 +1,471 @@
+from array import array
+from itertools import islice
+from parser import SLRParser
+from semantic import (SemanticAnalyzer, SemanticError, TypeCheckError, Scope, GLOBAL_HOPS)
+from syntaxtree import SyntaxTreeArena, NO_NODE
+
+'''
+===========================================================================================
+Incremental reparsing and semantic analysis.
+
+IncrementalParser keeps the tree of its last successful parse. When the input is edited,
+reparse() diffs the old and new token streams (common prefix and suffix) and runs the normal
+SLR loop over the new tokens, but whenever it is about to shift an unchanged token it tries to
+shift a whole old subtree starting at that token instead. A subtree is reused when:
+    - all of its tokens lie in the unchanged prefix or the unchanged suffix,
+    - the token after it is unchanged too (the lookahead its reductions were made on),
+    - the parser is in the same state the old parse was in when it shifted its first token.
+Under those conditions the full parse would build exactly the same subtree, so the result,
+UNIDs included, is identical to parsing the new input from scratch.
+
+Nodes of a subtree are created contiguously (its UNIDs are the range from its first token's
+leaf to the subtree root), so a reused subtree is copied into the new arena as array slices.
+Flat list nodes (INSTRUC, GLOBVARS, FUNCTIONS) are created before their elements and keep
+growing, so they are never reused whole; their elements are.
+===========================================================================================
+'''
+
+
+class IncrementalParser(SLRParser):
+    def __init__(self, input_text, input_file, tokens, tracer=None, error_recovery=False):
+        super().__init__(None, input_text, input_file, tokens=tokens, tracer=tracer,
+                         error_recovery=error_recovery)
+        self.shift_states = array('i')  # Token index -> state it was shifted in (-1 if never shifted)
+        self.leaf_of_token = array('i')  # Token index -> UNID of its leaf (-1 if none)
+        self.reused_nodes = 0  # Nodes copied from the previous tree by the last parse
+
+    def accept(self):
+        """
+        Finishes a successful parse. Unlike SLRParser.accept this does not write the XML on
+        every (re)parse; call generate_syntax_tree_xml when the output is needed.
+        """
+        return True
+
+    def reparse(self, input_text, tokens):
+        """
+        Parses the edited input (its full token list), reusing unchanged subtrees of the
+        previous tree. Returns the same value as parse().
+        """
+        previous = None
+        if self.syntax_tree.root != NO_NODE and not self.diagnostics:
+            previous = (self.syntax_tree, self.tokens, self.shift_states, self.leaf_of_token)
+
+        self.input_text = input_text
+        self.tokens = tokens
+        self.current_token_index = 0
+        self.diagnostics = []
+        self.last_recovery_position = None
+        self.syntax_tree = SyntaxTreeArena(self.syntax_tree.symbol_names, tokens)
+        return self.parse_reusing(previous)
+
+    def parse(self):
+        return self.parse_reusing(None)
+
+    '''
+    ------------------------------------------------------------------------------------------
+    '''
+    def parse_reusing(self, previous):
+        """
+        The SLRParser.parse loop, recording per-token shift states and trying to shift
+        reusable subtrees of previous (tree, tokens, shift_states, leaf_of_token) as a unit.
+        """
+        tables = self.dense_tables
+        action = tables.action
+        goto = tables.goto
+        n_terminals = tables.n_terminals
+        n_nonterminals = tables.n_nonterminals
+        prod_lhs = tables.prod_lhs
+        prod_len = tables.prod_len
+        prod_is_list = tables.prod_is_list
+        accept_code = tables.accept_code
+        start_symbol = tables.nonterminal_ids[self.grammar_rules[0].lhs]
+        nonterminals = tables.nonterminals
+        tracer = self.tracer
+        tree = self.syntax_tree
+        add_leaf = tree.add_leaf
+        add_inner = tree.add_inner
+        append_children = tree.append_children
+
+        tokens = self.tokens
+        token_ids = tables.encode_tokens(tokens)
+        position = self.current_token_index
+        self.shift_states = shift_states = array('i', [-1]) * len(tokens)
+        self.leaf_of_token = leaf_of_token = array('i', [-1]) * len(tokens)
+        self.reused_nodes = 0
+
+        old_index = None
+        if previous is not None:
+            old_index = self.unchanged_token_map(previous, tokens)
+
+        self.stack = stack = [0]
+        self.node_stack = node_stack = []
+
+        while True:
+            state = stack[-1]
+            if position >= len(tokens):
+                raise SyntaxError("Unexpected end of input.")
+            token = tokens[position]
+            terminal = token_ids[position]
+
+            code = action[state * n_terminals + terminal] if terminal >= 0 else 0
+
+            if code == 0:
+                self.current_token_index = position
+                if not self.error_recovery:
+                    self.raise_syntax_error(token)
+                position = self.recover(position, token_ids)
+                if position is None:
+                    return False
+                continue
+
+            if code == accept_code:
+                self.current_token_index = position
+                if tree.root == NO_NODE:
+                    if len(node_stack) == 1:
+                        tree.root = node_stack.pop()
+                    else:
+                        raise Exception("Parser error: syntax_tree_root is None and node stack has unexpected size.")
+                return self.accept()
+
+            if code > 0:
+                if old_index is not None:
+                    reused = self.shift_subtree(previous, old_index(position), state, position)
+                    if reused is not None:
+                        position = reused
+                        continue
+                if tracer is not None:
+                    tracer.shift(state, position, token.type, code - 1)
+                stack.append(code - 1)
+                shift_states[position] = state
+                leaf_of_token[position] = add_leaf(n_nonterminals + terminal, position)
+                node_stack.append(leaf_of_token[position])
+                position += 1
+                continue
+
+            # Reduce action
+            production_number = -code - 1
+            rhs_length = prod_len[production_number]
+            lhs = prod_lhs[production_number]
+            if prod_is_list[production_number]:
+                inner_node = node_stack[-rhs_length]
+                append_children(inner_node, node_stack[1 - rhs_length:])
+                del node_stack[-rhs_length:]
+                del stack[-rhs_length:]
+            elif rhs_length:
+                inner_node = add_inner(lhs, node_stack[-rhs_length:])
+                del node_stack[-rhs_length:]
+                del stack[-rhs_length:]
+            else:
+                inner_node = add_inner(lhs, ())
+
+            if lhs == start_symbol:
+                if tracer is not None:
+                    tracer.reduce(state, production_number, -1)
+                self.current_token_index = position
+                tree.root = inner_node
+                return self.accept()
+
+            node_stack.append(inner_node)
+            goto_state = goto[stack[-1] * n_nonterminals + lhs]
+            if goto_state < 0:
+                raise SyntaxError(f"Goto error for state {stack[-1]} and non-terminal {nonterminals[lhs]}")
+            if tracer is not None:
+                tracer.reduce(state, production_number, goto_state)
+            stack.append(goto_state)
+
+    @staticmethod
+    def unchanged_token_map(previous, new_tokens):
+        """
+        Diffs the token streams by class and word. Returns a function mapping a new token
+        index to (old index, UNID bound), or None for tokens in the edited region. Old
+        subtrees ending below the UNID bound are followed by an unchanged token.
+        """
+        old_tree, old_tokens, _, old_leaf_of_token = previous
+        n_old = len(old_tokens)
+        n_new = len(new_tokens)
+        limit = min(n_old, n_new)
+
+        prefix = 0
+        while (prefix < limit and old_tokens[prefix].type == new_tokens[prefix].type
+               and old_tokens[prefix].value == new_tokens[prefix].value):
+            prefix += 1
+        suffix = 0
+        while (suffix < limit - prefix and old_tokens[n_old - 1 - suffix].type == new_tokens[n_new - 1 - suffix].type
+               and old_tokens[n_old - 1 - suffix].value == new_tokens[n_new - 1 - suffix].value):
+            suffix += 1
+
+        delta = n_new - n_old
+        suffix_start = n_new - suffix
+
+        # Leaf UNIDs grow with token index, so a subtree below the leaf of the last prefix
+        # token ends at least two tokens before the edit
+        prefix_bound = old_leaf_of_token[prefix - 1] if prefix else 0
+
+        def old_index(position):
+            if position < prefix:
+                return position, prefix_bound
+            if position >= suffix_start:
+                return position - delta, len(old_tree)
+            return None
+
+        return old_index
+
+    def shift_subtree(self, previous, mapped, state, position):
+        """
+        Shifts the largest reusable old subtree starting at the token at position, if any.
+        Returns the position after the subtree, or None if nothing can be reused.
+        """
+        if mapped is None:
+            return None
+        old_position, unid_bound = mapped
+        old_tree, _, old_shift_states, old_leaf_of_token = previous
+        if old_shift_states[old_position] != state:
+            return None
+        leaf = old_leaf_of_token[old_position]
+        if leaf == NO_NODE:
+            return None
+
+        # Subtrees starting at this leaf: its ancestors reached through first-child links.
+        # List nodes are created (empty) before their first element, so climbing stops there.
+        old_parent = old_tree.parent
+        old_first_child = old_tree.first_child
+        candidates = []
+        node = leaf
+        while old_parent[node] != NO_NODE and old_first_child[old_parent[node]] == node:
+            node = old_parent[node]
+            if node < leaf:
+                break
+            candidates.append(node)
+
+        goto = self.dense_tables.goto
+        n_nonterminals = self.dense_tables.n_nonterminals
+        for node in reversed(candidates):
+            # The subtree and the lookahead token after it must both be unchanged
+            if node >= unid_bound:
+                continue
+            goto_state = goto[state * n_nonterminals + old_tree.symbol[node]]
+            if goto_state < 0:
+                continue
+            new_root, last_token = self.copy_subtree(previous, leaf, node, position - old_position)
+            self.stack.append(goto_state)
+            self.node_stack.append(new_root)
+            return last_token + 1
+        return None
+
+    def copy_subtree(self, previous, low, high, token_delta):
+        """
+        Appends the old nodes low..high (a whole subtree, high being its root) to the new
+        arena, shifting UNIDs and token indices. Returns the UNID of the copied root and the
+        (new) index of its last token.
+        """
+        old_tree, _, old_shift_states, old_leaf_of_token = previous
+        tree = self.syntax_tree
+        offset = len(tree) - low
+
+        tree.symbol.extend(old_tree.symbol[low:high + 1])
+        tree.parent.extend(array('i', [unid + offset for unid in old_tree.parent[low:high]]))
+        tree.parent.append(NO_NODE)
+        tree.first_child.extend(array('i', [unid + offset if unid != NO_NODE else NO_NODE
+                                            for unid in old_tree.first_child[low:high + 1]]))
+        tree.next_sibling.extend(array('i', [unid + offset if unid != NO_NODE else NO_NODE
+                                             for unid in old_tree.next_sibling[low:high]]))
+        tree.next_sibling.append(NO_NODE)
+
+        # The leaves of a subtree cover a contiguous run of tokens, first to last
+        old_token = old_tree.token[low:high + 1]
+        first_token = old_token[0]
+        n_leaves = len(old_token) - old_token.count(NO_NODE)
+        tree.token.extend(array('i', [index + token_delta if index != NO_NODE else NO_NODE
+                                      for index in old_token]))
+        new_first = first_token + token_delta
+        self.shift_states[new_first:new_first + n_leaves] = old_shift_states[first_token:first_token + n_leaves]
+        self.leaf_of_token[new_first:new_first + n_leaves] = array(
+            'i', [unid + offset for unid in old_leaf_of_token[first_token:first_token + n_leaves]])
+        last_token = new_first + n_leaves - 1
+
+        self.reused_nodes += high - low + 1
+        return high + offset, last_token
+
+
+'''
+------------------------------------------------------------------------------------------
+Incremental semantic analysis.
+
+IncrementalAnalyzer runs the same analysis as semantic.analyze_syntax_tree, but caches the
+outcome of each top-level DECL (nested functions included), keyed by the words of its tokens:
+the same tokens always parse to the same subtree, with the same UNIDs relative to its first
+leaf (see above). The globals and main are analyzed every time; a cached function is not
+walked again when the global variables it resolved (or failed to find) still have the same
+type, data type and slot. Its function declarations, scopes, name bindings, calls and error,
+all stored relative to its first leaf, are replayed instead. Declaring the functions in the
+global scope and resolving the calls stay live, so duplicate function names and calls to
+removed functions are still found.
+'''
+class FunctionAnalysis:
+    """
+    Outcome of analyzing one top-level DECL, nodes being UNIDs relative to its first leaf.
+    """
+    __slots__ = ('functions', 'scopes', 'bindings', 'calls', 'error', 'dependencies')
+
+    def __init__(self, functions, scopes, bindings, calls, error, dependencies):
+        self.functions = functions  # (name leaf, return type) per declared function
+        self.scopes = scopes  # (name, level, scope type, parent scope or NO_NODE for global, symbols)
+        self.bindings = bindings  # (leaf, local declaration or global name, hops, slot)
+        self.calls = calls  # FNAME leaves of the calls
+        self.error = error  # (error type, message, leaf) or None
+        self.dependencies = dependencies  # ((global name, signature), ...)
+
+
+def global_signature(global_scope, name):
+    info = global_scope.symbols.get(name)
+    return None if info is None else (info["type"], info["data_type"], info["slot"])
+
+
+class IncrementalAnalyzer:
+    def __init__(self):
+        self.cache = {}  # Token words of a DECL -> FunctionAnalysis
+        self.checked = 0  # Functions walked by the last analyze()
+        self.reused = 0  # Functions replayed from the cache by the last analyze()
+
+    def analyze(self, tree, source_lines=None, input_file=None):
+        """
+        Analyzes the tree like semantic.analyze_syntax_tree and returns (symbol table,
+        NameBindings); raises the same errors.
+        """
+        analyzer = SemanticAnalyzer(tree, source_lines, input_file)
+        self.checked = self.reused = 0
+        cache = {}  # Only the functions of this version are kept
+        declarations = self.walk_main(analyzer)
+
+        global_scope = analyzer.symbol_table.global_scope
+        try:
+            for decl in declarations:
+                low = analyzer.leaf(decl)
+                key = self.token_words(analyzer, low, decl)
+                analysis = self.cache.get(key)
+                if analysis is not None and all(global_signature(global_scope, name) == signature
+                                                for name, signature in analysis.dependencies):
+                    self.reused += 1
+                    cache[key] = analysis
+                    self.replay(analyzer, low, analysis)
+                    continue
+                self.checked += 1
+                analysis = cache[key] = self.check(analyzer, low, decl)
+                if analysis.error is not None:
+                    error_type, message, leaf = analysis.error
+                    raise analyzer.error(error_type, message, low + leaf)
+        except (SemanticError, TypeCheckError):
+            self.cache.update(cache)  # Keep the functions after the error for the next run
+            raise
+        self.cache = cache
+        return analyzer.finish(), analyzer.bindings
+
+    @staticmethod
+    def walk_main(analyzer):
+        """
+        Analyzes the globals and main, and returns the top-level DECLs in document order.
+        """
+        # PROG -> main GLOBVARS ALGO FUNCTIONS
+        declarations = []
+        for child in analyzer.children(analyzer.root):
+            if analyzer.token[child] != NO_NODE:
+                continue
+            if analyzer.symb(child) != 'FUNCTIONS':
+                analyzer.walk(child)
+                continue
+            # FUNCTIONS is one flat list node whose children are the top-level DECLs
+            declarations.extend(node for node in analyzer.children(child) if analyzer.symb(node) == 'DECL')
+        return declarations
+
+    @staticmethod
+    def token_words(analyzer, low, high):
+        """
+        Returns the words of the tokens of the subtree low..high (a contiguous run).
+        """
+        token = analyzer.token
+        last = high
+        while token[last] == NO_NODE:
+            last -= 1
+        tokens = analyzer.tokens
+        return tuple(tokens[index].value for index in range(token[low], token[last] + 1))
+
+    @staticmethod
+    def check(analyzer, low, decl):
+        """
+        Walks a DECL with the analyzer and records what it did to the shared state.
+        """
+        symbol_table = analyzer.symbol_table
+        global_scope = symbol_table.global_scope
+        n_globals = len(global_scope.symbols)
+        n_scopes = len(symbol_table.scopes)
+        n_calls = len(analyzer.calls)
+        error = None
+        try:
+            analyzer.walk(decl)
+        except (SemanticError, TypeCheckError) as e:
+            error = e
+
+        functions = [(info["unid"] - low, info["data_type"])
+                     for info in islice(global_scope.symbols.values(), n_globals, None)]
+        scopes = [(name, level, scope_type, parent - n_scopes if parent >= n_scopes else NO_NODE,
+                   [(symbol, info["type"], info["unid"] - low, info["data_type"])
+                    for symbol, info in symbols.items()])
+                  for name, level, scope_type, parent, symbols in symbol_table.scope_records(n_scopes)]
+
+        bindings = []
+        dependencies = set()
+        hops = analyzer.bindings.hops
+        slot = analyzer.bindings.slot
+        for leaf, declaration in enumerate(analyzer.bindings.declaration[low:decl + 1], low):
+            if declaration == NO_NODE:
+                continue
+            if hops[leaf] == GLOBAL_HOPS:
+                name = analyzer.word(leaf)
+                bindings.append((leaf - low, name, GLOBAL_HOPS, NO_NODE))
+                if analyzer.symb(analyzer.parent[leaf]) == 'VNAME':
+                    dependencies.add(name)
+            else:
+                bindings.append((leaf - low, declaration - low, hops[leaf], slot[leaf]))
+        if error is not None:
+            dependencies.add(analyzer.word(error.leaf))
+            error = (type(error), error.detail, error.leaf - low)
+        calls = [leaf - low for leaf in analyzer.calls[n_calls:]]
+        dependencies = tuple((name, global_signature(global_scope, name)) for name in sorted(dependencies))
+        return FunctionAnalysis(functions, scopes, bindings, calls, error, dependencies)
+
+    @staticmethod
+    def replay(analyzer, low, analysis):
+        """
+        Applies a cached FunctionAnalysis to the analyzer as if the DECL had been walked.
+        """
+        symbol_table = analyzer.symbol_table
+        global_scope = symbol_table.global_scope
+        for leaf, return_type in analysis.functions:
+            analyzer.declare(low + leaf, "func", return_type, global_scope, 'Function')
+
+        scopes = []
+        for name, level, scope_type, parent, symbols in analysis.scopes:
+            scope = Scope(name, parent_scope=scopes[parent] if parent != NO_NODE else global_scope,
+                          level=level, scope_type=scope_type)
+            for symbol, symbol_type, unid, data_type in symbols:
+                scope.declare(symbol, symbol_type, low + unid, data_type=data_type)
+            symbol_table.append_scope(scope)
+            scopes.append(scope)
+
+        declarations = analyzer.bindings.declaration
+        hops = analyzer.bindings.hops
+        slots = analyzer.bindings.slot
+        for leaf, declaration, hop, slot in analysis.bindings:
+            if hop == GLOBAL_HOPS:
+                info = global_scope.symbols[declaration]
+                declaration, slot = info["unid"], info["slot"]
+            else:
+                declaration += low
+            declarations[low + leaf] = declaration
+            hops[low + leaf] = hop
+            slots[low + leaf] = slot
+        analyzer.calls.extend(low + leaf for leaf in analysis.calls)
+
+        if analysis.error is not None:
+            error_type, message, leaf = analysis.error
+            raise analyzer.error(error_type, message, low + leaf)
@@ -1,4 +1,7 @@
 import re
+import sys
+
+NO_WORD = -1  # word_id of tokens that were not interned
 
 class LexicalError(Exception):
     """Exception raised for errors in the lexical analysis phase."""
@@ -13,15 +16,48 @@ class Token:
     Token class represents a lexical token with a type and a value.
     """
 
-    def __init__(self, type, value, line_num, col_num):
+    def __init__(self, type, value, line_num, col_num, word_id=NO_WORD):
         self.type = type  # The type of token (e.g., 'NUM_TYPE', 'PRINT', 'VNAME')
         self.value = value  # The actual value of the token (e.g., 'num', 'print', 'V_x')
         self.line_num = line_num  # The line number where the token is located
         self.col_num = col_num  # The column number where the token starts
+        self.word_id = word_id  # ID of the value in the Interner of the compilation
 
     def __repr__(self):
         return f"Token({self.type}, {self.value}, line {self.line_num}, col {self.col_num})"
 
+class Interner:
+    """
+    Maps every distinct word (identifier, constant or keyword) to a small int ID, in
+    first-seen order, and keeps a single string object per word. Counts lookups so the
+    hit rate and the memory of the duplicate strings that were dropped can be reported.
+    """
+    def __init__(self):
+        self.ids = {}
+        self.strings = []  # Word ID -> word
+        self.lookups = 0
+        self.saved_bytes = 0
+
+    def __len__(self):
+        return len(self.strings)
+
+    def intern(self, text):
+        self.lookups += 1
+        word_id = self.ids.get(text)
+        if word_id is None:
+            word_id = self.ids[text] = len(self.strings)
+            self.strings.append(text)
+        else:
+            self.saved_bytes += sys.getsizeof(text)
+        return word_id
+
+    def hit_rate(self):
+        return (self.lookups - len(self.strings)) / self.lookups if self.lookups else 0.0
+
+    def summary(self):
+        return (f"Interner: {len(self.strings)} distinct words in {self.lookups} tokens, "
+                f"hit rate {self.hit_rate():.1%}, {self.saved_bytes / 1024:.1f} KiB of duplicate strings dropped")
+
 class Lexer:
     """
     Lexer class is responsible for converting the input source code into tokens.
@@ -70,8 +106,9 @@ class Lexer:
         (r";", "SEMICOLON"),
     ]
 
-    def __init__(self, input_text):
+    def __init__(self, input_text, interner=None):
         self.input_text = input_text  # The source code input as a string
+        self.interner = interner if interner is not None else Interner()  # Word IDs of the compilation
         self.position = 0  # Current position in the input text
         self.line_num = 1  # Track current line number
         self.col_num = 1  # Track current column number
@@ -90,7 +127,8 @@ class Lexer:
                 if match:
                     text = match.group(0)  # Matched text
                     if tag:  # Only add to tokens if a tag is specified (ignore whitespace/comments)
-                        token = Token(tag, text, self.line_num, self.col_num)
+                        word_id = self.interner.intern(text)
+                        token = Token(tag, self.interner.strings[word_id], self.line_num, self.col_num, word_id)
                         tokens.append(token)
 
                     # Update line and column numbers
@@ -114,6 +152,6 @@ class Lexer:
                 self.position = match.end(0)  # Move the position to the end of the matched text
 
         # Append an end-of-file token to signify the end of input
-        tokens.append(Token("EOF", "$", self.line_num, self.col_num))
+        tokens.append(Token("EOF", "$", self.line_num, self.col_num, self.interner.intern("$")))
 
         return tokens  # Return the list of tokens
@@ -0,0 +1,307 @@
+from syntaxtree import NO_NODE
+from treewalk import fold
+
+'''
+===========================================================================================
+Lowering from the concrete syntax tree to a compact AST.
+
+The concrete tree keeps every chain production (VNAME -> V, COMMAND -> ASSIGN,
+ATOMIC -> CONST -> CONST_N, TERM -> OP, ARG -> ATOMIC, ...), every punctuation leaf and the
+flat INSTRUC/GLOBVARS/FUNCTIONS list nodes. lower() drops all of that and builds one
+small __slots__ object per construct:
+    Program     globals, body, functions
+    Function    return type, name, params, locals, body, functions (nested)
+    Decl        variable declaration (type and Var)
+    Assign      target Var and value (an expression, or Input for "< input")
+    Call        function name and arguments
+    Branch      condition, then-body, else-body
+    BinOp/UnOp  operator (token word, e.g. 'add') and operands
+    Const/Var   literals and variable references
+    Print, Return, Halt, Skip, Input
+Bodies are plain Python lists of statements. lower() works on a SyntaxTreeArena or a binary
+SyntaxTreeReader (it only uses the node arrays), without recursion.
+===========================================================================================
+'''
+
+
+class Node:
+    __slots__ = ()
+
+    def __repr__(self):
+        fields = ', '.join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+    def __eq__(self, other):
+        return type(other) is type(self) and all(getattr(self, name) == getattr(other, name)
+                                                 for name in self.__slots__)
+
+
+class Program(Node):
+    __slots__ = ('globals', 'body', 'functions')
+
+    def __init__(self, globals, body, functions):
+        self.globals = globals
+        self.body = body
+        self.functions = functions
+
+
+class Function(Node):
+    __slots__ = ('return_type', 'name', 'params', 'locals', 'body', 'functions', 'line')
+
+    def __init__(self, return_type, name, params, locals, body, functions, line):
+        self.return_type = return_type
+        self.name = name
+        self.params = params  # List of Var
+        self.locals = locals  # List of Decl
+        self.body = body
+        self.functions = functions
+        self.line = line
+
+
+class Decl(Node):
+    __slots__ = ('var_type', 'var')
+
+    def __init__(self, var_type, var):
+        self.var_type = var_type
+        self.var = var
+
+
+class Assign(Node):
+    __slots__ = ('target', 'value')
+
+    def __init__(self, target, value):
+        self.target = target
+        self.value = value
+
+
+class Call(Node):
+    __slots__ = ('name', 'args', 'line')
+
+    def __init__(self, name, args, line):
+        self.name = name
+        self.args = args
+        self.line = line
+
+
+class Branch(Node):
+    __slots__ = ('cond', 'then_body', 'else_body')
+
+    def __init__(self, cond, then_body, else_body):
+        self.cond = cond
+        self.then_body = then_body
+        self.else_body = else_body
+
+
+class BinOp(Node):
+    __slots__ = ('op', 'left', 'right')
+
+    def __init__(self, op, left, right):
+        self.op = op
+        self.left = left
+        self.right = right
+
+
+class UnOp(Node):
+    __slots__ = ('op', 'operand')
+
+    def __init__(self, op, operand):
+        self.op = op
+        self.operand = operand
+
+
+class Const(Node):
+    __slots__ = ('value', 'const_type')
+
+    def __init__(self, value, const_type):
+        self.value = value
+        self.const_type = const_type  # 'num' or 'text'
+
+
+class Var(Node):
+    __slots__ = ('name', 'line')
+
+    def __init__(self, name, line):
+        self.name = name
+        self.line = line
+
+
+class Print(Node):
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+
+class Return(Node):
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+
+class Halt(Node):
+    __slots__ = ()
+
+
+class Skip(Node):
+    __slots__ = ()
+
+
+class Input(Node):
+    __slots__ = ()
+
+
+'''
+------------------------------------------------------------------------------------------
+'''
+class Lowering:
+    """
+    Converts one concrete syntax tree to the AST bottom-up with treewalk.fold: every node is
+    lowered from the lowered forms of its children (a leaf stands for its Token), so nesting
+    depth costs heap memory, not Python stack frames.
+    """
+    def __init__(self, tree):
+        self.symbol = tree.symbol
+        self.symbol_names = tree.symbol_names
+        self.first_child = tree.first_child
+        self.next_sibling = tree.next_sibling
+        self.token = tree.token
+        self.tokens = tree.tokens
+        self.root = tree.root
+        self.handlers = {
+            'PROG': self.prog, 'GLOBVARS': self.globals, 'LOCVARS': self.globals,
+            'VTYP': self.word, 'FTYP': self.word, 'VNAME': self.var, 'CONST': self.const,
+            'ALGO': self.algo, 'INSTRUC': self.instructions, 'COMMAND': self.command,
+            'ASSIGN': self.assign, 'CALL': self.call, 'BRANCH': self.branch,
+            'OP': self.operation, 'SIMPLE': self.operation, 'COMPOSIT': self.operation,
+            'FUNCTIONS': self.functions, 'DECL': self.function, 'HEADER': self.header,
+            'BODY': self.body,
+        }
+
+    def symb(self, unid):
+        return self.symbol_names[self.symbol[unid]]
+
+    def children(self, unid):
+        first_child = self.first_child
+        next_sibling = self.next_sibling
+        result = []
+        child = first_child[unid]
+        while child != NO_NODE:
+            result.append(child)
+            child = next_sibling[child]
+        return result
+
+    def lower(self):
+        return fold(self.root, self.children, self.combine)
+
+    def combine(self, unid, results):
+        index = self.token[unid]
+        if index != NO_NODE:
+            return self.tokens[index]
+        handler = self.handlers.get(self.symb(unid))
+        if handler is None:
+            return results[0]  # Chain productions (TERM, ARG, COND, ATOMIC, FNAME, SUBFUNCS, ...)
+        return handler(unid, results)
+
+    '''
+    ------------------------------------------------------------------------------------------
+    Handlers: the lowered form of a node from the lowered forms of its children
+    '''
+    def prog(self, unid, results):
+        main, globvars, algo, functions = results
+        return Program(globvars, algo, functions)
+
+    def globals(self, unid, results):
+        # GLOBVARS and LOCVARS: VTYP VNAME COMMA per declaration
+        return [Decl(results[i], results[i + 1]) for i in range(0, len(results), 3)]
+
+    def word(self, unid, results):
+        return results[0].value
+
+    def var(self, unid, results):
+        token = results[0]
+        return Var(token.value, token.line_num)
+
+    def const(self, unid, results):
+        token = results[0]
+        return Const(token.value, 'num' if token.type == 'CONST_N' else 'text')
+
+    def functions(self, unid, results):
+        return results
+
+    def header(self, unid, results):
+        ftyp, name, _, p1, _, p2, _, p3, _ = results
+        return ftyp, name, [p1, p2, p3]
+
+    def body(self, unid, results):
+        prolog, locvars, algo, epilog, subfuncs, _ = results
+        return locvars, algo, subfuncs
+
+    def function(self, unid, results):
+        (return_type, name, params), (locvars, algo, subfuncs) = results
+        return Function(return_type, name.value, params, locvars, algo, subfuncs, name.line_num)
+
+    def algo(self, unid, results):
+        begin, instructions, end = results
+        return instructions
+
+    def instructions(self, unid, results):
+        return results[::2]  # COMMAND SEMICOLON per statement
+
+    def command(self, unid, results):
+        kind = self.symb(self.first_child[unid])
+        if kind == 'SKIP':
+            return Skip()
+        if kind == 'HALT':
+            return Halt()
+        if kind == 'PRINT':
+            return Print(results[1])
+        if kind == 'RETURN':
+            return Return(results[1])
+        return results[0]  # ASSIGN, CALL or BRANCH
+
+    def assign(self, unid, results):
+        target, _, value = results
+        if self.symb(self.next_sibling[self.first_child[unid]]) == 'INPUT_OP':
+            return Assign(target, Input())
+        return Assign(target, value)
+
+    def call(self, unid, results):
+        name = results[0]
+        return Call(name.value, [results[2], results[4], results[6]], name.line_num)
+
+    def branch(self, unid, results):
+        _, cond, _, then_body, _, else_body = results
+        return Branch(cond, then_body, else_body)
+
+    def operation(self, unid, results):
+        """
+        Lowers OP, SIMPLE and COMPOSIT nodes (UNOP and BINOP lower to their Token).
+        """
+        op = results[0].value
+        if len(results) == 4:
+            return UnOp(op, results[2])
+        return BinOp(op, results[2], results[4])
+
+
+def lower(tree):
+    """
+    Lowers a concrete syntax tree (SyntaxTreeArena or SyntaxTreeReader) to a Program.
+    """
+    return Lowering(tree).lower()
+
+
+def count_nodes(node):
+    """
+    Returns the number of AST nodes reachable from node.
+    """
+    count = 0
+    pending = [node]
+    while pending:
+        item = pending.pop()
+        if isinstance(item, list):
+            pending.extend(item)
+        elif isinstance(item, Node):
+            count += 1
+            pending.extend(getattr(item, name) for name in item.__slots__)
+    return count
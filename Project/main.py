@@ -3,9 +3,10 @@ import time
 import subprocess  # To run external commands
 from lexer import Lexer, LexicalError
 from parser import SLRParser
+from parsetrace import ParseTracer, TRACE_LEVELS, TRACE_OFF, TRACE_FULL
 from semantic import perform_semantic_analysis  # Importing the semantic analysis function
-from typecheck import type_check_input_file  # Importing the type checking function
-import xml.etree.ElementTree as ET
+from xmlwriter import write_token_stream_xml
+from binformat import write_token_stream_binary
 from translate import translate_to_basic  # Importing the translation function from the translator module
 import tkinter as tk
 from tkinter import filedialog, scrolledtext, messagebox
@@ -30,7 +31,13 @@ class TextRedirector:
     def flush(self):
         pass
 
-def process_input(input_file):
+def process_input(input_file, trace_level='off', parallel=False):
+    """
+    Compiles the input file. trace_level ('off', 'summary' or 'full', see parsetrace.py)
+    turns on parser tracing; a full trace is written next to the other outputs. parallel
+    parses and analyzes the top-level functions in worker processes (see parallelparse.py
+    and parallelanalysis.py).
+    """
     output_dir = "outputs"
     
     if not os.path.exists(output_dir):
@@ -39,8 +46,13 @@ def process_input(input_file):
     # Dynamic naming for output files based on input file
     base_filename = os.path.splitext(os.path.basename(input_file))[0]
     lexer_output_path = os.path.join(output_dir, f"{base_filename}_lexer_output.xml")
+    token_binary_path = os.path.join(output_dir, f"{base_filename}_tokens.bin")
     syntax_tree_output = os.path.join(output_dir, f"{base_filename}_syntaxtree.xml")
+    syntax_tree_binary = os.path.join(output_dir, f"{base_filename}_syntaxtree.bin")
+    symbol_index_path = os.path.join(output_dir, f"{base_filename}_symbolindex.bin")
+    symbol_table_path = os.path.join(output_dir, f"{base_filename}_symboltable.txt")
     basic_output_path = os.path.join(output_dir, f"{base_filename}.bas")
+    parse_trace_path = os.path.join(output_dir, f"{base_filename}_parsetrace.jsonl")
 
     try:
         with open(input_file, 'r') as file:
@@ -49,20 +61,33 @@ def process_input(input_file):
         # Lexing
         lexer = Lexer(input_text)
         tokens = lexer.tokenize()
+        print(lexer.interner.summary())
 
-        # Generate XML from tokens
+        # Generate XML (export) and the binary token stream (read by the parser) from tokens
         generate_xml(tokens, lexer_output_path)
+        write_token_stream_binary(tokens, token_binary_path)
 
         # Parsing
-        parser = SLRParser(lexer_output_path, input_text, base_filename)
-        parser.parse()
+        level = TRACE_LEVELS[trace_level]
+        tracer = None  # No tracing unless asked for
+        if level != TRACE_OFF:
+            tracer = ParseTracer(level, parse_trace_path if level == TRACE_FULL else None)
+        parser = SLRParser(token_binary_path, input_text, base_filename, tracer=tracer, error_recovery=True,
+                           engine='parallel' if parallel else 'table')
+        try:
+            parser.parse()
+        finally:
+            if tracer is not None:
+                tracer.close()
+                print(tracer.summary(parser.grammar_rules))
+        if parser.diagnostics:
+            # Report every syntax error found in this run at once
+            raise SyntaxError("\n\n".join(diagnostic.message for diagnostic in parser.diagnostics))
         parser.generate_syntax_tree_xml(syntax_tree_output)
+        parser.generate_syntax_tree_binary(syntax_tree_binary)
 
-        # Semantic Analysis
-        perform_semantic_analysis(syntax_tree_output, input_file)
-
-        # Type Checking
-        type_check_input_file(input_file)
+        # Semantic Analysis and Type Checking
+        perform_semantic_analysis(syntax_tree_binary, input_file, symbol_index_path, symbol_table_path, parallel)
 
         # Translation to BASIC
         basic_code = translate_to_basic(input_text.splitlines())
@@ -86,39 +111,7 @@ def generate_xml(tokens, output_path):
     """
     Generate an XML file from the list of tokens.
     """
-    root = ET.Element('TOKENSTREAM')
-    
-    for i, token in enumerate(tokens, start=1):
-        tok_element = ET.SubElement(root, 'TOK')
-        id_element = ET.SubElement(tok_element, 'ID')
-        id_element.text = str(i)
-        class_element = ET.SubElement(tok_element, 'CLASS')
-        class_element.text = token.type
-        word_element = ET.SubElement(tok_element, 'WORD')
-        word_element.text = token.value
-        line_element = ET.SubElement(tok_element, 'LINE')
-        line_element.text = str(token.line_num)
-        col_element = ET.SubElement(tok_element, 'COL')
-        col_element.text = str(token.col_num)
-
-    indent_xml(root)
-
-    tree = ET.ElementTree(root)
-    tree.write(output_path, encoding='utf-8', xml_declaration=True)
-
-def indent_xml(elem, level=0):
-    """
-    Recursively adds indentation to the XML elements for pretty printing.
-    """
-    indent = "  " 
-    i = "\n" + level * indent
-    if len(elem):
-        if not elem.text or not elem.text.strip():
-            elem.text = i + indent
-        for child in elem:
-            indent_xml(child, level + 1)
-        if not elem.tail or not elem.tail.strip():
-            elem.tail = i
+    write_token_stream_xml(tokens, output_path)
 
 # Function to toggle between views
 def toggle_view():
@@ -144,7 +137,7 @@ def run_compilation(input_text):
             temp_file.write(input_text)
 
         # Run the full process on the temporary input file
-        basic_code = process_input(temp_input_file)
+        basic_code = process_input(temp_input_file, trace_level.get(), parallel.get())
         
         # Display the BASIC code output
         basic_output_area.delete("1.0", tk.END)
@@ -195,61 +188,76 @@ def on_browse():
             input_text_area.delete("1.0", tk.END)
             input_text_area.insert(tk.END, input_text)
 
-# GUI Setup
-root = tk.Tk()
-root.title("Compiler GUI")
-root.geometry("800x600")
-
-# File Path Entry and Browse Button
-file_frame = tk.Frame(root)
-file_frame.pack(pady=10)
-
-file_label = tk.Label(file_frame, text="Select Input File (optional):")
-file_label.pack(side=tk.LEFT)
-
-file_path_entry = tk.Entry(file_frame, width=50)
-file_path_entry.pack(side=tk.LEFT, padx=5)
-
-browse_button = tk.Button(file_frame, text="Browse", command=on_browse)
-browse_button.pack(side=tk.LEFT)
-
-# Input Text Area
-input_label = tk.Label(root, text="Input File Content (Editable):")
-input_label.pack()
-input_text_area = scrolledtext.ScrolledText(root, width=90, height=10)
-input_text_area.pack()
-
-# Compile Button
-compile_frame = tk.Frame(root)
-compile_frame.pack()
-
-compile_button = tk.Button(compile_frame, text="Compile", command=on_compile)
-compile_button.pack(side=tk.LEFT, padx=10)
-
-# Warning Label (blue text as requested)
-compile_warning_label = tk.Label(compile_frame, text="Compiling may take a few seconds, and the UI may momentarily freeze.", fg="blue")
-compile_warning_label.pack(side=tk.LEFT)
-
-# Summary Output Area and Internal Process Output Area share the same position
-output_frame = tk.Frame(root)
-output_frame.pack(fill=tk.BOTH, expand=True)
-
-# Summary Output Area (default visible, showing phase completion)
-summary_output_area = scrolledtext.ScrolledText(output_frame, width=90, height=10)
-summary_output_area.pack(fill=tk.BOTH, expand=True)
-
-# Internal Process Output Area (hidden by default)
-internal_output_area = scrolledtext.ScrolledText(output_frame, width=90, height=15)
-internal_output_area.pack_forget()
-
-# Toggle Button
-toggle_button = tk.Button(root, text="See Internal Processing", command=toggle_view)
-toggle_button.pack(pady=5)
-
-# BASIC Output Area
-basic_label = tk.Label(root, text="Generated BASIC Code:")
-basic_label.pack()
-basic_output_area = scrolledtext.ScrolledText(root, width=90, height=10)
-basic_output_area.pack()
-
-root.mainloop()
+# The GUI only starts when run as a script, so worker processes of the parallel mode
+# (which import this module on platforms that spawn them) do not open windows
+if __name__ == "__main__":
+    # GUI Setup
+    root = tk.Tk()
+    root.title("Compiler GUI")
+    root.geometry("800x600")
+
+    # File Path Entry and Browse Button
+    file_frame = tk.Frame(root)
+    file_frame.pack(pady=10)
+
+    file_label = tk.Label(file_frame, text="Select Input File (optional):")
+    file_label.pack(side=tk.LEFT)
+
+    file_path_entry = tk.Entry(file_frame, width=50)
+    file_path_entry.pack(side=tk.LEFT, padx=5)
+
+    browse_button = tk.Button(file_frame, text="Browse", command=on_browse)
+    browse_button.pack(side=tk.LEFT)
+
+    # Input Text Area
+    input_label = tk.Label(root, text="Input File Content (Editable):")
+    input_label.pack()
+    input_text_area = scrolledtext.ScrolledText(root, width=90, height=10)
+    input_text_area.pack()
+
+    # Compile Button
+    compile_frame = tk.Frame(root)
+    compile_frame.pack()
+
+    compile_button = tk.Button(compile_frame, text="Compile", command=on_compile)
+    compile_button.pack(side=tk.LEFT, padx=10)
+
+    # Parser tracing (off by default)
+    trace_label = tk.Label(compile_frame, text="Parse trace:")
+    trace_label.pack(side=tk.LEFT)
+    trace_level = tk.StringVar(value='off')
+    trace_menu = tk.OptionMenu(compile_frame, trace_level, *TRACE_LEVELS)
+    trace_menu.pack(side=tk.LEFT, padx=5)
+
+    # Parallel compilation of the top-level functions (off by default)
+    parallel = tk.BooleanVar(value=False)
+    parallel_check = tk.Checkbutton(compile_frame, text="Parallel", variable=parallel)
+    parallel_check.pack(side=tk.LEFT, padx=5)
+
+    # Warning Label (blue text as requested)
+    compile_warning_label = tk.Label(compile_frame, text="Compiling may take a few seconds, and the UI may momentarily freeze.", fg="blue")
+    compile_warning_label.pack(side=tk.LEFT)
+
+    # Summary Output Area and Internal Process Output Area share the same position
+    output_frame = tk.Frame(root)
+    output_frame.pack(fill=tk.BOTH, expand=True)
+
+    # Summary Output Area (default visible, showing phase completion)
+    summary_output_area = scrolledtext.ScrolledText(output_frame, width=90, height=10)
+    summary_output_area.pack(fill=tk.BOTH, expand=True)
+
+    # Internal Process Output Area (hidden by default)
+    internal_output_area = scrolledtext.ScrolledText(output_frame, width=90, height=15)
+    internal_output_area.pack_forget()
+
+    # Toggle Button
+    toggle_button = tk.Button(root, text="See Internal Processing", command=toggle_view)
+    toggle_button.pack(pady=5)
+
+    # BASIC Output Area
+    basic_label = tk.Label(root, text="Generated BASIC Code:")
+    basic_label.pack()
+    basic_output_area = scrolledtext.ScrolledText(root, width=90, height=10)
+    basic_output_area.pack()
+
+    root.mainloop()
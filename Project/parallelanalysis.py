@@ -0,0 +1,111 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from binformat import SyntaxTreeReader
+from incremental import IncrementalAnalyzer
+from semantic import SemanticAnalyzer
+
+'''
+===========================================================================================
+Parallel semantic analysis and type checking split at top-level function declarations.
+
+Once the globals and main are analyzed, every top-level DECL only depends on the global
+variables: names inside it resolve to its own scopes or to a global variable, and calls are
+resolved after the walk (see SemanticAnalyzer.finish). analyze_parallel() therefore walks
+the globals and main in this process, hands the global variables to the worker processes as
+a read-only table, and lets the workers check batches of consecutive DECLs with
+IncrementalAnalyzer.check(), which records each outcome relative to the DECL's first leaf.
+The outcomes are replayed here in document order (function declarations, scopes, name
+bindings, calls, then the DECL's error if it had one), so the symbol table, the bindings and
+the first error raised are the same as for semantic.analyze_syntax_tree(). Duplicate function
+names are found while replaying, since each worker only sees its own DECL's functions.
+
+A binary tree (SyntaxTreeReader) is mapped again by each worker from its file; any other
+tree is sent to each worker once.
+===========================================================================================
+'''
+
+_worker_analyzer = None  # SemanticAnalyzer of the worker process, set by init_worker
+
+
+def global_records(global_scope):
+    return [(name, info["type"], info["unid"], info["data_type"]) for name, info in global_scope.symbols.items()]
+
+
+def init_worker(tree, global_variables):
+    """
+    Builds the worker's analyzer with the global variables declared, as after walking main.
+    """
+    global _worker_analyzer
+    if isinstance(tree, str):
+        tree = SyntaxTreeReader(tree)
+    analyzer = SemanticAnalyzer(tree)
+    global_scope = analyzer.symbol_table.global_scope
+    for name, symbol_type, unid, data_type in global_variables:
+        info = global_scope.declare(name, symbol_type, unid, data_type=data_type)
+        analyzer.visible.setdefault(analyzer.word_ids[analyzer.token[unid]], []).append((0, info))
+    _worker_analyzer = analyzer
+
+
+def reset_analyzer(analyzer, n_globals):
+    """
+    Undoes what checking a DECL did to the analyzer, leaving only the global variables.
+    """
+    while analyzer.functions:
+        analyzer.close_scope()  # Scopes left open by an error
+    symbol_table = analyzer.symbol_table
+    symbols = symbol_table.global_scope.symbols
+    visible = analyzer.visible
+    for name in list(symbols)[n_globals:]:
+        visible[analyzer.word_ids[analyzer.token[symbols[name]["unid"]]]].pop()
+        del symbols[name]
+    del symbol_table.scopes[1:]
+    del analyzer.calls[:]
+
+
+def check_decls_task(decls):
+    """
+    Worker entry point: checks DECLs given as (first leaf, DECL) and returns their
+    FunctionAnalysis, in order.
+    """
+    analyzer = _worker_analyzer
+    n_globals = len(analyzer.symbol_table.global_scope.symbols)
+    analyses = []
+    for low, decl in decls:
+        analyses.append(IncrementalAnalyzer.check(analyzer, low, decl))
+        reset_analyzer(analyzer, n_globals)
+    return analyses
+
+
+'''
+------------------------------------------------------------------------------------------
+'''
+def analyze_parallel(tree, source_lines=None, input_file=None, max_workers=None, min_decls=2):
+    """
+    Analyzes the tree like semantic.analyze_syntax_tree, checking the top-level function
+    declarations in worker processes. Returns (symbol table, NameBindings); raises the
+    same errors.
+    """
+    analyzer = SemanticAnalyzer(tree, source_lines, input_file)
+    declarations = IncrementalAnalyzer.walk_main(analyzer)
+    if len(declarations) < min_decls:
+        for decl in declarations:
+            analyzer.walk(decl)
+        return analyzer.finish(), analyzer.bindings
+
+    decls = [(analyzer.leaf(decl), decl) for decl in declarations]
+    max_workers = max_workers or os.cpu_count() or 1
+    size = max(1, -(-len(decls) // (4 * max_workers)))
+    batches = [decls[i:i + size] for i in range(0, len(decls), size)]
+    worker_tree = tree.file.name if isinstance(tree, SyntaxTreeReader) else tree
+    global_variables = global_records(analyzer.symbol_table.global_scope)
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=init_worker,
+                             initargs=(worker_tree, global_variables)) as pool:
+        results = [pool.submit(check_decls_task, batch) for batch in batches]
+        try:
+            for batch, result in zip(batches, results):
+                for (low, _), analysis in zip(batch, result.result()):
+                    IncrementalAnalyzer.replay(analyzer, low, analysis)
+        except BaseException:
+            pool.shutdown(cancel_futures=True)  # The batches after the first error are not needed
+            raise
+    return analyzer.finish(), analyzer.bindings
@@ -0,0 +1,233 @@
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from syntaxtree import SyntaxTreeArena, NO_NODE
+
+'''
+===========================================================================================
+Parallel parsing split at top-level function declarations.
+
+A program is MAIN GLOBVARS ALGO followed by a list of top-level DECLs. Every top-level DECL
+is parsed from the same parser state (the goto on FUNCTIONS after ALGO) and never looks
+below it on the stack, so the token stream can be cut at the DECL boundaries, which a cheap
+token scan finds: a "num|void FNAME (" header outside any function.
+
+parse_parallel() parses the prefix (up to and including the empty FUNCTIONS list) and
+batches of consecutive DECLs in worker processes, each into its own small arena. The
+sequential parser creates the prefix nodes first, then each DECL's nodes contiguously, then
+PROG, so splicing the batches in order with shifted UNIDs and appending the DECL roots to
+the FUNCTIONS list gives exactly the sequential tree. Anything unusual (tracing, hooks,
+hash-consed trees) falls back to the sequential parse, and so does a syntax error in any
+segment, which is then reported (or recovered from, with error_recovery) exactly like the
+sequential parser does. SLRParser(engine='parallel') parses this way.
+===========================================================================================
+'''
+
+FUNCTION_TYPES = ('NUM_TYPE', 'VOID')
+
+_worker_tables = None  # DenseTables of the worker process, set by init_worker
+
+
+def split_top_level_decls(tokens):
+    """
+    Returns the token indices where top-level DECLs start (empty if there are none or the
+    token stream does not have the expected shape).
+    """
+    starts = []
+    function_depth = 0
+    block_depth = 0
+    main_algo_done = False
+    for i, token in enumerate(tokens):
+        token_type = token.type
+        if token_type == 'BEGIN':
+            block_depth += 1
+        elif token_type == 'END':
+            if block_depth:
+                block_depth -= 1
+                main_algo_done = main_algo_done or (block_depth == 0 and function_depth == 0)
+            elif function_depth:
+                function_depth -= 1  # The "end" closing a function declaration
+            else:
+                return []
+        elif (token_type in FUNCTION_TYPES and i + 2 < len(tokens)
+              and tokens[i + 1].type == 'FNAME' and tokens[i + 2].type == 'LPAREN'):
+            if function_depth == 0 and block_depth == 0:
+                if not main_algo_done:
+                    return []
+                starts.append(i)
+            function_depth += 1
+    return starts
+
+
+def init_worker(tables):
+    global _worker_tables
+    _worker_tables = tables
+
+
+def parse_segment(tables, token_ids, start_state, stop_symbol, stop_depth, repeat=1):
+    """
+    Parses token_ids from start_state into a fresh arena until stop_symbol has been reduced
+    with stop_depth states left on the stack, repeat times in a row (each time from
+    start_state again). The last token ID is only used as lookahead. Returns the arena and
+    the node stack at every stop, or raises SyntaxError.
+    """
+    action = tables.action
+    goto = tables.goto
+    n_terminals = tables.n_terminals
+    n_nonterminals = tables.n_nonterminals
+    prod_lhs = tables.prod_lhs
+    prod_len = tables.prod_len
+    prod_is_list = tables.prod_is_list
+    tree = SyntaxTreeArena(None, None)
+    add_leaf = tree.add_leaf
+    add_inner = tree.add_inner
+    append_children = tree.append_children
+
+    results = []
+    position = 0
+    stack = [start_state]
+    node_stack = []
+    while len(results) < repeat:
+        state = stack[-1]
+        terminal = token_ids[position]
+        code = action[state * n_terminals + terminal] if terminal >= 0 else 0
+        if code == 0 or code == tables.accept_code:
+            raise SyntaxError(f"Segment parse failed at token {position}")
+
+        if code > 0:
+            stack.append(code - 1)
+            node_stack.append(add_leaf(n_nonterminals + terminal, position))
+            position += 1
+            continue
+
+        production_number = -code - 1
+        rhs_length = prod_len[production_number]
+        lhs = prod_lhs[production_number]
+        if prod_is_list[production_number]:
+            inner_node = node_stack[-rhs_length]
+            append_children(inner_node, node_stack[1 - rhs_length:])
+            del node_stack[-rhs_length:]
+            del stack[-rhs_length:]
+        elif rhs_length:
+            inner_node = add_inner(lhs, node_stack[-rhs_length:])
+            del node_stack[-rhs_length:]
+            del stack[-rhs_length:]
+        else:
+            inner_node = add_inner(lhs, ())
+        node_stack.append(inner_node)
+
+        if lhs == stop_symbol and len(stack) == stop_depth:
+            results.append(list(node_stack))
+            del node_stack[:]
+            del stack[1:]
+            continue
+
+        goto_state = goto[stack[-1] * n_nonterminals + lhs]
+        if goto_state < 0:
+            raise SyntaxError(f"Segment parse failed at token {position}")
+        stack.append(goto_state)
+
+    if position != len(token_ids) - 1:
+        raise SyntaxError(f"Segment parse stopped at token {position} of {len(token_ids) - 1}")
+    return tree, results
+
+
+def parse_segment_task(token_bytes, start_state, stop_symbol, stop_depth, repeat):
+    """
+    Worker entry point: parses one segment and returns the arena arrays and the roots.
+    """
+    token_ids = array('i')
+    token_ids.frombytes(token_bytes)
+    tree, results = parse_segment(_worker_tables, token_ids, start_state, stop_symbol, stop_depth, repeat)
+    return ([getattr(tree, name).tobytes() for name in ('symbol', 'parent', 'first_child', 'next_sibling', 'token')],
+            results)
+
+
+def splice_segment(tree, arrays, token_offset):
+    """
+    Appends the nodes of a segment arena to tree, shifting UNIDs and token indices.
+    Returns the UNID offset applied.
+    """
+    symbol, parent, first_child, next_sibling, token = (array('i', data) for data in arrays)
+    offset = len(tree)
+    tree.symbol.extend(symbol)
+    tree.parent.extend(array('i', [unid + offset if unid != NO_NODE else NO_NODE for unid in parent]))
+    tree.first_child.extend(array('i', [unid + offset if unid != NO_NODE else NO_NODE for unid in first_child]))
+    tree.next_sibling.extend(array('i', [unid + offset if unid != NO_NODE else NO_NODE for unid in next_sibling]))
+    tree.token.extend(array('i', [index + token_offset if index != NO_NODE else NO_NODE for index in token]))
+    return offset
+
+
+def batch_bounds(starts, end, n_batches):
+    """
+    Groups consecutive DECL start indices into at most n_batches (start, end, count) ranges.
+    """
+    size = max(1, -(-len(starts) // n_batches))
+    bounds = []
+    for i in range(0, len(starts), size):
+        group = starts[i:i + size]
+        batch_end = starts[i + size] if i + size < len(starts) else end
+        bounds.append((group[0], batch_end, len(group)))
+    return bounds
+
+
+'''
+------------------------------------------------------------------------------------------
+'''
+def parse_parallel(parser, max_workers=None, min_decls=2):
+    """
+    Parses parser.tokens like parser.parse_tables(), parsing the main program and the top-level
+    function declarations in worker processes. Returns the same value as parser.parse_tables()
+    and leaves an identical syntax tree in parser.syntax_tree.
+    """
+    tokens = parser.tokens
+    tables = parser.dense_tables
+    starts = split_top_level_decls(tokens)
+    if (len(starts) < min_decls or parser.tracer is not None or any(parser.reduction_hooks)
+            or parser.hash_cons):
+        return parser.parse_tables()
+
+    nonterminal_ids = tables.nonterminal_ids
+    start_symbol, main_rhs = parser.grammar_rules[0].lhs, parser.grammar_rules[0].rhs
+    token_ids = array('i', tables.encode_tokens(tokens))
+    eof = len(tokens) - 1
+    if tokens[eof].type != 'EOF' or min(token_ids) < 0:
+        return parser.parse_tables()
+
+    # State every top-level DECL starts in: after MAIN GLOBVARS ALGO FUNCTIONS
+    state = tables.action[token_ids[0]] - 1
+    if state < 0:
+        return parser.parse_tables()
+    for symbol in main_rhs[1:]:
+        state = tables.goto[state * tables.n_nonterminals + nonterminal_ids[symbol]]
+        if state < 0:
+            return parser.parse_tables()
+    decl_state = state
+
+    max_workers = max_workers or os.cpu_count() or 1
+    bounds = batch_bounds(starts, eof, 4 * max_workers)
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=init_worker, initargs=(tables,)) as pool:
+            # Prefix: up to the reduction of the empty FUNCTIONS list (stack 0 MAIN GLOBVARS ALGO)
+            prefix = pool.submit(parse_segment_task, token_ids[:starts[0] + 1].tobytes(), 0,
+                                 nonterminal_ids[main_rhs[-1]], len(main_rhs), 1)
+            batches = [pool.submit(parse_segment_task, token_ids[start:end + 1].tobytes(), decl_state,
+                                   nonterminal_ids['DECL'], 1, count)
+                       for start, end, count in bounds]
+            prefix_arrays, prefix_results = prefix.result()
+            batch_results = [batch.result() for batch in batches]
+    except SyntaxError:
+        return parser.parse_tables()  # Report the error exactly like the sequential parser
+
+    tree = parser.syntax_tree
+    splice_segment(tree, prefix_arrays, 0)
+    top_level = prefix_results[0]  # MAIN, GLOBVARS, ALGO, FUNCTIONS
+    functions_node = top_level[-1]
+    for (start, _, _), (arrays, results) in zip(bounds, batch_results):
+        offset = splice_segment(tree, arrays, start)
+        tree.append_children(functions_node, [roots[0] + offset for roots in results])
+
+    root = tree.add_inner(nonterminal_ids[start_symbol], top_level)
+    tree.root = root
+    parser.current_token_index = eof
+    return parser.accept()
@@ -1,4 +1,13 @@
-import xml.etree.ElementTree as ET
+import os
+from tablegen import DenseTables, load_parsing_tables
+from syntaxtree import SyntaxTreeArena, NO_NODE
+from hashcons import HashConsedTree
+from xmlwriter import write_syntax_tree_xml
+from xmlreader import iter_token_stream_xml
+from binformat import is_binary_artifact, read_token_stream_binary, write_syntax_tree_binary
+from parsergen import parse_generated
+from descent import parse_descent
+from parallelparse import parse_parallel
 
 '''
 ===========================================================================================
@@ -32,67 +41,169 @@ class ProductionRule:
     def __repr__(self):
         return f"{self.lhs} -> {' '.join(self.rhs)}"
 
-class SyntaxTreeNode:
+
+'''
+===========================================================================================
+'''
+class ParseDiagnostic:
     """
-    Base class for nodes in the syntax tree.
+    A syntax error found while parsing with error recovery enabled.
     """
-    _id_counter = 0  # Class variable to assign unique IDs
-
-    def __init__(self):
-        self.unid = SyntaxTreeNode._id_counter
-        SyntaxTreeNode._id_counter += 1
-
-class RootNode(SyntaxTreeNode):
-    def __init__(self, symbol):
-        super().__init__()
-        self.symb = symbol
-        self.children = []
+    def __init__(self, token, expected, message):
+        self.line_num = token.line_num
+        self.col_num = token.col_num
+        self.token = token  # The offending lookahead token
+        self.expected = expected  # Token classes that were valid in the error state
+        self.message = message
 
-class InnerNode(SyntaxTreeNode):
-    def __init__(self, parent_unid, symbol):
-        super().__init__()
-        self.parent = parent_unid
-        self.symb = symbol
-        self.children = []
-
-class LeafNode(SyntaxTreeNode):
-    def __init__(self, parent_unid, token):
-        super().__init__()
-        self.parent = parent_unid
-        self.terminal = token  # Store the Token object
+    def __repr__(self):
+        return f"ParseDiagnostic(line {self.line_num}, col {self.col_num}, {self.token.type})"
 
 
 '''
 ===========================================================================================
 The SLR parser class that reads tokens from the XML file, parses the input, and constructs a parse tree.
+
+With error_recovery enabled the parser does not stop at the first syntax error. It records a
+ParseDiagnostic, pops states until one has a goto on a recovery non-terminal, discards input up
+to a synchronizing token that can follow that non-terminal, replaces everything it threw away
+with an ERROR node and carries on, so one run reports every syntax error.
 '''
-class SLRParser:
-    def __init__(self, xml_file, input_text, input_file):
-        SyntaxTreeNode._id_counter = 0
+SYNC_TOKENS = ('SEMICOLON', 'END', 'RBRACE', 'EOF')
+
+# Non-terminals an ERROR node may stand in for, most local first
+RECOVERY_NONTERMINALS = ('COMMAND', 'INSTRUC', 'ALGO', 'DECL', 'FUNCTIONS', 'GLOBVARS')
 
+# Errors closer than this many tokens to the last recovery point are not reported separately
+MIN_TOKENS_BETWEEN_ERRORS = 2
+
+ERROR_SYMBOL = 'ERROR'
+
+# Parse engines that build the syntax tree (all produce the same tree, see parse):
+#   'table'      the table-driven SLR loop
+#   'generated'  the specialized parser generated from the tables (parsergen.py)
+#   'descent'    the recursive-descent parser (descent.py)
+#   'parallel'   the table-driven loop over the top-level DECLs in worker processes (parallelparse.py)
+PARSE_ENGINES = ('table', 'generated', 'descent', 'parallel')
+
+
+class SLRParser:
+    def __init__(self, xml_file, input_text, input_file, tokens=None, tracer=None, error_recovery=False,
+                 engine='table', hash_cons=False):
+        if engine not in PARSE_ENGINES:
+            raise ValueError(f"Unknown parse engine {engine!r}, expected one of {PARSE_ENGINES}")
+        if hash_cons and error_recovery:
+            # ERROR nodes can stand in for a list and grow after they are interned
+            raise ValueError("hash_cons cannot be combined with error_recovery")
         self.input_file = input_file
-        self.tokens = self.load_tokens_from_xml(xml_file)
+        self.engine = engine  # See PARSE_ENGINES
+        # Tokens can be passed in directly (e.g. straight from the Lexer) instead of re-reading the XML
+        self.tokens = tokens if tokens is not None else self.load_tokens(xml_file)
         self.current_token_index = 0  # Keep track of which token we're parsing
         self.input_text = input_text  # Store the original input text
 
         # Parsing tables
         self.action_table = {}  # Action table for shift/reduce actions
         self.goto_table = {}    # Goto table for non-terminal transitions
+        self.dense_tables = None  # Integer-coded tables used by the parse loop
 
         # Grammar rules
         self.grammar_rules = []
 
-        self.stack = []  # Parser stack for handling shifts and reductions
+        self.stack = []  # Parser stack of states
+        self.tracer = tracer  # Optional ParseTracer (see parsetrace.py), None disables tracing
 
-        # Initialize parsing table and grammar rules
-        self.initialize_parsing_table()
+        # Error recovery (see SYNC_TOKENS / RECOVERY_NONTERMINALS)
+        self.error_recovery = error_recovery
+        self.diagnostics = []  # ParseDiagnostics collected during the parse
+        self.last_recovery_position = None  # Token index where the parser last resumed
+
+        # Syntax-directed reduction hooks (see on_reduce)
+        self.values = None  # Semantic value stack, parallel to node_stack while hooks are active
+        self.result = None  # Value synthesized for the start symbol
+
+        # Initialize grammar rules and the parsing table generated from them
         self.initialize_grammar_rules()
-        
-        # Initialize the syntax tree
-        self.syntax_tree_root = None
-        self.inner_nodes = []
-        self.leaf_nodes = []
+        self.initialize_parsing_table()
+        self.reduction_hooks = [None] * len(self.grammar_rules)  # Production number -> hook or None
+
+        # Initialize the syntax tree (UNIDs are indices into the arena arrays). With hash_cons
+        # the parser builds a HashConsedTree instead, sharing identical subtrees
+        self.hash_cons = hash_cons
+        self.syntax_tree = self.new_syntax_tree()
+        self.error_symbol = len(self.syntax_tree.symbol_names) - 1
 
+    def new_syntax_tree(self):
+        """
+        Returns an empty tree builder for the tokens (see hash_cons).
+        """
+        tables = self.dense_tables
+        symbol_names = tables.nonterminals + tables.terminals + [ERROR_SYMBOL]
+        if self.hash_cons:
+            list_symbols = {tables.prod_lhs[number] for number in range(len(self.grammar_rules))
+                            if tables.prod_is_list[number]}
+            return HashConsedTree(symbol_names, self.tokens, list_symbols)
+        return SyntaxTreeArena(symbol_names, self.tokens)
+
+    def expanded_syntax_tree(self):
+        """
+        Returns the syntax tree as a SyntaxTreeArena (expanding a hash-consed tree).
+        """
+        if isinstance(self.syntax_tree, HashConsedTree):
+            return self.syntax_tree.expand()
+        return self.syntax_tree
+
+    @property
+    def syntax_tree_root(self):
+        root = self.syntax_tree.root
+        return self.syntax_tree.node(root) if root != NO_NODE else None
+
+    @property
+    def inner_nodes(self):
+        """
+        Views of all inner nodes (including the root) in creation order.
+        """
+        return [self.syntax_tree.node(unid) for unid in self.syntax_tree.inner_unids()]
+
+    @property
+    def leaf_nodes(self):
+        """
+        Views of all leaf nodes in creation order.
+        """
+        return [self.syntax_tree.node(unid) for unid in self.syntax_tree.leaf_unids()]
+
+
+
+    '''
+    ------------------------------------------------------------------------------------------
+    '''
+    def on_reduce(self, target, callback):
+        """
+        Registers a syntax-directed hook run whenever the parser reduces by a production.
+        target is a production number or a non-terminal name (all of its productions).
+        The callback is called as callback(values, production_number, unid) with the values
+        of the right-hand side symbols (the Token for terminals) and the UNID of the new node,
+        and returns the value synthesized for the left-hand side. Productions without a hook
+        pass on the value of their first symbol (None for empty productions).
+        """
+        if isinstance(target, int):
+            production_numbers = [target]
+        else:
+            production_numbers = [number for number, rule in enumerate(self.grammar_rules) if rule.lhs == target]
+            if not production_numbers:
+                raise ValueError(f"No productions for non-terminal {target}")
+        for production_number in production_numbers:
+            self.reduction_hooks[production_number] = callback
+
+    def production_number(self, lhs, rhs):
+        """
+        Returns the number of the production lhs -> rhs, so hooks for a single production
+        do not depend on the order of the grammar rules.
+        """
+        for number, rule in enumerate(self.grammar_rules):
+            if rule.lhs == lhs and rule.rhs == list(rhs):
+                return number
+        raise ValueError(f"No production {lhs} -> {' '.join(rhs)}")
 
 
     '''
@@ -101,432 +212,11 @@ class SLRParser:
     def initialize_parsing_table(self):
         """
         Initialize the parsing table with the actions and goto entries.
-        You need to fill this method with the actual parsing table entries based on your grammar.
-        """
-
-        self.action_table = {
-            (0, 'MAIN'): ('shift', 1),
-            (0, 'EOF'): ('accept',), #added not according to generated table
-            (1, 'NUM_TYPE'): ('shift', 4),
-            (1, 'TEXT_TYPE'): ('shift', 5),
-            (1, 'BEGIN'): ('reduce',1),
-            (2, 'BEGIN'): ('shift',7),
-            (3, 'V'): ('shift',9),
-            (4, 'V'): ('reduce',3),
-            (5, 'V') : ('reduce',4),
-            (6, 'NUM_TYPE'): ('shift', 14),
-            (6, 'END'): ('reduce', 47),
-            (6, 'VOID'): ('shift', 15),
-            (6, 'EOF'): ('reduce', 47),
-            (7, 'V'): ('shift', 9),
-            (7, 'END'): ('reduce', 7),
-            (7, 'SKIP'): ('shift', 18),
-            (7, 'HALT'): ('shift', 19), 
-            (7, 'PRINT'): ('shift', 20),
-            (7, 'RETURN'): ('shift', 24),
-            (7, 'IF'): ('shift', 27),
-            (7, 'FNAME'): ('shift', 28),
-            (8, 'COMMA'): ('shift', 29),
-            (9, 'COMMA'): ('reduce',5),
-            (9, 'SEMICOLON'): ('reduce',5),
-            (9, 'INPUT_OP'): ('reduce', 5),
-            (9, 'ASSIGN'): ('reduce', 5),
-            (9, 'RPAREN'): ('reduce', 5),
-            #(10, 'EOF'): ('accept',),
-            (10, 'EOF'): ('reduce', 0),  # Reduce using Production 0: PROG -> MAIN GLOBVARS ALGO FUNCTIONS
-            (11, 'NUM_TYPE'): ('shift', 14),
-            (11, 'END'): ('reduce', 47),
-            (11, 'VOID'): ('shift', 15),
-            (11, 'EOF'): ('reduce',47),
-            (12, 'LBRACE'): ('shift', 33),
-            (13, 'FNAME'): ('shift', 28),
-            (14, 'FNAME'): ('reduce', 51),
-            (15, 'FNAME'): ('reduce', 52),
-            (16, 'END'): ('shift', 35),
-            (17, 'SEMICOLON'): ('shift', 36),
-            (18, 'SEMICOLON'): ('reduce', 9),
-            (19, 'SEMICOLON'): ('reduce', 10),
-            (20, 'V'): ('shift', 9),
-            (20, 'CONST_N'): ('shift', 40),
-            (20, 'CONST_T'): ('shift', 41),
-            (21, 'SEMICOLON'): ('reduce', 12),
-            (22, 'SEMICOLON'): ('reduce', 13),
-            (23, 'SEMICOLON'): ('reduce', 14),
-            (24, 'V'): ('shift', 9),
-            (24, 'CONST_N'): ('shift', 40),
-            (24, 'CONST_T'): ('shift', 41),
-            (24, 'SEMICOLON'): ('reduce', 15),
-            (25, 'INPUT_OP'): ('shift', 43),
-            (25, 'ASSIGN'): ('shift', 44),
-            (26, 'LPAREN'): ('shift', 45),
-            (27, 'NOT'): ('shift', 59),
-            (27, 'SQRT'): ('shift', 60),
-            (27, 'OR'): ('shift', 51),
-            (27, 'AND'): ('shift', 52),
-            (27, 'EQ'): ('shift', 53),
-            (27, 'GRT'): ('shift', 54),
-            (27, 'ADD'): ('shift', 55),
-            (27, 'SUB'): ('shift', 56),
-            (27, 'MUL'): ('shift', 57),
-            (27, 'DIV'): ('shift', 58),
-            (28, 'LPAREN'): ('reduce', 46),
-            (29, 'NUM_TYPE'): ('shift', 4),
-            (29, 'TEXT_TYPE'): ('shift', 5),
-            (29, 'BEGIN'): ('reduce', 1),
-            (30, 'END'): ('reduce', 48),
-            # (30, 'EOF'): ('reduce', 48),
-            # (30, 'EOF'): ('accept',),
-            (30, 'EOF'): ('reduce', 0),  # Reduce using Production 0: PROG -> MAIN GLOBVARS ALGO FUNCTIONS
-            (31, 'NUM_TYPE'): ('reduce', 49),
-            (31, 'END'): ('reduce', 49),
-            (31, 'VOID'): ('reduce', 49),
-            (31, 'EOF'): ('reduce', 49),
-            (32, 'NUM_TYPE'): ('shift', 4),
-            (32, 'TEXT_TYPE'): ('shift', 5),
-            (33, 'NUM_TYPE'): ('reduce', 54),
-            (33, 'TEXT_TYPE'): ('reduce', 54),
-            (34, 'LPAREN'): ('shift', 64),
-            (35, 'NUM_TYPE'): ('reduce', 6),
-            (35, 'SEMICOLON'): ('reduce', 6),
-            (35, 'ELSE'): ('reduce', 6),
-            (35, 'VOID'): ('reduce', 6),
-            (35, 'RBRACE'): ('reduce', 6),
-            (35, 'EOF'): ('reduce', 6),
-            (36, 'V'): ('shift', 9),
-            (36, 'END'): ('reduce', 7),
-            (36, 'SKIP'): ('shift', 18),
-            (36, 'HALT'): ('shift', 19),
-            (36, 'PRINT'): ('shift', 20),
-            (36, 'RETURN'): ('shift', 24),
-            (36, 'IF'): ('shift', 27),
-            (36, 'FNAME'): ('shift', 28),
-            (37, 'SEMICOLON'): ('reduce', 11),
-            (38, 'COMMA'): ('reduce', 16),
-            (38, 'SEMICOLON'): ('reduce', 16),
-            (38, 'RPAREN'): ('reduce', 16),
-            (39, 'COMMA'): ('reduce', 17),
-            (39, 'SEMICOLON'): ('reduce', 17),
-            (39, 'RPAREN'): ('reduce', 17),
-            (40, 'COMMA'): ('reduce', 18),
-            (40, 'SEMICOLON'): ('reduce', 18),
-            (40, 'RPAREN'): ('reduce', 18),
-            (41, 'COMMA'): ('reduce', 19),
-            (41, 'SEMICOLON'): ('reduce', 19),
-            (41, 'RPAREN'): ('reduce', 19),
-            (42, 'SEMICOLON'): ('reduce', 15),
-            (43, 'INPUT'): ('shift', 66),
-            (44, 'CONST_N'): ('shift', 40),  # Shifting when encountering a numeric constant (like 2)
-            (44, 'CONST_T'): ('shift', 41), 
-            (44, 'V'): ('shift', 9),
-            (44, 'NUM_TYPE'): ('shift', 40),
-            (44, 'TEXT_TYPE'): ('shift', 41),
-            (44, 'NOT'): ('shift', 59),
-            (44, 'SQRT'): ('shift', 60),
-            (44, 'OR'): ('shift', 51),
-            (44, 'AND'): ('shift', 52),
-            (44, 'EQ'): ('shift', 53),
-            (44, 'GRT'): ('shift', 54),
-            (44, 'ADD'): ('shift', 55),
-            (44, 'SUB'): ('shift', 56),
-            (44, 'MUL'): ('shift', 57),
-            (44, 'DIV'): ('shift', 58),
-            (44, 'FNAME'): ('shift', 28),
-            (45, 'V'): ('shift', 9),
-            (45, 'NUM_TYPE'): ('shift', 40),
-            (45, 'TEXT_TYPE'): ('shift', 41),
-            (45, 'CONST_N'): ('shift', 40),  # Shifting when encountering a numeric constant (like 2)
-            (45, 'CONST_T'): ('shift', 41),
-            (46, 'THEN'): ('shift', 74),
-            (47, 'THEN'): ('reduce', 31),
-            (48, 'THEN'): ('reduce', 32),
-            (49, 'LPAREN'): ('shift', 75),
-            (50, 'LPAREN'): ('shift', 76),
-            (51, 'LPAREN'): ('reduce', 38),
-            (52, 'LPAREN'): ('reduce', 39),
-            (53, 'LPAREN'): ('reduce', 40),
-            (54, 'LPAREN'): ('reduce', 41),
-            (55, 'LPAREN'): ('reduce', 42),
-            (56, 'LPAREN'): ('reduce', 43),
-            (57, 'LPAREN'): ('reduce', 44),
-            (58, 'LPAREN'): ('reduce', 45),
-            (59, 'LPAREN'): ('reduce', 36),
-            (60, 'LPAREN'): ('reduce', 37),
-            (61, 'BEGIN'): ('reduce', 2),
-            (62, 'BEGIN'): ('shift', 7),
-            (63, 'V'): ('shift', 9),
-            (64, 'V'): ('shift', 9),
-            (65, 'END'): ('reduce', 8),
-            (66, 'SEMICOLON'): ('reduce', 20),
-            (67, 'SEMICOLON'): ('reduce', 21),
-            (68, 'SEMICOLON'): ('reduce', 24),
-            (69, 'SEMICOLON'): ('reduce', 25),
-            (70, 'SEMICOLON'): ('reduce', 26),
-            (71, 'LPAREN'): ('shift', 80),
-            (72, 'LPAREN'): ('shift', 81),
-            (73, 'COMMA'): ('shift', 82),
-            (74, 'BEGIN'): ('shift', 7),
-            (75, 'V'): ('shift', 9),
-            (75, 'CONST_N'): ('shift', 40),
-            (75, 'CONST_T'): ('shift', 41),
-            (75, 'OR'): ('shift', 51),
-            (75, 'AND'): ('shift', 52),
-            (75, 'EQ'): ('shift', 53),
-            (75, 'GRT'): ('shift', 54),
-            (75, 'ADD'): ('shift', 55),
-            (75, 'SUB'): ('shift', 56),
-            (75, 'MUL'): ('shift', 57),
-            (75, 'DIV'): ('shift', 58),
-            (76, 'AND'): ('shift', 52),
-            (76, 'EQ'): ('shift', 53),
-            (76, 'GRT'): ('shift', 54),
-            (76, 'ADD'): ('shift', 55),
-            (76, 'SUB'): ('shift', 56),
-            (76, 'MUL'): ('shift', 57),
-            (76, 'DIV'): ('shift', 58),
-            (77, 'RBRACE'): ('shift', 89),
-            (78, 'COMMA'): ('shift', 90),
-            (79, 'COMMA'): ('shift', 91),
-            (80, 'V'): ('shift', 9),
-            (80, 'CONST_N'): ('shift', 40),
-            (80, 'CONST_T'): ('shift', 41),
-            (80, 'NOT'): ('shift', 59),
-            (80, 'SQRT'): ('shift', 60),
-            (80, 'OR'): ('shift', 51),
-            (80, 'AND'): ('shift', 52),
-            (80, 'EQ'): ('shift', 53),
-            (80, 'GRT'): ('shift', 54),
-            (80, 'ADD'): ('shift', 55),
-            (80, 'SUB'): ('shift', 56),
-            (80, 'MUL'): ('shift', 57),
-            (80, 'DIV'): ('shift', 58),
-            (81, 'V'): ('shift', 9),
-            (81, 'CONST_N'): ('shift', 40),
-            (81, 'CONST_T'): ('shift', 41),
-            (81, 'NOT'): ('shift', 59),
-            (81, 'SQRT'): ('shift', 60),
-            (81, 'OR'): ('shift', 51),
-            (81, 'AND'): ('shift', 52),
-            (81, 'EQ'): ('shift', 53),
-            (81, 'GRT'): ('shift', 54),
-            (81, 'ADD'): ('shift', 55),
-            (81, 'SUB'): ('shift', 56),
-            (81, 'MUL'): ('shift', 57),
-            (81, 'DIV'): ('shift', 58),
-            (82, 'V'): ('shift', 9),
-            (82, 'CONST_N'): ('shift', 40),
-            (82, 'CONST_T'): ('shift', 41),
-            (83, 'ELSE'): ('shift', 97),
-            (84, 'COMMA'): ('shift', 98),
-            (85, 'COMMA'): ('shift', 99),
-            (86, 'LPAREN'): ('shift', 100),
-            (87, 'RPAREN'): ('shift', 101),
-            (88, 'NUM_TYPE'): ('shift', 14),
-            (88, 'END'): ('reduce', 47),
-            (88, 'VOID'): ('shift', 15),
-            (88, 'EOF'): ('reduce', 47),
-            (89, 'NUM_TYPE'): ('reduce', 55),
-            (89, 'END'): ('reduce', 55),
-            (89, 'VOID'): ('reduce', 55),
-            (89, 'EOF'): ('reduce', 55),
-            (90, 'NUM_TYPE'): ('shift', 4),
-            (90, 'TEXT_TYPE'): ('shift', 5),
-            (91, 'V'): ('shift', 9),
-            (92, 'RPAREN'): ('shift', 106),
-            (93, 'COMMA'): ('reduce', 29),
-            (93, 'RPAREN'): ('reduce', 29),
-            (94, 'COMMA'): ('reduce', 30),
-            (94, 'RPAREN'): ('reduce', 30),
-            (95, 'COMMA'): ('shift', 107),
-            (96, 'COMMA'): ('shift', 108),
-            (97, 'BEGIN'): ('shift', 7),
-            (98, 'V'): ('shift', 9),
-            (98, 'CONST_N'): ('shift', 40),
-            (98, 'CONST_T'): ('shift', 41),
-            (99, 'OR'): ('shift', 51),
-            (99, 'AND'): ('shift', 52),
-            (99, 'EQ'): ('shift', 53),
-            (99, 'GRT'): ('shift', 54),
-            (99, 'ADD'): ('shift', 55),
-            (99, 'SUB'): ('shift', 56),
-            (99, 'MUL'): ('shift', 57),
-            (99, 'DIV'): ('shift', 58),
-            (100, 'V'): ('shift', 9),
-            (100, 'CONST_N'): ('shift', 40),
-            (100, 'CONST_T'): ('shift', 41),
-            (101, 'THEN'): ('reduce', 35),
-            (102, 'END'): ('shift', 112),
-            (103, 'END'): ('reduce', 57),
-            (104, 'V'): ('shift', 9),
-            (105, 'COMMA'): ('shift', 114),
-            (106, 'COMMA'): ('reduce', 27),
-            (106, 'SEMICOLON'): ('reduce', 27),
-            (106, 'RPAREN'): ('reduce', 27),
-            (107, 'V'): ('shift', 9),
-            (107, 'CONST_N'): ('shift', 40),
-            (107, 'CONST_T'): ('shift', 41),
-            (107, 'NOT'): ('shift', 59),
-            (107, 'SQRT'): ('shift', 60),
-            (107, 'OR'): ('shift', 51),
-            (107, 'AND'): ('shift', 52),
-            (107, 'EQ'): ('shift', 53),
-            (107, 'GRT'): ('shift', 54),
-            (107, 'ADD'): ('shift', 55),
-            (107, 'SUB'): ('shift', 56),
-            (107, 'MUL'): ('shift', 57),
-            (107, 'DIV'): ('shift', 58),
-            (108, 'V'): ('shift', 9),
-            (108, 'CONST_N'): ('shift', 40),
-            (108, 'CONST_T'): ('shift', 41),
-            (109, 'SEMICOLON'): ('reduce', 23),
-            (110, 'RPAREN'): ('shift', 117),
-            (111, 'RPAREN'): ('shift', 118),
-            (112, 'NUM_TYPE'): ('reduce', 53),
-            (112, 'END'): ('reduce', 53),
-            (112, 'VOID'): ('reduce', 53),
-            (112, 'EOF'): ('reduce', 53),
-            (113, 'COMMA'): ('shift', 119),
-            (114, 'V'): ('shift', 9),
-            (115, 'RPAREN'): ('shift', 121),
-            (116, 'RPAREN'): ('shift', 122),
-            (117, 'COMMA'): ('reduce', 33),
-            (117, 'RPAREN'): ('reduce', 33),
-            (117, 'THEN'): ('reduce', 33),
-            (118, 'THEN'): ('reduce', 34),
-            (119, 'NUM_TYPE'): ('shift', 4),
-            (119, 'TEXT_TYPE'): ('shift', 5),
-            (120, 'RPAREN'): ('shift', 124),
-            (121, 'COMMA'): ('reduce', 28),
-            (121, 'SEMICOLON'): ('reduce', 28),
-            (121, 'RPAREN'): ('reduce', 28),
-            (122, 'SEMICOLON'): ('reduce', 22),
-            (123, 'V'): ('shift', 9),
-            (124, 'LBRACE'): ('reduce', 50),
-            (125, 'COMMA'): ('shift', 126),
-            (126, 'BEGIN'): ('reduce', 56)
-        }
-
-
-        self.goto_table = {
-            (0 , 'PROG'): 1, #added not according to generated table
-            (1, 'GLOBVARS'): 2,
-            (1, 'VTYP'): 3,
-            (1, 'PROG'): 0, #added not according to generated table
-            (2, 'PROG'): 0, #added not according to generated table
-            (2, 'ALGO'): 6,
-            (3, 'VNAME'): 8,
-            (6, 'FUNCTIONS'):10,
-            (6, 'DECL'): 11,
-            (6, 'HEADER'): 12,
-            (6, 'FTYP'): 13,
-            (6, 'PROG'): 0, #added not according to generated table
-            (7, 'VNAME'): 25,
-            (7, 'INSTRUC'): 16,
-            (7, 'COMMAND'): 17,
-            (7, 'ASSIGN'): 21,
-            (7, 'CALL'): 22,
-            (7, 'BRANCH'): 23,
-            (7, 'FNAME'): 26,
-            (11, 'FUNCTIONS'): 30,
-            (11, 'DECL'): 11,
-            (11, 'HEADER'): 12,
-            (11, 'FTYP'): 13,
-            (12, 'BODY'): 31,
-            (12, 'PROLOG'): 32,
-            (13, 'FNAME'): 34,
-            (20, 'VNAME'): 38,
-            (20, 'ATOMIC'): 37,
-            (20, 'CONST'): 39, 
-            (24, 'VNAME'): 38,
-            (24, 'ATOMIC'): 42,
-            (24, 'CONST'): 39,
-            (27, 'COND'): 46,
-            (27, 'SIMPLE'): 47,
-            (27, 'COMPOSIT'): 48,
-            (27, 'UNOP'): 50,
-            (27, 'BINOP'): 49,
-            (29, 'GLOBVARS'): 61,
-            (29, 'VTYP'): 3,
-            (32, 'VTYP'): 63,
-            (32, 'LOCVARS'): 62,
-            (36, 'VNAME'): 25,
-            (36, 'INSTRUC'): 65,
-            (36, 'COMMAND'): 17,
-            (36, 'ASSIGN'): 21,
-            (36, 'CALL'): 22,
-            (36, 'BRANCH'): 23,
-            (36, 'FNAME'): 26,
-            (44, 'VNAME'): 38,
-            (44, 'ATOMIC'): 68,
-            (44, 'CONST'): 39,
-            (44, 'CALL'): 69,
-            (44, 'TERM'): 67,
-            (44, 'OP'): 70,
-            (44, 'UNOP'): 71,
-            (44, 'BINOP'): 72,
-            (44, 'FNAME'): 26,
-            (45, 'VNAME'): 38,
-            (45, 'ATOMIC'): 73,
-            (45, 'CONST'): 39,
-            (62, 'ALGO'): 77,
-            (63, 'VNAME'): 78,
-            (64, 'VNAME'): 79,
-            (74, 'ALGO'): 83,
-            (75, 'VNAME'): 38,
-            (75, 'ATOMIC'): 84,
-            (75, 'CONST'): 39,
-            (75, 'SIMPLE'): 85,
-            (75, 'BINOP'): 86,
-            (76, 'SIMPLE'): 87,
-            (76, 'BINOP'): 86,
-            (77, 'EPILOG'): 88, 
-            (80, 'VNAME'): 38,
-            (80, 'ATOMIC'): 93,
-            (80, 'CONST'): 39,
-            (80, 'OP'): 94,
-            (80, 'ARG'): 92,
-            (80, 'UNOP'): 71,
-            (80, 'BINOP'): 72,
-            (81, 'VNAME'): 38,
-            (81, 'ATOMIC'): 93,
-            (81, 'CONST'): 39,
-            (81, 'OP'): 94,
-            (81, 'ARG'): 95,
-            (81, 'UNOP'): 71,
-            (81, 'BINOP'): 72,
-            (82, 'VNAME'): 38,
-            (82, 'CONST'): 39,
-            (82, 'ATOMIC'): 96,
-            (88, 'FUNCTIONS'): 103,
-            (88, 'DECL'): 11,
-            (88, 'HEADER'): 12,
-            (88, 'FTYP'): 13,
-            (88, 'SUBFUNCS'): 102,
-            (90, 'VTYP'): 104,
-            (91, 'VNAME'): 105,
-            (97, 'ALGO'): 109,
-            (98, 'VNAME'): 38,
-            (98, 'ATOMIC'): 110,
-            (98, 'CONST'): 39,
-            (99, 'SIMPLE'): 111,
-            (99, 'BINOP'): 86,
-            (100, 'VNAME'): 38,
-            (100, 'ATOMIC'): 84,
-            (100, 'CONST'): 39,
-            (104, 'VNAME'): 113,
-            (107, 'VNAME'): 38,
-            (107, 'ATOMIC'): 93,
-            (107, 'CONST'): 39,
-            (107, 'OP'): 94,
-            (107, 'ARG'): 115,
-            (107, 'UNOP'): 71,
-            (107, 'BINOP'): 72,
-            (108, 'VNAME'): 38,
-            (108, 'ATOMIC'): 116,
-            (108, 'CONST'): 39,
-            (114, 'VNAME'): 120,
-            (119, 'VTYP'): 123,
-            (123, 'VNAME') : 125,
-        }
+        The tables are generated from the grammar rules (see tablegen.py) and cached on disk,
+        so this is a cheap load unless the grammar has changed.
+        """
+        self.action_table, self.goto_table = load_parsing_tables(self.grammar_rules)
+        self.dense_tables = DenseTables(self.action_table, self.goto_table, self.grammar_rules)
 
 
     '''
@@ -545,8 +235,8 @@ class SLRParser:
             # Production 1 (epsilon production)
             ProductionRule('GLOBVARS', []),
             
-            # Production 2
-            ProductionRule('GLOBVARS', ['VTYP', 'VNAME', 'COMMA', 'GLOBVARS']),
+            # Production 2 (left-recursive list, built as one flat GLOBVARS node)
+            ProductionRule('GLOBVARS', ['GLOBVARS', 'VTYP', 'VNAME', 'COMMA']),
             
             # Production 3
             ProductionRule('VTYP', ['NUM_TYPE']),
@@ -563,8 +253,8 @@ class SLRParser:
             # Production 7 (epsilon production)
             ProductionRule('INSTRUC', []),
             
-            # Production 8
-            ProductionRule('INSTRUC', ['COMMAND', 'SEMICOLON', 'INSTRUC']),
+            # Production 8 (left-recursive list, built as one flat INSTRUC node)
+            ProductionRule('INSTRUC', ['INSTRUC', 'COMMAND', 'SEMICOLON']),
             
             # Production 9
             ProductionRule('COMMAND', ['SKIP']),
@@ -603,7 +293,7 @@ class SLRParser:
             ProductionRule('ASSIGN', ['VNAME', 'INPUT_OP', 'INPUT']),
             
             # Production 21
-            ProductionRule('ASSIGN', ['VNAME', 'ASSIGN', 'TERM']),
+            ProductionRule('ASSIGN', ['VNAME', 'ASSIGN_OP', 'TERM']),
             
             # Production 22
             ProductionRule('CALL', ['FNAME', 'LPAREN', 'ATOMIC', 'COMMA', 'ATOMIC', 'COMMA', 'ATOMIC', 'RPAREN']),
@@ -683,8 +373,8 @@ class SLRParser:
             # Production 47 (epsilon production)
             ProductionRule('FUNCTIONS', []),
             
-            # Production 48
-            ProductionRule('FUNCTIONS', ['DECL', 'FUNCTIONS']),
+            # Production 48 (left-recursive list, built as one flat FUNCTIONS node)
+            ProductionRule('FUNCTIONS', ['FUNCTIONS', 'DECL']),
             
             # Production 49
             ProductionRule('DECL', ['HEADER', 'BODY']),
@@ -718,24 +408,38 @@ class SLRParser:
     '''
     ------------------------------------------------------------------------------------------
     '''
+    def load_tokens(self, token_file):
+        """
+        Load tokens from either a binary token stream (see binformat.py) or an XML file.
+        """
+        if is_binary_artifact(token_file):
+            return self.load_tokens_from_binary(token_file)
+        return self.load_tokens_from_xml(token_file)
+
+    def load_tokens_from_binary(self, binary_file):
+        """
+        Load tokens from a binary token stream file and return a list of Token objects.
+        """
+        tokens = read_token_stream_binary(binary_file)
+
+        # Make sure the EOF token ('$') is there to signal the end of input
+        if not tokens or tokens[-1].type != 'EOF':
+            line_num, col_num = (tokens[-1].line_num, tokens[-1].col_num) if tokens else (1, 1)
+            tokens.append(Token('EOF', '$', line_num, col_num))
+
+        return tokens
+
     def load_tokens_from_xml(self, xml_file):
         """
         Load tokens from an XML file and return a list of Token objects.
+        The file is streamed (see xmlreader.py), so the XML tree is never held in memory.
         """
-        tokens = []
-        tree = ET.parse(xml_file)
-        root = tree.getroot()
+        tokens = list(iter_token_stream_xml(xml_file))
 
-        for tok in root.findall('TOK'):
-            token_id = int(tok.find('ID').text)
-            token_class = tok.find('CLASS').text
-            token_value = tok.find('WORD').text
-            line_num = int(tok.find('LINE').text)  # Read line number from XML
-            col_num = int(tok.find('COL').text)    # Read column number from XML
-            tokens.append(Token(token_class, token_value, line_num, col_num))
-
-        # Append the EOF token ('$') to signal the end of input
-        tokens.append(Token('EOF', '$', line_num, col_num))
+        # Make sure the EOF token ('$') is there to signal the end of input
+        if not tokens or tokens[-1].type != 'EOF':
+            line_num, col_num = (tokens[-1].line_num, tokens[-1].col_num) if tokens else (1, 1)
+            tokens.append(Token('EOF', '$', line_num, col_num))
 
         return tokens
 
@@ -766,152 +470,258 @@ class SLRParser:
     '''
     def parse(self):
         """
-        Main parsing function. Uses the parsing table and grammar rules to construct a parse tree.
+        Main parsing function. Parses the tokens with the selected engine. The generated,
+        descent and parallel engines build the same tree as the table-driven loop and hand
+        syntax errors, tracing, hooks and error recovery over to it.
+        """
+        if self.engine == 'generated':
+            return parse_generated(self)
+        if self.engine == 'descent':
+            return parse_descent(self)
+        if self.engine == 'parallel':
+            return parse_parallel(self)
+        return self.parse_tables()
+
+    def parse_tables(self):
         """
+        Table-driven parse loop. Uses the parsing table and grammar rules to construct a parse tree.
+
+        The loop works on the integer-coded tables only: token classes are mapped to terminal
+        IDs up front, actions are signed ints (see DenseTables) and the stack holds states only.
+        """
+        tables = self.dense_tables
+        action = tables.action
+        goto = tables.goto
+        n_terminals = tables.n_terminals
+        n_nonterminals = tables.n_nonterminals
+        prod_lhs = tables.prod_lhs
+        prod_len = tables.prod_len
+        prod_is_list = tables.prod_is_list
+        accept_code = tables.accept_code
+        start_symbol = tables.nonterminal_ids[self.grammar_rules[0].lhs]
+        nonterminals = tables.nonterminals
+        tracer = self.tracer
+        tree = self.syntax_tree
+        add_leaf = tree.add_leaf
+        add_inner = tree.add_inner
+        append_children = tree.append_children
+
+        tokens = self.tokens
+        token_ids = tables.encode_tokens(tokens)
+        position = self.current_token_index
+
         # Initialize stack with state 0
-        self.stack = [0]
-        self.node_stack = []
+        self.stack = stack = [0]
+        self.node_stack = node_stack = []
 
-        while True:
-            state = self.stack[-1]  # Current state is on top of the stack
-            token = self.current_token()  # Lookahead token
+        # The value stack is only kept when hooks are registered
+        hooks = self.reduction_hooks
+        self.values = values = [] if any(hooks) else None
 
-            if token is None:
+        while True:
+            state = stack[-1]  # Current state is on top of the stack
+            if position >= len(tokens):
                 # Should not happen as EOF token is added
                 raise SyntaxError("Unexpected end of input.")
-
-            # Get the action from the action table using token type instead of token_class
-            action = self.action_table.get((state, token.type))
-
-            if action is None:
-                # Parsing error: Provide more detailed information about the token's location
-                line_num = token.line_num
-                col_num = token.col_num
-                line_text = self.get_line_text(line_num)
-                underline = ' ' * (col_num - 1) + '^'
-                error_message = (
-                    f"Parsing error at line {line_num}, column {col_num}:\n"
-                    f"{line_text}\n"
-                    f"{underline}\n"
-                    f"Unexpected token {token.value} ({token.type})"
-                )
-                raise SyntaxError(error_message)
-
-            if action[0] == 'accept':
-                if self.syntax_tree_root is None:
-                    if len(self.node_stack) == 1:
-                        self.syntax_tree_root = self.node_stack.pop()
+            token = tokens[position]  # Lookahead token
+            terminal = token_ids[position]
+
+            code = action[state * n_terminals + terminal] if terminal >= 0 else 0
+
+            if code == 0:
+                self.current_token_index = position
+                if not self.error_recovery:
+                    self.raise_syntax_error(token)
+                position = self.recover(position, token_ids)
+                if position is None:
+                    return False
+                continue
+
+            if code == accept_code:
+                self.current_token_index = position
+                if tree.root == NO_NODE:
+                    if len(node_stack) == 1:
+                        tree.root = node_stack.pop()
+                        if values is not None:
+                            self.result = values.pop()
                     else:
                         raise Exception("Parser error: syntax_tree_root is None and node stack has unexpected size.")
-                
-                # Parsing completed successfully.
-                print("Parsing completed successfully.")
-
-                # Generate the syntax tree XML
-                import os
-                input_filename = os.path.basename(self.input_file)
-                output_filename = os.path.splitext(input_filename)[0] + '_syntaxtree.xml'
-                output_folder = 'outputs'
-                os.makedirs(output_folder, exist_ok=True)
-                output_file_path = os.path.join(output_folder, output_filename)
-                self.generate_syntax_tree_xml(output_file_path)
-
-                return True
+                return self.accept()
 
-
-            # Print the current state, token, and action on the same line
-            print(f"State: {state}, Current token: {token}, Action: {action}")
-
-            if action[0] == 'shift':
+            if code > 0:
                 # Shift action
-                next_state = action[1]
-                self.stack.append(token.type)  # Push the token type (terminal symbol)
-                self.stack.append(next_state)  # Push the next state
-                self.advance_token()           # Move to the next token
-                # Create a leaf node for the shifted token
-                # Create a leaf node for the shifted token
-                leaf_node = LeafNode(None, token)  # Parent will be set during reduction
-                self.leaf_nodes.append(leaf_node)
-                # Push the leaf node onto the node stack
-                self.node_stack.append(leaf_node)
-
-            elif action[0] == 'reduce':
-                # Reduce action
-                production_number = action[1]
-                production = self.grammar_rules[production_number]
-
-                # Pop 2 * len(rhs) items from stack (symbol and state for each symbol)
-                pop_length = 2 * len(production.rhs)
-                for _ in range(pop_length):
-                    self.stack.pop()
-                    
-                # Collect the child nodes for this production
-                rhs_length = len(production.rhs)
-                children_nodes = self.node_stack[-rhs_length:] if rhs_length > 0 else []
-                # Remove the child nodes from the node stack
-                self.node_stack = self.node_stack[:-rhs_length] if rhs_length > 0 else self.node_stack
-
-                # Create an inner node for the production
-                current_state = self.stack[-1]  # The current state after popping
-
-                # Create an inner node for the production
-                inner_node = InnerNode(None, production.lhs)
-                # Assign the UNIDs of the child nodes
-                inner_node.children = [child.unid for child in children_nodes]
-                self.inner_nodes.append(inner_node)
-
-                # Set the parent UNID of child nodes
-                for child in children_nodes:
-                    child.parent = inner_node.unid
-
-                # Push the inner node onto the node stack
-                self.node_stack.append(inner_node)
-
-                # **Do not set the parent of inner_node here**
-
-                # If the production is for PROG, set it as the root and accept
-                if production.lhs == 'PROG':
-                    self.syntax_tree_root = inner_node
-                    print("Syntax tree root set to PROG node with UNID:", self.syntax_tree_root.unid)
-                    print("Parsing completed successfully.")
-
-                    # Generate the syntax tree XML
-                    import os
-                    input_filename = os.path.basename(self.input_file)
-                    output_filename = os.path.splitext(input_filename)[0] + '_syntaxtree.xml'
-                    output_folder = 'outputs'
-                    os.makedirs(output_folder, exist_ok=True)
-                    output_file_path = os.path.join(output_folder, output_filename)
-                    self.generate_syntax_tree_xml(output_file_path)
-                    return True
-
-                self.stack.append(production.lhs)
-
-                # Get the next state from the goto table
-                current_state = self.stack[-2]  # The state before the LHS symbol
-                goto_state = self.goto_table.get((current_state, production.lhs))
-                if goto_state is None:
-                    # If we just reduced to PROG and are in State 0, accept the input
-                    if production.lhs == 'PROG' and current_state == 0:
-                        # Accept the input
-                        self.syntax_tree_root = inner_node
-                        print("Syntax tree root set to PROG node with UNID:", self.syntax_tree_root.unid)
-                        print("Parsing completed successfully.")
-                        # Generate the syntax tree XML
-                        import os
-                        input_filename = os.path.basename(self.input_file)
-                        output_filename = os.path.splitext(input_filename)[0] + '_syntaxtree.xml'
-                        output_folder = 'outputs'
-                        os.makedirs(output_folder, exist_ok=True)
-                        output_file_path = os.path.join(output_folder, output_filename)
-                        self.generate_syntax_tree_xml(output_file_path)
-                        return True
-                    else:
-                        # Goto error
-                        raise SyntaxError(f"Goto error for state {current_state} and non-terminal {production.lhs}")
+                if tracer is not None:
+                    tracer.shift(state, position, token.type, code - 1)
+                stack.append(code - 1)  # Push the next state
+                position += 1           # Move to the next token
+                # Create a leaf node for the shifted token (parent is set during reduction)
+                node_stack.append(add_leaf(n_nonterminals + terminal, position - 1))
+                if values is not None:
+                    values.append(token)
+                continue
+
+            # Reduce action
+            production_number = -code - 1
+            rhs_length = prod_len[production_number]
+            lhs = prod_lhs[production_number]
+
+            # Create an inner node for the production and attach the popped child nodes.
+            # Left-recursive list productions append to the existing list node instead.
+            if prod_is_list[production_number]:
+                inner_node = node_stack[-rhs_length]
+                append_children(inner_node, node_stack[1 - rhs_length:])
+                del node_stack[-rhs_length:]
+                del stack[-rhs_length:]
+            elif rhs_length:
+                inner_node = add_inner(lhs, node_stack[-rhs_length:])
+                del node_stack[-rhs_length:]
+                del stack[-rhs_length:]
+            else:
+                inner_node = add_inner(lhs, ())
+
+            if values is not None:
+                child_values = values[-rhs_length:] if rhs_length else []
+                if rhs_length:
+                    del values[-rhs_length:]
+                hook = hooks[production_number]
+                if hook is not None:
+                    values.append(hook(child_values, production_number, inner_node))
                 else:
-                    self.stack.append(goto_state)
+                    values.append(child_values[0] if child_values else None)
+
+            # If the production is for PROG, set it as the root and accept
+            if lhs == start_symbol:
+                if tracer is not None:
+                    tracer.reduce(state, production_number, -1)
+                self.current_token_index = position
+                tree.root = inner_node
+                if values is not None:
+                    self.result = values.pop()
+                return self.accept()
+
+            node_stack.append(inner_node)
+
+            # Get the next state from the goto table
+            goto_state = goto[stack[-1] * n_nonterminals + lhs]
+            if goto_state < 0:
+                raise SyntaxError(f"Goto error for state {stack[-1]} and non-terminal {nonterminals[lhs]}")
+            if tracer is not None:
+                tracer.reduce(state, production_number, goto_state)
+            stack.append(goto_state)
+
+
+    def recover(self, position, token_ids):
+        """
+        Panic-mode recovery from a syntax error at token position. Records a diagnostic,
+        then finds the first synchronizing token at or after position that some recovery
+        non-terminal on the stack can be followed by. The stack is popped down to that state,
+        the popped nodes and skipped tokens become the children of an ERROR node standing in
+        for the non-terminal, and the position to resume at is returned (None if the parser
+        cannot resynchronize before the end of input).
+        """
+        tables = self.dense_tables
+        action = tables.action
+        goto = tables.goto
+        n_terminals = tables.n_terminals
+        n_nonterminals = tables.n_nonterminals
+        tokens = self.tokens
+        stack = self.stack
+        node_stack = self.node_stack
+        state = stack[-1]
+
+        # Report the error unless it is fallout from the previous recovery
+        last = self.last_recovery_position
+        if last is None or position - last >= MIN_TOKENS_BETWEEN_ERRORS:
+            token = tokens[position]
+            expected = tables.expected_by_state[state]
+            message = self.format_syntax_error(token) + f"\nExpected one of: {', '.join(expected)}"
+            self.diagnostics.append(ParseDiagnostic(token, expected, message))
+
+        # Stack depths (top first) with a goto on a recovery non-terminal
+        candidates = []
+        for depth in range(len(stack) - 1, -1, -1):
+            for name in RECOVERY_NONTERMINALS:
+                goto_state = goto[stack[depth] * n_nonterminals + tables.nonterminal_ids[name]]
+                if goto_state >= 0:
+                    candidates.append((depth, goto_state))
+
+        # Resuming where the last recovery resumed made no progress, so skip at least one token
+        scan = position + 1 if position == last else position
+        while scan < len(tokens):
+            terminal = token_ids[scan]
+            if terminal >= 0 and tokens[scan].type in SYNC_TOKENS:
+                for depth, goto_state in candidates:
+                    if action[goto_state * n_terminals + terminal] != 0:
+                        return self.resume(depth, goto_state, position, scan, token_ids)
+            scan += 1
+
+        self.current_token_index = len(tokens) - 1
+        return None
+
+    def resume(self, depth, goto_state, position, scan, token_ids):
+        """
+        Pops the stack down to depth, wraps the popped nodes and the tokens in
+        [position, scan) in an ERROR node, pushes it with goto_state and returns scan.
+        """
+        tree = self.syntax_tree
+        n_nonterminals = self.dense_tables.n_nonterminals
+
+        children = self.node_stack[depth:]
+        for index in range(position, scan):
+            terminal = token_ids[index]
+            symbol = n_nonterminals + terminal if terminal >= 0 else self.error_symbol
+            children.append(tree.add_leaf(symbol, index))
+
+        del self.node_stack[depth:]
+        del self.stack[depth + 1:]
+        self.node_stack.append(tree.add_inner(self.error_symbol, children))
+        if self.values is not None:
+            # ERROR nodes have no value
+            del self.values[depth:]
+            self.values.append(None)
+        self.stack.append(goto_state)
+        self.last_recovery_position = scan
+        self.current_token_index = scan
+        return scan
+
+    def format_syntax_error(self, token):
+        """
+        Formats a syntax error message pointing at the offending token in the source text.
+        """
+        line_num = token.line_num
+        col_num = token.col_num
+        line_text = self.get_line_text(line_num)
+        underline = ' ' * (col_num - 1) + '^'
+        return (
+            f"Parsing error at line {line_num}, column {col_num}:\n"
+            f"{line_text}\n"
+            f"{underline}\n"
+            f"Unexpected token {token.value} ({token.type})"
+        )
+
+    def raise_syntax_error(self, token):
+        """
+        Raises a SyntaxError pointing at the offending token in the source text.
+        """
+        raise SyntaxError(self.format_syntax_error(token))
+
+
+    def accept(self):
+        """
+        Finishes a successful parse and writes the syntax tree XML to the outputs folder.
+        Returns False without either when error recovery collected syntax errors.
+        """
+        if self.diagnostics:
+            return False
+        print("Parsing completed successfully.")
 
+        input_filename = os.path.basename(self.input_file)
+        output_filename = os.path.splitext(input_filename)[0] + '_syntaxtree.xml'
+        output_folder = 'outputs'
+        os.makedirs(output_folder, exist_ok=True)
+        output_file_path = os.path.join(output_folder, output_filename)
+        self.generate_syntax_tree_xml(output_file_path)
+        return True
 
 
     def get_line_text(self, line_num):
@@ -924,54 +734,13 @@ class SLRParser:
         return ""
     
     def generate_syntax_tree_xml(self, output_file):
-        import xml.etree.ElementTree as ET
-        import xml.dom.minidom
-
-        # Create the root element
-        syntree = ET.Element('SYNTREE')
-
-        # Root node
-        root_elem = ET.SubElement(syntree, 'ROOT')
-        ET.SubElement(root_elem, 'UNID').text = str(self.syntax_tree_root.unid)
-        ET.SubElement(root_elem, 'SYMB').text = self.syntax_tree_root.symb
-        children_elem = ET.SubElement(root_elem, 'CHILDREN')
-        for child_id in self.syntax_tree_root.children:
-            ET.SubElement(children_elem, 'ID').text = str(child_id)
-
-        # Inner nodes
-        innernodes_elem = ET.SubElement(syntree, 'INNERNODES')
-        for inner_node in self.inner_nodes:
-            in_elem = ET.SubElement(innernodes_elem, 'IN')
-            ET.SubElement(in_elem, 'PARENT').text = str(inner_node.parent)
-            ET.SubElement(in_elem, 'UNID').text = str(inner_node.unid)
-            ET.SubElement(in_elem, 'SYMB').text = inner_node.symb
-            children_elem = ET.SubElement(in_elem, 'CHILDREN')
-            for child_id in inner_node.children:
-                ET.SubElement(children_elem, 'ID').text = str(child_id)
-
-        # Leaf nodes
-        leafnodes_elem = ET.SubElement(syntree, 'LEAFNODES')
-        for leaf_node in self.leaf_nodes:
-            leaf_elem = ET.SubElement(leafnodes_elem, 'LEAF')
-            ET.SubElement(leaf_elem, 'PARENT').text = str(leaf_node.parent)
-            ET.SubElement(leaf_elem, 'UNID').text = str(leaf_node.unid)
-            # Terminal
-            terminal_elem = ET.SubElement(leaf_elem, 'TERMINAL')
-            ET.SubElement(terminal_elem, 'ID').text = str(leaf_node.terminal.type)
-            ET.SubElement(terminal_elem, 'CLASS').text = leaf_node.terminal.type
-            ET.SubElement(terminal_elem, 'WORD').text = leaf_node.terminal.value
-            ET.SubElement(terminal_elem, 'LINE').text = str(leaf_node.terminal.line_num)
-            ET.SubElement(terminal_elem, 'COL').text = str(leaf_node.terminal.col_num)
-
-        # Convert the ElementTree to a string
-        xml_string = ET.tostring(syntree, encoding='utf-8')
-
-        # Parse the string with minidom for pretty-printing
-        dom = xml.dom.minidom.parseString(xml_string)
-        pretty_xml_as_string = dom.toprettyxml(indent="    ")
-
-        # Write the pretty-printed XML to the file
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(pretty_xml_as_string)
-
+        """
+        Writes the syntax tree XML, streaming it straight from the node arena.
+        """
+        write_syntax_tree_xml(self.expanded_syntax_tree(), output_file)
 
+    def generate_syntax_tree_binary(self, output_file):
+        """
+        Writes the syntax tree (and its tokens) in the compact binary format.
+        """
+        write_syntax_tree_binary(self.expanded_syntax_tree(), output_file)
@@ -0,0 +1,391 @@
+import os
+import types
+import importlib.util
+from tablegen import grammar_hash, write_file_atomically
+from syntaxtree import NO_NODE
+
+'''
+===========================================================================================
+Specialized parser generator.
+
+generate_parser_source() turns the SLR(1) automaton into the source of a Python module with
+one parse(token_ids, tree) function that has the tables compiled into its code:
+    - the current state is dispatched with a binary search of if/else on the state number,
+      and each state block tests the lookahead terminal ID against int constants
+    - every reduce is emitted inline for its production, so the RHS length, the LHS symbol,
+      the child linking and (where the target is unique) the goto state are constants
+    - the node and state stacks hold plain ints; nothing allocates a tuple or a slice
+    - a state whose only reduce is not the start production reduces by default (on any
+      lookahead without a shift), like yacc, which skips the lookahead test for about half
+      of the states. An error is still caught before the next shift, at the same token.
+The generated parse() builds the same arena as SLRParser.parse_tables() (same UNIDs, same
+flat list nodes) and returns the root UNID, or NO_NODE on a syntax error.
+
+load_generated_parser() caches the module source next to the parser modules, keyed by the
+grammar hash like the table cache, and parse_generated() runs it for an SLRParser, falling
+back to the table-driven loop for tracing, hooks, error recovery, hash-consed trees and
+syntax errors.
+===========================================================================================
+'''
+
+# Bump whenever the generated code changes shape
+GENERATOR_VERSION = 1
+
+# Default cache location, next to the parser modules
+DEFAULT_CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'slr_parser_generated.py')
+
+
+class SourceWriter:
+    """
+    Collects indented source lines.
+    """
+    def __init__(self):
+        self.lines = []
+        self.depth = 0
+
+    def line(self, text=""):
+        self.lines.append("    " * self.depth + text if text else "")
+
+    def source(self):
+        return "\n".join(self.lines) + "\n"
+
+
+def terminal_test(terminal_ids):
+    """
+    Returns the condition matching the lookahead t against a group of terminal IDs.
+    """
+    if len(terminal_ids) == 1:
+        return f"t == {terminal_ids[0]}"
+    return "t in {" + ", ".join(str(terminal_id) for terminal_id in terminal_ids) + "}"
+
+
+'''
+------------------------------------------------------------------------------------------
+'''
+class ParserGenerator:
+    def __init__(self, tables, grammar_rules):
+        self.tables = tables
+        self.grammar_rules = grammar_rules
+        self.start_symbol = tables.nonterminal_ids[grammar_rules[0].lhs]
+        self.out = SourceWriter()
+
+        # Goto targets per nonterminal: state -> target
+        self.gotos = [{} for _ in range(tables.n_nonterminals)]
+        for state in range(tables.n_states):
+            for nonterminal in range(tables.n_nonterminals):
+                target = tables.goto[state * tables.n_nonterminals + nonterminal]
+                if target >= 0:
+                    self.gotos[nonterminal][state] = target
+
+    def row(self, state):
+        """
+        Returns the action codes of a state grouped as {code: [terminal IDs]}, in terminal order.
+        """
+        tables = self.tables
+        groups = {}
+        for terminal in range(tables.n_terminals):
+            code = tables.action[state * tables.n_terminals + terminal]
+            if code != 0 and code != tables.accept_code:
+                groups.setdefault(code, []).append(terminal)
+        return groups
+
+    def default_reduce(self, groups):
+        """
+        Returns the action code reduced by default in a state, or None.
+        """
+        reduces = [code for code in groups if code < 0]
+        if len(reduces) == 1 and self.tables.prod_lhs[-reduces[0] - 1] != self.start_symbol:
+            return reduces[0]
+        return None
+
+    '''
+    ------------------------------------------------------------------------------------------
+    '''
+    def generate(self):
+        tables = self.tables
+        out = self.out
+        out.line("'''")
+        out.line("Specialized SLR(1) parser generated by parsergen.py. Do not edit.")
+        out.line("'''")
+        out.line()
+        out.line(f"GENERATOR_VERSION = {GENERATOR_VERSION}")
+        out.line(f"GRAMMAR_HASH = {grammar_hash(self.grammar_rules)!r}")
+        out.line()
+        for nonterminal, targets in enumerate(self.gotos):
+            if len(set(targets.values())) > 1:
+                entries = [targets.get(state, -1) for state in range(tables.n_states)]
+                out.line(f"GOTO_{tables.nonterminals[nonterminal]} = ({', '.join(map(str, entries))})")
+        out.line()
+        out.line()
+        out.line("def parse(token_ids, tree):")
+        out.depth += 1
+        out.line("symbol = tree.symbol")
+        out.line("parent = tree.parent")
+        out.line("first_child = tree.first_child")
+        out.line("next_sibling = tree.next_sibling")
+        out.line("last_child = tree.last_child")
+        for name in ('symbol', 'parent', 'first_child', 'next_sibling', 'token'):
+            out.line(f"{name}_append = tree.{name}.append")
+        for nonterminal, targets in enumerate(self.gotos):
+            if len(set(targets.values())) > 1:
+                name = tables.nonterminals[nonterminal]
+                out.line(f"goto_{name} = GOTO_{name}")
+        out.line("stack = []  # States below the current one")
+        out.line("stack_append = stack.append")
+        out.line("stack_pop = stack.pop")
+        out.line("nodes = []")
+        out.line("nodes_append = nodes.append")
+        out.line("nodes_pop = nodes.pop")
+        out.line("unid = len(symbol)")
+        out.line("position = 0")
+        out.line("t = token_ids[0]")
+        out.line("state = 0")
+        out.line("while True:")
+        out.depth += 1
+        self.dispatch(0, tables.n_states)
+        return out.source()
+
+    def dispatch(self, low, high):
+        """
+        Emits a binary search over the states low..high-1.
+        """
+        out = self.out
+        if high - low == 1:
+            self.state_block(low)
+            return
+        middle = (low + high) // 2
+        out.line(f"if state < {middle}:")
+        out.depth += 1
+        self.dispatch(low, middle)
+        out.depth -= 1
+        out.line("else:")
+        out.depth += 1
+        self.dispatch(middle, high)
+        out.depth -= 1
+
+    def state_block(self, state):
+        out = self.out
+        groups = self.row(state)
+        default = self.default_reduce(groups)
+        out.line(f"# State {state}")
+        first = True
+        for code, terminal_ids in groups.items():
+            if code == default:
+                continue
+            out.line(f"{'if' if first else 'elif'} {terminal_test(terminal_ids)}:")
+            first = False
+            out.depth += 1
+            if code > 0:
+                self.shift(state, code - 1, terminal_ids)
+            else:
+                self.reduce(state, -code - 1)
+            out.depth -= 1
+        if default is not None:
+            if not first:
+                out.line("else:")
+                out.depth += 1
+            self.reduce(state, -default - 1)
+            if not first:
+                out.depth -= 1
+        else:
+            if not first:
+                out.line("else:")
+                out.depth += 1
+            out.line(f"return {NO_NODE}")
+            if not first:
+                out.depth -= 1
+
+    '''
+    ------------------------------------------------------------------------------------------
+    '''
+    def shift(self, state, target, terminal_ids):
+        out = self.out
+        n_nonterminals = self.tables.n_nonterminals
+        out.line("stack_append(state)")
+        out.line(f"state = {target}")
+        if len(terminal_ids) == 1:
+            out.line(f"symbol_append({n_nonterminals + terminal_ids[0]})")
+        else:
+            out.line(f"symbol_append({n_nonterminals} + t)")
+        out.line(f"parent_append({NO_NODE})")
+        out.line(f"first_child_append({NO_NODE})")
+        out.line(f"next_sibling_append({NO_NODE})")
+        out.line("token_append(position)")
+        out.line("nodes_append(unid)")
+        out.line("unid += 1")
+        out.line("position += 1")
+        out.line("t = token_ids[position]")
+
+    def reduce(self, state, production_number):
+        tables = self.tables
+        out = self.out
+        lhs = tables.prod_lhs[production_number]
+        rhs_length = tables.prod_len[production_number]
+        out.line(f"# {production_number}: {self.grammar_rules[production_number]}")
+
+        if tables.prod_is_list[production_number]:
+            self.reduce_list(rhs_length)
+        else:
+            self.reduce_node(lhs, rhs_length)
+
+        if lhs == self.start_symbol:
+            out.line("return nodes_pop()")
+            return
+
+        # The state uncovered by the reduction: the current one for an empty RHS
+        if rhs_length == 0:
+            out.line("stack_append(state)")
+            below = str(state)
+        elif rhs_length == 1:
+            below = "stack[-1]"
+        else:
+            if rhs_length == 2:
+                out.line("stack_pop()")
+            else:
+                out.line(f"del stack[-{rhs_length - 1}:]")
+            below = "stack[-1]"
+
+        targets = self.gotos[lhs]
+        name = tables.nonterminals[lhs]
+        if rhs_length == 0:
+            out.line(f"state = {targets[state]}")
+        elif len(set(targets.values())) == 1:
+            out.line(f"state = {next(iter(targets.values()))}")
+        else:
+            out.line(f"state = goto_{name}[{below}]")
+
+    def reduce_node(self, lhs, rhs_length):
+        """
+        Emits a new inner node over the top rhs_length nodes, replacing them on the node stack.
+        """
+        out = self.out
+        out.line(f"symbol_append({lhs})")
+        out.line(f"parent_append({NO_NODE})")
+        out.line(f"next_sibling_append({NO_NODE})")
+        out.line(f"token_append({NO_NODE})")
+        if rhs_length == 0:
+            out.line(f"first_child_append({NO_NODE})")
+            out.line("nodes_append(unid)")
+            out.line("unid += 1")
+            return
+
+        children = [f"c{i}" for i in range(rhs_length)]
+        for child in reversed(children[1:]):
+            out.line(f"{child} = nodes_pop()")
+        out.line("c0 = nodes[-1]")
+        out.line("first_child_append(c0)")
+        out.line(" = ".join(f"parent[{child}]" for child in children) + " = unid")
+        for previous, child in zip(children, children[1:]):
+            out.line(f"next_sibling[{previous}] = {child}")
+        out.line("nodes[-1] = unid")
+        out.line("unid += 1")
+
+    def reduce_list(self, rhs_length):
+        """
+        Emits the extension of the list node below the top rhs_length - 1 nodes with them
+        (see SyntaxTreeArena.append_children).
+        """
+        out = self.out
+        children = [f"c{i}" for i in range(1, rhs_length)]
+        for child in reversed(children):
+            out.line(f"{child} = nodes_pop()")
+        out.line("node = nodes[-1]")
+        out.line(f"previous = last_child.get(node, {NO_NODE})")
+        out.line(f"if previous == {NO_NODE}:")
+        out.depth += 1
+        out.line("previous = first_child[node]")
+        out.line(f"if previous == {NO_NODE}:")
+        out.line("    first_child[node] = c1")
+        out.line("else:")
+        out.line(f"    while next_sibling[previous] != {NO_NODE}:")
+        out.line("        previous = next_sibling[previous]")
+        out.line("    next_sibling[previous] = c1")
+        out.depth -= 1
+        out.line("else:")
+        out.line("    next_sibling[previous] = c1")
+        out.line(" = ".join(f"parent[{child}]" for child in children) + " = node")
+        for previous, child in zip(children, children[1:]):
+            out.line(f"next_sibling[{previous}] = {child}")
+        out.line(f"last_child[node] = {children[-1]}")
+
+
+def generate_parser_source(tables, grammar_rules):
+    """
+    Returns the source of a specialized parser module for the DenseTables of the grammar.
+    """
+    return ParserGenerator(tables, grammar_rules).generate()
+
+
+'''
+------------------------------------------------------------------------------------------
+'''
+_loaded_parsers = {}  # Grammar hash -> generated module, per process
+
+
+def load_generated_parser(tables, grammar_rules, cache_file=DEFAULT_CACHE_FILE):
+    """
+    Returns the generated parser module for the grammar, importing the cached module when it
+    was generated for the same grammar and generator version, and regenerating (and
+    re-caching) it otherwise.
+    """
+    digest = grammar_hash(grammar_rules)
+    module = _loaded_parsers.get(digest)
+    if module is not None:
+        return module
+
+    if cache_file and os.path.exists(cache_file):
+        try:
+            module = import_source_file(cache_file)
+        except (OSError, SyntaxError, ImportError):
+            module = None  # Corrupt cache, regenerate below
+        if (module is not None and getattr(module, 'GRAMMAR_HASH', None) == digest
+                and getattr(module, 'GENERATOR_VERSION', None) == GENERATOR_VERSION):
+            _loaded_parsers[digest] = module
+            return module
+
+    source = generate_parser_source(tables, grammar_rules)
+    module = None
+    if cache_file:
+        try:
+            write_file_atomically(cache_file, source.encode())
+            module = import_source_file(cache_file)
+        except OSError:
+            module = None  # Read-only location (e.g. a packaged executable), keep it in memory
+    if module is None:
+        module = types.ModuleType('slr_parser_generated')
+        exec(compile(source, '<slr_parser_generated>', 'exec'), module.__dict__)
+    _loaded_parsers[digest] = module
+    return module
+
+
+def import_source_file(path):
+    spec = importlib.util.spec_from_file_location('slr_parser_generated', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def parse_generated(parser):
+    """
+    Parses parser.tokens like parser.parse_tables(), with the generated parser for its
+    grammar. Returns the same value as parser.parse_tables() and leaves an identical syntax
+    tree in parser.syntax_tree.
+    """
+    if (parser.tracer is not None or parser.error_recovery or any(parser.reduction_hooks)
+            or parser.hash_cons):
+        return parser.parse_tables()
+    tables = parser.dense_tables
+    module = load_generated_parser(tables, parser.grammar_rules)
+    tokens = parser.tokens
+    tree = parser.syntax_tree
+    root = NO_NODE
+    if tokens and tokens[-1].type == 'EOF':
+        root = module.parse(tables.encode_tokens(tokens), tree)
+    if root == NO_NODE:
+        # Report the error exactly like the table-driven parser, on a fresh arena
+        parser.syntax_tree = parser.new_syntax_tree()
+        return parser.parse_tables()
+
+    tree.root = root
+    parser.current_token_index = len(tokens) - 1
+    return parser.accept()
@@ -0,0 +1,87 @@
+import json
+from collections import Counter, deque
+
+'''
+===========================================================================================
+Opt-in tracing for SLRParser.
+
+A ParseTracer is handed to the parser only when tracing is wanted; with no tracer the parse
+loop does a single None check per step. Levels:
+    TRACE_OFF      record nothing
+    TRACE_SUMMARY  count visits per state and reductions per production (hot-spot analysis)
+    TRACE_FULL     summary counts plus one JSON-lines record per shift/reduce, written to a
+                   file if one is given, otherwise kept in a fixed-size ring buffer
+===========================================================================================
+'''
+
+TRACE_OFF = 0
+TRACE_SUMMARY = 1
+TRACE_FULL = 2
+
+TRACE_LEVELS = {
+    'off': TRACE_OFF,
+    'summary': TRACE_SUMMARY,
+    'full': TRACE_FULL,
+}
+
+
+class ParseTracer:
+    def __init__(self, level=TRACE_SUMMARY, output_file=None, buffer_size=4096):
+        if isinstance(level, str):
+            level = TRACE_LEVELS[level]
+        self.level = level
+        self.state_visits = Counter()  # state -> number of actions taken in that state
+        self.reduce_counts = Counter()  # production number -> number of reductions
+        self.shift_count = 0
+        self.records = deque(maxlen=buffer_size)  # Ring buffer of the most recent full records
+        self.output = None
+        if level >= TRACE_FULL and output_file is not None:
+            self.output = open(output_file, 'w', encoding='utf-8', buffering=1 << 16)
+
+    def shift(self, state, token_index, token_type, next_state):
+        """
+        Records a shift of the token at token_index from state to next_state.
+        """
+        if self.level < TRACE_SUMMARY:
+            return
+        self.state_visits[state] += 1
+        self.shift_count += 1
+        if self.level >= TRACE_FULL:
+            self.emit({'op': 's', 'st': state, 'tok': token_index, 'cls': token_type, 'to': next_state})
+
+    def reduce(self, state, production_number, goto_state):
+        """
+        Records a reduction by production_number in state, followed by a goto to goto_state.
+        """
+        if self.level < TRACE_SUMMARY:
+            return
+        self.state_visits[state] += 1
+        self.reduce_counts[production_number] += 1
+        if self.level >= TRACE_FULL:
+            self.emit({'op': 'r', 'st': state, 'prod': production_number, 'to': goto_state})
+
+    def emit(self, record):
+        if self.output is not None:
+            self.output.write(json.dumps(record, separators=(',', ':')) + '\n')
+        else:
+            self.records.append(record)
+
+    def close(self):
+        if self.output is not None:
+            self.output.close()
+            self.output = None
+
+    def summary(self, grammar_rules, top=10):
+        """
+        Returns a printable report of the most frequent reductions and most visited states.
+        """
+        lines = ["=== Parse Trace Summary ===",
+                 f"Shifts: {self.shift_count}, Reductions: {sum(self.reduce_counts.values())}",
+                 "Top reductions:"]
+        for production_number, count in self.reduce_counts.most_common(top):
+            lines.append(f"  {count:8}  ({production_number}) {grammar_rules[production_number]}")
+        lines.append("Top states:")
+        for state, count in self.state_visits.most_common(top):
+            lines.append(f"  {count:8}  state {state}")
+        lines.append("===========================")
+        return "\n".join(lines)
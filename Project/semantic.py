@@ -1,4 +1,11 @@
-import re
+import xml.etree.ElementTree as ET
+from array import array
+from types import MappingProxyType
+from binformat import SyntaxTreeReader, is_binary_artifact
+from syntaxtree import NO_NODE
+from symbolindex import SymbolIndex
+from treewalk import fold
+from xmlreader import read_syntax_tree_xml
 
 # ANSI color codes for colored output
 GREEN = '\033[0;32m'
@@ -16,58 +23,104 @@ class SemanticError(Exception):
             message = f"Error at line {line_number}: {line_content}\n{message}"
         super().__init__(message)
 
+class TypeCheckError(Exception):
+    """ Custom exception for type checking errors. """
+    def __init__(self, message, input_file=None, line_number=None, line_content=None):
+        if line_number is not None and line_content is not None:
+            if input_file is not None:
+                message = f"Type error in {input_file}: Error at line {line_number}: {line_content}\n{message}"
+            else:
+                message = f"Type error at line {line_number}: {line_content}\n{message}"
+        super().__init__(message)
+
+NO_SYMBOLS = MappingProxyType({})  # Shared by scopes until their first declaration
+
 class Scope:
+    __slots__ = ('name', 'symbols', 'parent_scope', 'level', 'scope_type', 'index')
+
     def __init__(self, name, parent_scope=None, level=0, scope_type='block'):
         self.name = name
-        self.symbols = {}  # Store variable/function names and their internal unique identifiers
+        self.symbols = NO_SYMBOLS  # Store variable/function names, their internal unique identifiers and data types
         self.parent_scope = parent_scope
         self.level = level
         self.scope_type = scope_type
+        self.index = NO_NODE  # Position in SymbolTable.scopes
 
-    def declare(self, name, symbol_type, unid, line_number=None, line_content=None):
+    def declare(self, name, symbol_type, unid, line_number=None, line_content=None, data_type=None):
         """ Declares a new variable or function in the current scope. """
         if name in self.symbols:
             raise SemanticError(f"'{name}' is already declared in this scope '{self.name}'.", line_number, line_content)
-        self.symbols[name] = {"type": symbol_type, "unid": unid}
+        if self.symbols is NO_SYMBOLS:
+            self.symbols = {}
+        info = self.symbols[name] = {"type": symbol_type, "unid": unid, "slot": len(self.symbols), "data_type": data_type}
+        return info
 
     def lookup(self, name, line_number=None, line_content=None):
         """ Looks up a symbol in the current scope or any parent scope. """
-        if name in self.symbols:
-            return self.symbols[name]
-        elif self.parent_scope:
-            return self.parent_scope.lookup(name, line_number, line_content)
-        else:
-            raise SemanticError(f"'{name}' is used but not declared in any scope.", line_number, line_content)
+        scope = self
+        while scope is not None:
+            if name in scope.symbols:
+                return scope.symbols[name]
+            scope = scope.parent_scope
+        raise SemanticError(f"'{name}' is used but not declared in any scope.", line_number, line_content)
 
     def has(self, name):
         """ Checks if a symbol is declared in the current scope (only). """
         return name in self.symbols
 
 class SymbolTable:
+    """
+    Scopes are kept in one flat list in the order they were opened. A block scope that is
+    still empty when it is exited is taken off the list again and pooled for the next block,
+    so blocks without declarations cost neither a new Scope nor a table entry.
+    """
     def __init__(self):
         self.global_scope = Scope("global", level=0)
         self.current_scope = self.global_scope
-        self.scopes = [self.global_scope]  # Global scope is the first one
+        self.scopes = []
+        self.free_blocks = []  # Empty block scopes, reused by enter_scope
+        self.append_scope(self.global_scope)  # Global scope is the first one
+
+    def append_scope(self, scope):
+        scope.index = len(self.scopes)
+        self.scopes.append(scope)
 
     def enter_scope(self, scope_name, scope_type='block', level=None):
         if level is None:
             new_level = self.current_scope.level + 1
         else:
             new_level = level
-        new_scope = Scope(scope_name, parent_scope=self.current_scope, level=new_level, scope_type=scope_type)
+        if scope_type == 'block' and self.free_blocks:
+            new_scope = self.free_blocks.pop()
+            new_scope.__init__(scope_name, parent_scope=self.current_scope, level=new_level, scope_type=scope_type)
+        else:
+            new_scope = Scope(scope_name, parent_scope=self.current_scope, level=new_level, scope_type=scope_type)
         self.current_scope = new_scope
-        self.scopes.append(new_scope)
+        self.append_scope(new_scope)
 
     def exit_scope(self):
-        if self.current_scope.parent_scope:
-            self.current_scope = self.current_scope.parent_scope
+        scope = self.current_scope
+        if scope.parent_scope:
+            self.current_scope = scope.parent_scope
         else:
             raise SemanticError("Attempted to exit global scope, which is not allowed.")
-
-    def declare_symbol(self, name, symbol_type, unid, scope=None, line_number=None, line_content=None):
+        if scope.scope_type == 'block' and not scope.symbols and self.scopes[-1] is scope:
+            self.scopes.pop()
+            self.free_blocks.append(scope)
+
+    def scope_records(self, start=0):
+        """
+        Returns (name, level, scope type, parent index or NO_NODE, symbols) for every scope
+        from position start on.
+        """
+        return [(scope.name, scope.level, scope.scope_type,
+                 scope.parent_scope.index if scope.parent_scope is not None else NO_NODE, scope.symbols)
+                for scope in self.scopes[start:]]
+
+    def declare_symbol(self, name, symbol_type, unid, scope=None, line_number=None, line_content=None, data_type=None):
         if scope is None:
             scope = self.current_scope
-        scope.declare(name, symbol_type, unid, line_number, line_content)
+        scope.declare(name, symbol_type, unid, line_number, line_content, data_type)
 
     def lookup_symbol(self, name, line_number=None, line_content=None):
         # Start lookup from the current scope
@@ -81,259 +134,406 @@ class SymbolTable:
 
     def print_table(self):
         print("\n=== Symbol Table ===")
-        for scope in self.scopes:
-            # Skip printing empty block levels
-            if not scope.symbols and "Block_Level" in scope.name:
-                continue
-            print(f"Scope: {scope.name} (Level: {scope.level})")
-            for name, info in scope.symbols.items():
-                print(f"  {name} -> Type: {info['type']}, UNID: {info['unid']}")
+        for scope_name, level, _, _, symbols in self.scope_records():
+            print(f"Scope: {scope_name} (Level: {level})")
+            for name, info in symbols.items():
+                print(f"  {name} -> Type: {info['type']}, Data Type: {info['data_type']}, UNID: {info['unid']}, Slot: {info['slot']}")
         print("====================\n")
 
-def extract_metadata_from_syntax_tree(xml_file):
+    def write_table(self, path):
+        """ Writes the scopes with the return types of functions and data types of variables. """
+        with open(path, 'w') as file:
+            for scope_name, _, _, _, symbols in self.scope_records():
+                file.write(f"Scope: {scope_name}\n")
+                for name, info in symbols.items():
+                    if info['type'] == 'func':
+                        file.write(f"  Function: {name} -> Return Type: {info['data_type']}\n")
+                    else:
+                        file.write(f"  Variable: {name} -> Data Type: {info['data_type']}\n")
+                file.write("\n")
+
+'''
+------------------------------------------------------------------------------------------
+Tree-based analysis: one walk over the syntax tree node arrays binds every VNAME / FNAME
+leaf to the leaf that declares it and type checks the statements on the way, so the result
+does not depend on source formatting and the source is never re-read.
+
+Every declaration gets a dense slot in its scope (declaration order), and every name leaf
+gets a lexical address: hops, the number of function scopes between the use and the
+declaring scope, and that slot. Names in the global scope get hops GLOBAL_HOPS and their
+global symbol ID (their slot in the global scope) instead, so an interpreter can keep one
+frame array per active function and read any variable in O(1):
+    globals[slot] if hops == GLOBAL_HOPS else frames[len(frames) - 1 - hops][slot]
+
+Type rules: variables have their declared VTYP, parameters are num, functions must return
+num. Operators and calls take num arguments and give num; an assignment needs the type of
+its variable and a return the return type of its function. Conditions are only resolved.
+'''
+DECLARING_LISTS = ('GLOBVARS', 'LOCVARS')
+GLOBAL_HOPS = -2
+CONSTANT_TYPES = {'CONST_N': 'num', 'CONST_T': 'text'}
+
+
+class NameBindings:
+    """
+    Resolution of every V / FNAME leaf, indexed by UNID (NO_NODE for other nodes):
+        declaration[unid]   UNID of the declaring leaf
+        hops[unid]          function scopes between the leaf and the declaration, or
+                            GLOBAL_HOPS for names declared in the global scope
+        slot[unid]          slot of the name in its scope (the global symbol ID for globals)
+    """
+    def __init__(self, n_nodes):
+        self.declaration = array('i', [NO_NODE]) * n_nodes
+        self.hops = array('i', [NO_NODE]) * n_nodes
+        self.slot = array('i', [NO_NODE]) * n_nodes
+
+    def address(self, unid):
+        return self.hops[unid], self.slot[unid]
+
+
+class SemanticAnalyzer:
+    """
+    Binds names through a scope stack: the global scope holds the global variables and
+    every function (functions are visible program-wide), and each DECL opens a function
+    scope for its parameters and locals whose parent is the enclosing function's scope.
+    Calls are checked after the walk, since a function may be called before it is declared.
+    Works on a SyntaxTreeArena, a binary SyntaxTreeReader or a tree read from XML.
+
+    Lookups do not walk the scope chain: visible maps each name, by word ID (see
+    lexer.Interner), to the stack of its visible declarations (scope depth, symbol info),
+    innermost last, pushed on declaration and popped when the declaring scope closes.
+    """
+    def __init__(self, tree, source_lines=None, input_file=None):
+        self.symbol = tree.symbol
+        self.symbol_names = tree.symbol_names
+        self.parent = tree.parent
+        self.first_child = tree.first_child
+        self.next_sibling = tree.next_sibling
+        self.token = tree.token
+        self.tokens = tree.tokens
+        self.word_ids = tree.word_ids
+        self.root = tree.root
+        self.source_lines = source_lines
+        self.input_file = input_file
+        self.symbol_table = SymbolTable()
+        self.bindings = NameBindings(len(tree))
+        self.visible = {}
+        self.depth = 0  # Open function scopes
+        self.functions = []  # Names of the open functions, innermost last
+        self.calls = []  # FNAME leaf of every call, resolved once all functions are declared
+
+    def symb(self, unid):
+        return self.symbol_names[self.symbol[unid]]
+
+    def location(self, leaf):
+        """
+        Returns (line number, line content) of a leaf for error messages.
+        """
+        line_number = self.tokens[self.token[leaf]].line_num
+        if self.source_lines and 0 < line_number <= len(self.source_lines):
+            return line_number, self.source_lines[line_number - 1].rstrip('\n')
+        return line_number, None
+
+    def word(self, leaf):
+        return self.tokens[self.token[leaf]].value
+
+    def children(self, unid):
+        children = []
+        child = self.first_child[unid]
+        while child != NO_NODE:
+            children.append(child)
+            child = self.next_sibling[child]
+        return children
+
+    def leaf(self, unid):
+        """
+        Returns the first leaf below unid (the only one for VNAME, FNAME, CONST, ATOMIC, ...).
+        """
+        while self.token[unid] == NO_NODE:
+            unid = self.first_child[unid]
+        return unid
+
+    def error(self, error_type, message, leaf):
+        """
+        Returns a SemanticError / TypeCheckError located at a leaf. The message and leaf are
+        kept on the error (detail, leaf) so it can be raised again for a moved copy of the code.
+        """
+        if error_type is TypeCheckError:
+            error = TypeCheckError(message, self.input_file, *self.location(leaf))
+        else:
+            error = error_type(message, *self.location(leaf))
+        error.detail = message
+        error.leaf = leaf
+        return error
+
+    def type_error(self, message, leaf):
+        return self.error(TypeCheckError, message, leaf)
+
+    def declare(self, leaf, symbol_type, data_type, scope, kind):
+        name = self.word(leaf)
+        if name in reserved_keywords:
+            raise self.error(SemanticError, f"{kind} name '{name}' is a reserved keyword.", leaf)
+        if scope.has(name):
+            if kind == 'Function':
+                message = f"Function '{name}' is already declared in the global scope."
+            elif kind == 'Parameter':
+                message = f"Parameter '{name}' is already declared in this scope."
+            else:
+                message = f"Variable '{name}' is already declared in this scope '{scope.name}'."
+            raise self.error(SemanticError, message, leaf)
+        info = scope.declare(name, symbol_type, leaf, data_type=data_type)
+        depth = self.depth if scope.parent_scope is not None else 0
+        self.visible.setdefault(self.word_ids[self.token[leaf]], []).append((depth, info))
+        self.bind(leaf, depth, info)
+
+    def declare_variables(self, unid):
+        """
+        Declares the VTYP VNAME pairs of a GLOBVARS / LOCVARS list; returns a nested GLOBVARS.
+        """
+        data_type = None
+        for child in self.children(unid):
+            kind = self.symb(child)
+            if kind == 'VTYP':
+                data_type = self.word(self.leaf(child))
+            elif kind == 'VNAME':
+                self.declare(self.leaf(child), "var", data_type, self.symbol_table.current_scope, 'Variable')
+            elif kind in DECLARING_LISTS:
+                return child
+        return NO_NODE
+
+    def open_function(self, unid):
+        """
+        Declares the function of a DECL and opens its scope with the parameters.
+        """
+        # DECL -> HEADER BODY, HEADER -> FTYP FNAME ( VNAME , VNAME , VNAME )
+        header = self.children(self.first_child[unid])
+        return_type = self.word(self.leaf(header[0]))
+        name_leaf = self.leaf(header[1])
+        self.declare(name_leaf, "func", return_type, self.symbol_table.global_scope, 'Function')
+        name = self.word(name_leaf)
+        if return_type != 'num':
+            raise self.error(SemanticError, f"Function '{name}' has an invalid return type '{return_type}'. Only 'num' return types are allowed.",
+                             name_leaf)
+        self.symbol_table.enter_scope(name, scope_type='function')
+        self.depth += 1
+        self.functions.append(name)
+        for child in header[2:]:
+            if self.symb(child) == 'VNAME':
+                self.declare(self.leaf(child), "var", "num", self.symbol_table.current_scope, 'Parameter')
+
+    def bind(self, leaf, depth, info):
+        bindings = self.bindings
+        bindings.declaration[leaf] = info["unid"]
+        bindings.hops[leaf] = self.depth - depth if depth else GLOBAL_HOPS
+        bindings.slot[leaf] = info["slot"]
+
+    def resolve(self, leaf):
+        """
+        Binds a name leaf to its visible declaration and returns the declaration's info.
+        """
+        declarations = self.visible.get(self.word_ids[self.token[leaf]])
+        if not declarations:
+            raise self.error(SemanticError, f"'{self.word(leaf)}' is used but not declared in any scope.", leaf)
+        depth, info = declarations[-1]
+        self.bind(leaf, depth, info)
+        return info
+
+    def close_scope(self):
+        visible = self.visible
+        word_ids = self.word_ids
+        token = self.token
+        for info in self.symbol_table.current_scope.symbols.values():
+            visible[word_ids[token[info["unid"]]]].pop()
+        self.symbol_table.exit_scope()
+        self.depth -= 1
+        self.functions.pop()
+
+    '''
+    ------------------------------------------------------------------------------------------
+    Type checking
+    '''
+    def term_type(self, unid):
+        """
+        Resolves the names of a TERM / ATOMIC / CALL / OP and returns its type, bottom-up.
+        """
+        return fold(unid, self.expression_children, self.combine_types)
+
+    def expression_children(self, unid):
+        return self.children(unid) if self.token[unid] == NO_NODE else ()
+
+    def combine_types(self, unid, types):
+        if self.token[unid] != NO_NODE:
+            return None
+        kind = self.symb(unid)
+        if kind == 'VNAME':
+            return self.resolve(self.first_child[unid])["data_type"]
+        if kind == 'CONST':
+            return CONSTANT_TYPES[self.tokens[self.token[self.first_child[unid]]].type]
+        if kind == 'OP':
+            # OP -> UNOP ( ARG ) | BINOP ( ARG , ARG )
+            operator = self.first_child[unid]
+            for position, arg_type in zip(('first', 'second'), types[2::2]):
+                if arg_type != 'num':
+                    raise self.type_error(f"Operator '{self.word(self.leaf(operator))}' requires 'num' type arguments, but got '{arg_type}' for the {position} argument.",
+                                          self.leaf(operator))
+            return 'num'
+        if kind == 'CALL':
+            # CALL -> FNAME ( ATOMIC , ATOMIC , ATOMIC )
+            name_leaf = self.leaf(self.first_child[unid])
+            self.calls.append(name_leaf)
+            args = self.children(unid)[2::2]
+            for arg, arg_type in zip(args, types[2::2]):
+                if arg_type != 'num':
+                    raise self.type_error(f"Function '{self.word(name_leaf)}' expects 'num' type arguments, but got '{arg_type}' for argument '{self.word(self.leaf(arg))}'.",
+                                          name_leaf)
+            return 'num'
+        return types[0] if types else None
+
+    def check_assign(self, unid):
+        # ASSIGN -> VNAME < input | VNAME = TERM
+        target, operator, value = self.children(unid)
+        leaf = self.leaf(target)
+        var_type = self.resolve(leaf)["data_type"]
+        expr_type = 'num' if self.word(operator) == '<' else self.term_type(value)
+        if var_type != expr_type:
+            raise self.type_error(f"Type mismatch: Cannot assign {expr_type} to {var_type}.", leaf)
+
+    def check_return(self, atomic):
+        return_type = self.term_type(atomic)
+        if self.functions:
+            function = self.functions[-1]
+            expected = self.symbol_table.global_scope.symbols[function]["data_type"]
+            if expected != return_type:
+                raise self.type_error(f"Return type mismatch in function '{function}': expected {expected}, got {return_type}.",
+                                      self.leaf(atomic))
+
+    def analyze(self):
+        """
+        Walks the tree once in document order and returns the SymbolTable.
+        """
+        self.walk(self.root)
+        return self.finish()
+
+    def walk(self, unid):
+        """
+        Analyzes the subtree at unid in document order.
+        """
+        first_child = self.first_child
+        next_sibling = self.next_sibling
+        token = self.token
+
+        pending = [unid]
+        while pending:
+            unid = pending.pop()
+            if unid < NO_NODE:
+                self.close_scope()  # Marker pushed when the DECL ~unid was entered
+                continue
+            kind = self.symb(unid)
+            if kind in DECLARING_LISTS:
+                nested = self.declare_variables(unid)
+                if nested != NO_NODE:
+                    pending.append(nested)
+                continue
+            if kind == 'ASSIGN':
+                self.check_assign(unid)
+                continue
+            if kind == 'CALL':
+                self.term_type(unid)
+                continue
+            if kind == 'COMMAND' and token[first_child[unid]] != NO_NODE:
+                # COMMAND -> skip | halt | print ATOMIC | return ATOMIC
+                atomic = next_sibling[first_child[unid]]
+                if atomic == NO_NODE:
+                    continue
+                if self.word(first_child[unid]) == 'return':
+                    self.check_return(atomic)
+                else:
+                    self.term_type(atomic)
+                continue
+            if kind == 'VNAME':
+                self.resolve(first_child[unid])  # Condition operand
+                continue
+            if kind == 'DECL':
+                self.open_function(unid)
+                pending.append(~unid)
+                pending.append(next_sibling[first_child[unid]])  # BODY
+                continue
+
+            children = []
+            child = first_child[unid]
+            while child != NO_NODE:
+                if token[child] == NO_NODE:
+                    children.append(child)
+                child = next_sibling[child]
+            pending.extend(reversed(children))
+
+    def finish(self):
+        """
+        Resolves the calls once every function is declared and returns the SymbolTable.
+        """
+        for leaf in self.calls:
+            self.resolve(leaf)
+        return self.symbol_table
+
+
+def analyze_syntax_tree(tree, source_lines=None, input_file=None):
     """
-    Extract all function and variable names and their unique IDs from the syntax tree.
+    Runs the semantic analysis and type checking on a syntax tree and returns
+    (symbol table, NameBindings).
     """
-    import xml.etree.ElementTree as ET
+    analyzer = SemanticAnalyzer(tree, source_lines, input_file)
+    return analyzer.analyze(), analyzer.bindings
 
-    # Load the XML syntax tree
+
+def load_syntax_tree(syntax_tree_file):
+    """
+    Loads the syntax tree from its XML or binary form (see binformat.py).
+    """
+    if is_binary_artifact(syntax_tree_file):
+        tree = SyntaxTreeReader(syntax_tree_file)
+        print(f"{GREEN}Loaded binary syntax tree successfully: {syntax_tree_file}{RESET}")
+        return tree
     try:
-        tree = ET.parse(xml_file)
-        root = tree.getroot()
-        print(f"{GREEN}Loaded XML file successfully: {xml_file}{RESET}")
+        tree = read_syntax_tree_xml(syntax_tree_file)
     except ET.ParseError as e:
         print(f"{RED}XML Parse Error: {e}{RESET}")
         return None
+    print(f"{GREEN}Loaded XML file successfully: {syntax_tree_file}{RESET}")
+    return tree
 
-    metadata = []
-    for leaf in root.findall(".//LEAF"):
-        terminal = leaf.find("TERMINAL")
-        word = terminal.find("WORD").text
-        class_name = terminal.find("CLASS").text
-        unid = leaf.find("UNID").text
-        metadata.append({'word': word, 'class_name': class_name, 'unid': unid})
-    return metadata
-
-def perform_semantic_analysis(xml_file, input_file):
+def perform_semantic_analysis(xml_file, input_file, index_file=None, symbol_table_file=None,
+                              parallel=False, max_workers=None):
     """
-    Perform semantic analysis by combining syntax tree metadata and input file scope analysis.
+    Perform semantic analysis and type checking on the syntax tree (XML or binary) of the
+    input file. The input file is only read for the line contents quoted in error messages.
+    If index_file is given, the symbol query index (see symbolindex.py) is saved there; if
+    symbol_table_file is given, the scopes with their data types are written there. parallel
+    checks the top-level functions in up to max_workers processes (see parallelanalysis.py).
     """
-    symbol_table = SymbolTable()
-
-    # Step 1: Extract metadata (names, IDs) from the syntax tree
-    metadata = extract_metadata_from_syntax_tree(xml_file)
-    if not metadata:
+    tree = load_syntax_tree(xml_file)
+    if tree is None:
         return
 
-    # Build a mapping from (word, class_name) to list of unids
-    metadata_map = {}
-    for entry in metadata:
-        key = (entry['word'], entry['class_name'])
-        if key not in metadata_map:
-            metadata_map[key] = []
-        metadata_map[key].append(entry['unid'])
-
-    # Read the entire input file
     with open(input_file, 'r') as file:
         lines = file.readlines()
 
-    # First Pass: Collect all function declarations
-    for line_number, line in enumerate(lines, start=1):
-        original_line = line.rstrip('\n')
-        line = line.strip()
-
-        # Skip empty lines
-        if not line:
-            continue
-
-        # Function declaration
-        function_decl_match = re.match(r'(num|void)\s+(\w+)\s*\(([^)]*)\)', line)
-        if function_decl_match:
-            return_type, func_name, params = function_decl_match.groups()
-            # Check if the function name is a reserved keyword
-            if func_name in reserved_keywords:
-                raise SemanticError(f"Function name '{func_name}' is a reserved keyword.", line_number, original_line)
-            # Check if function is already declared in global scope
-            if symbol_table.global_scope.has(func_name):
-                raise SemanticError(f"Function '{func_name}' is already declared in the global scope.", line_number, original_line)
-            # Find the unid from metadata
-            key = (func_name, 'FNAME')
-            unid_list = metadata_map.get(key, [])
-            if unid_list:
-                unid = unid_list.pop(0)
-            else:
-                raise SemanticError(f"Function '{func_name}' not found in syntax tree metadata.", line_number, original_line)
-            # Declare function in global scope
-            try:
-                symbol_table.declare_symbol(func_name, "func", unid, scope=symbol_table.global_scope, line_number=line_number, line_content=original_line)
-            except SemanticError as e:
-                raise SemanticError(str(e), line_number, original_line)
-
-    # Second Pass: Perform the semantic analysis
-    current_scope_stack = [symbol_table.global_scope]
-    inside_function = False
-
-    for line_number, line in enumerate(lines, start=1):
-        original_line = line.rstrip('\n')
-        line = line.strip()
-
-        # Skip empty lines
-        if not line:
-            continue
-
-        # Begin block
-        if line == 'begin':
-            # Enter new block scope
-            block_scope_name = f"Block_Level_{len(current_scope_stack)}"
-            symbol_table.enter_scope(block_scope_name, scope_type='block')
-            current_scope_stack.append(symbol_table.current_scope)
-            continue
-
-        # End block or function
-        if line == 'end':
-            if len(current_scope_stack) > 1:
-                current_scope = current_scope_stack[-1]
-                if current_scope.scope_type == 'function':
-                    inside_function = False
-                symbol_table.exit_scope()
-                current_scope_stack.pop()
-            continue
-
-        # Function declaration
-        function_decl_match = re.match(r'(num|void)\s+(\w+)\s*\(([^)]*)\)', line)
-        if function_decl_match:
-            # Function already declared in first pass
-            func_name = function_decl_match.group(2)
-            # Enter function scope
-            symbol_table.enter_scope(func_name, scope_type='function')
-            current_scope_stack.append(symbol_table.current_scope)
-            # Declare function parameters in the function's scope
-            params = function_decl_match.group(3)
-            params_list = params.split(',')
-            for param in params_list:
-                param = param.strip()
-                if param:
-                    param_name = param.split()[-1]  # Get parameter name
-                    # Check if the parameter name is a reserved keyword
-                    if param_name in reserved_keywords:
-                        raise SemanticError(f"Parameter name '{param_name}' is a reserved keyword.", line_number, original_line)
-                    # Check if parameter is already declared in current scope
-                    if symbol_table.current_scope.has(param_name):
-                        raise SemanticError(f"Parameter '{param_name}' is already declared in this scope.", line_number, original_line)
-                    # Find the unid from metadata
-                    key = (param_name, 'V')
-                    unid_list = metadata_map.get(key, [])
-                    if unid_list:
-                        unid = unid_list.pop(0)
-                    else:
-                        raise SemanticError(f"Parameter '{param_name}' not found in syntax tree metadata.", line_number, original_line)
-                    try:
-                        symbol_table.declare_symbol(param_name, "var", unid, line_number=line_number, line_content=original_line)
-                    except SemanticError as e:
-                        raise SemanticError(str(e), line_number, original_line)
-            inside_function = True
-            continue
-
-        # Variable declaration
-        variable_decl_matches = re.findall(r'(num|text)\s+(\w+)', line)
-        if variable_decl_matches:
-            for var_type, var_name in variable_decl_matches:
-                # Check if the variable name is a reserved keyword
-                if var_name in reserved_keywords:
-                    raise SemanticError(f"Variable name '{var_name}' is a reserved keyword.", line_number, original_line)
-                # Check if variable is already declared in current scope
-                if symbol_table.current_scope.has(var_name):
-                    raise SemanticError(f"Variable '{var_name}' is already declared in this scope '{symbol_table.current_scope.name}'.", line_number, original_line)
-                # Find the unid from metadata
-                key = (var_name, 'V')
-                unid_list = metadata_map.get(key, [])
-                if unid_list:
-                    unid = unid_list.pop(0)
-                else:
-                    raise SemanticError(f"Variable '{var_name}' not found in syntax tree metadata.", line_number, original_line)
-                try:
-                    symbol_table.declare_symbol(var_name, "var", unid, line_number=line_number, line_content=original_line)
-                except SemanticError as e:
-                    raise SemanticError(str(e), line_number, original_line)
-            continue
-
-        # Variable usage in assignments and expressions
-        variable_use_matches = re.findall(r'\b(V_\w+)\b', line)
-        # Exclude string literals
-        if '"' in line or "'" in line:
-            line_no_strings = re.sub(r'".*?"|\'.*?\'', '', line)
-            variable_use_matches = re.findall(r'\b(V_\w+)\b', line_no_strings)
-
-        for var_name in variable_use_matches:
-            # Skip if already handled (e.g., in declarations)
-            if re.match(r'(num|text)\s+' + var_name, line):
-                continue
-            # Skip if part of a function declaration or call
-            if re.match(r'\w+\s*\(.*\)', line):
-                continue
-            try:
-                symbol_table.lookup_symbol(var_name, line_number, original_line)
-            except SemanticError as e:
-                raise SemanticError(str(e), line_number, original_line)
-
-        # Assignment statements
-        assignment_match = re.match(r'(\w+)\s*(<|=)\s*(.+);', line)
-        if assignment_match:
-            var_name, operator, expression = assignment_match.groups()
-            # Check that the variable being assigned to is declared
-            try:
-                symbol_table.lookup_symbol(var_name, line_number, original_line)
-            except SemanticError as e:
-                raise SemanticError(str(e), line_number, original_line)
-
-            # Optionally, check variables used in the expression
-            expression_vars = re.findall(r'\b(V_\w+)\b', expression)
-            for expr_var in expression_vars:
-                try:
-                    symbol_table.lookup_symbol(expr_var, line_number, original_line)
-                except SemanticError as e:
-                    raise SemanticError(str(e), line_number, original_line)
-            continue
-
-        # Function call
-        function_call_match = re.match(r'(\w+)\s*\(([^)]*)\)\s*;', line)
-        if function_call_match:
-            func_name, args = function_call_match.groups()
-            # Ensure function is declared
-            try:
-                symbol_table.lookup_symbol(func_name, line_number, original_line)
-            except SemanticError as e:
-                raise SemanticError(str(e), line_number, original_line)
-
-            # Enter call scope at the same level as current scope
-            symbol_table.enter_scope(f"Call_{func_name}", scope_type='call', level=symbol_table.current_scope.level)
-            current_scope_stack.append(symbol_table.current_scope)
-            # Check arguments are declared
-            args_list = args.split(',')
-            for arg in args_list:
-                arg = arg.strip()
-                if arg:
-                    # Handle string literals (e.g., "Zero")
-                    if arg.startswith('"') and arg.endswith('"'):
-                        continue  # Skip string literals
-                    # Handle numerical constants
-                    try:
-                        float(arg)
-                        continue  # Skip numerical constants
-                    except ValueError:
-                        pass  # Not a number, proceed to check declaration
-                    try:
-                        symbol_table.lookup_symbol(arg, line_number, original_line)
-                    except SemanticError as e:
-                        raise SemanticError(str(e), line_number, original_line)
-            # Exit call scope
-            symbol_table.exit_scope()
-            current_scope_stack.pop()
-            continue
-
-        # Handle 'main' and global variables after 'main'
-        if line == 'main':
-            continue  # 'main' keyword, proceed to next line
-
-    # Step 3: Print the symbol table after analysis
+    try:
+        if parallel:
+            from parallelanalysis import analyze_parallel  # Imports this module
+            symbol_table, bindings = analyze_parallel(tree, lines, input_file, max_workers)
+        else:
+            symbol_table, bindings = analyze_syntax_tree(tree, lines, input_file)
+        if index_file:
+            SymbolIndex.build(tree, symbol_table, bindings).save(index_file)
+    finally:
+        if isinstance(tree, SyntaxTreeReader):
+            tree.close()
+
+    if symbol_table_file:
+        symbol_table.write_table(symbol_table_file)
+        print(f"Semantic analysis symbol table written to: {symbol_table_file}")
+
+    # Print the symbol table after analysis
     symbol_table.print_table()
+    print(f"{GREEN}Type checking completed successfully for {input_file}.{RESET}")
+    return symbol_table
@@ -0,0 +1,318 @@
+import marshal
+from bisect import bisect_right
+from syntaxtree import NO_NODE
+
+'''
+===========================================================================================
+Indexed symbol queries over an analyzed program, for editor tooling and code search.
+
+SymbolIndex is built once from the syntax tree, the symbol table and the name bindings of
+semantic.analyze_syntax_tree(), and answers:
+    occurrence_at(line, col)    the name under the cursor
+    definition(line, col)       go-to-definition
+    references(line, col)       find-all-references (every leaf bound to the same declaration)
+    definitions(name)           every declaration of a name, in any scope
+    scope_at(line, col)         innermost scope containing a position
+    functions()                 every function declaration, in document order
+Occurrences are kept sorted by position (bisect for the name under the cursor), inverted
+indexes map names to declarations and declarations to their references, and scope spans
+live in an interval tree, so every query is a few list lookups whatever the program size.
+
+Positions are (line, col) tuples with 1-based columns, as in the tokens. save() writes the
+index with marshal next to the other artifacts; load() reads it back without the tree.
+===========================================================================================
+'''
+
+INDEX_FORMAT_VERSION = 1
+
+
+class IntervalTree:
+    """
+    Static centered interval tree over closed intervals (start, end, value), built without
+    recursion. stab(point) returns the values of every interval containing point.
+    """
+    def __init__(self, intervals):
+        self.center = []
+        self.by_start = []  # Per node: the node's intervals sorted by start
+        self.by_end = []  # Per node: the node's intervals sorted by end, descending
+        self.left = []
+        self.right = []
+        self.root = NO_NODE
+
+        pending = [(list(intervals), NO_NODE, None)]
+        while pending:
+            intervals, parent, side = pending.pop()
+            if not intervals:
+                continue
+            endpoints = sorted(point for start, end, _ in intervals for point in (start, end))
+            center = endpoints[len(endpoints) // 2]
+            here = [interval for interval in intervals if interval[0] <= center <= interval[1]]
+            node = len(self.center)
+            self.center.append(center)
+            self.by_start.append(sorted(here, key=lambda interval: interval[0]))
+            self.by_end.append(sorted(here, key=lambda interval: interval[1], reverse=True))
+            self.left.append(NO_NODE)
+            self.right.append(NO_NODE)
+            if parent == NO_NODE:
+                self.root = node
+            elif side == 'left':
+                self.left[parent] = node
+            else:
+                self.right[parent] = node
+            pending.append(([interval for interval in intervals if interval[1] < center], node, 'left'))
+            pending.append(([interval for interval in intervals if interval[0] > center], node, 'right'))
+
+    def stab(self, point):
+        found = []
+        node = self.root
+        while node != NO_NODE:
+            center = self.center[node]
+            if point < center:
+                for start, end, value in self.by_start[node]:
+                    if start > point:
+                        break
+                    found.append(value)
+                node = self.left[node]
+            elif point > center:
+                for start, end, value in self.by_end[node]:
+                    if end < point:
+                        break
+                    found.append(value)
+                node = self.right[node]
+            else:
+                found.extend(value for _, _, value in self.by_start[node])
+                break
+        return found
+
+    def state(self):
+        return (self.center, self.by_start, self.by_end, self.left, self.right, self.root)
+
+    @classmethod
+    def from_state(cls, state):
+        tree = cls(())
+        tree.center, tree.by_start, tree.by_end, tree.left, tree.right, tree.root = state
+        return tree
+
+
+'''
+------------------------------------------------------------------------------------------
+'''
+class Occurrence:
+    __slots__ = ('name', 'unid', 'line', 'col', 'is_definition')
+
+    def __init__(self, name, unid, line, col, is_definition):
+        self.name = name
+        self.unid = unid  # UNID of the V / FNAME leaf
+        self.line = line
+        self.col = col
+        self.is_definition = is_definition
+
+    def __repr__(self):
+        return f"Occurrence({self.name!r}, unid={self.unid}, {self.line}:{self.col}{', definition' if self.is_definition else ''})"
+
+
+class ScopeSpan:
+    __slots__ = ('name', 'level', 'start', 'end')
+
+    def __init__(self, name, level, start, end):
+        self.name = name
+        self.level = level
+        self.start = start  # (line, col) of the scope's first token
+        self.end = end  # (line, col) of the last character of its last token
+
+    def __repr__(self):
+        return f"ScopeSpan({self.name!r}, level={self.level}, {self.start} - {self.end})"
+
+
+def first_leaf(tree, unid, last=False):
+    """
+    Returns the first (or last) leaf below unid in document order, skipping empty
+    productions, or NO_NODE if there is none.
+    """
+    pending = [unid]
+    while pending:
+        unid = pending.pop()
+        if tree.token[unid] != NO_NODE:
+            return unid
+        children = []
+        child = tree.first_child[unid]
+        while child != NO_NODE:
+            children.append(child)
+            child = tree.next_sibling[child]
+        pending.extend(children if last else reversed(children))
+    return NO_NODE
+
+
+def last_leaf(tree, unid):
+    return first_leaf(tree, unid, last=True)
+
+
+def token_span(tree, first, last):
+    """
+    Returns the (start, end) positions covered by the leaves first .. last.
+    """
+    start = tree.tokens[tree.token[first]]
+    end = tree.tokens[tree.token[last]]
+    return (start.line_num, start.col_num), (end.line_num, end.col_num + max(len(end.value), 1) - 1)
+
+
+class SymbolIndex:
+    def __init__(self):
+        self.names = []  # Distinct names
+        self.name_ids = {}
+        # One entry per occurrence (V / FNAME leaf bound to a declaration), in document order
+        self.occurrence_name = []
+        self.occurrence_unid = []
+        self.occurrence_position = []
+        self.occurrence_declaration = []  # Index of the declaring occurrence
+        self.unid_occurrence = {}  # Leaf UNID -> occurrence index
+        self.definitions_by_name = {}  # Name ID -> declaring occurrence indices
+        self.references_by_definition = {}  # Declaring occurrence index -> occurrence indices
+        self.function_definitions = []
+        self.scopes = []  # (name, level, start, end)
+        self.scope_tree = IntervalTree(())
+
+    @classmethod
+    def build(cls, tree, symbol_table, bindings):
+        """
+        Builds the index from a syntax tree and the (symbol table, NameBindings) returned by
+        semantic.analyze_syntax_tree().
+        """
+        index = cls()
+        declaration = bindings.declaration
+        tokens = tree.tokens
+        token = tree.token
+        for unid in range(len(declaration)):
+            declaring_leaf = declaration[unid]
+            if declaring_leaf == NO_NODE:
+                continue
+            terminal = tokens[token[unid]]
+            name_id = index.name_ids.get(terminal.value)
+            if name_id is None:
+                name_id = index.name_ids[terminal.value] = len(index.names)
+                index.names.append(terminal.value)
+            occurrence = len(index.occurrence_unid)
+            index.occurrence_name.append(name_id)
+            index.occurrence_unid.append(unid)
+            index.occurrence_position.append((terminal.line_num, terminal.col_num))
+            index.unid_occurrence[unid] = occurrence
+            if declaring_leaf == unid:
+                index.definitions_by_name.setdefault(name_id, []).append(occurrence)
+                index.references_by_definition[occurrence] = []
+            index.occurrence_declaration.append(declaring_leaf)
+
+        # Calls can precede the function declaration, so map the declaring leaves to
+        # occurrences once all are known; references stay in document order
+        for occurrence, declaring_leaf in enumerate(index.occurrence_declaration):
+            definition = index.unid_occurrence[declaring_leaf]
+            index.occurrence_declaration[occurrence] = definition
+            index.references_by_definition[definition].append(occurrence)
+
+        global_symbols = symbol_table.global_scope.symbols
+        for info in global_symbols.values():
+            if info["type"] == "func":
+                index.function_definitions.append(index.unid_occurrence[info["unid"]])
+        index.function_definitions.sort()
+
+        # Scope spans: the whole program, and each function's DECL
+        spans = []
+        for scope in symbol_table.scopes:
+            if scope.parent_scope is None:
+                start, end = token_span(tree, first_leaf(tree, tree.root), last_leaf(tree, tree.root))
+            elif scope.scope_type == 'function':
+                # Function name leaf -> FNAME -> HEADER -> DECL
+                decl = tree.parent[tree.parent[tree.parent[global_symbols[scope.name]["unid"]]]]
+                start, end = token_span(tree, first_leaf(tree, decl), last_leaf(tree, decl))
+            else:
+                continue
+            spans.append((start, end, len(index.scopes)))
+            index.scopes.append((scope.name, scope.level, start, end))
+        index.scope_tree = IntervalTree(spans)
+        return index
+
+    '''
+    ------------------------------------------------------------------------------------------
+    Queries
+    '''
+    def occurrence(self, occurrence):
+        declaration = self.occurrence_declaration[occurrence]
+        line, col = self.occurrence_position[occurrence]
+        return Occurrence(self.names[self.occurrence_name[occurrence]], self.occurrence_unid[occurrence],
+                          line, col, declaration == occurrence)
+
+    def find(self, line, col):
+        """
+        Returns the index of the occurrence covering (line, col), or NO_NODE.
+        """
+        occurrence = bisect_right(self.occurrence_position, (line, col)) - 1
+        if occurrence < 0:
+            return NO_NODE
+        start_line, start_col = self.occurrence_position[occurrence]
+        if start_line != line or col >= start_col + len(self.names[self.occurrence_name[occurrence]]):
+            return NO_NODE
+        return occurrence
+
+    def occurrence_at(self, line, col):
+        occurrence = self.find(line, col)
+        return self.occurrence(occurrence) if occurrence != NO_NODE else None
+
+    def definition(self, line, col):
+        """
+        Returns the declaration of the name at (line, col), or None if there is no name there.
+        """
+        occurrence = self.find(line, col)
+        return self.occurrence(self.occurrence_declaration[occurrence]) if occurrence != NO_NODE else None
+
+    def references(self, line, col, include_definition=True):
+        """
+        Returns every occurrence bound to the same declaration as the name at (line, col).
+        """
+        occurrence = self.find(line, col)
+        if occurrence == NO_NODE:
+            return []
+        definition = self.occurrence_declaration[occurrence]
+        return [self.occurrence(reference) for reference in self.references_by_definition[definition]
+                if include_definition or reference != definition]
+
+    def definitions(self, name):
+        name_id = self.name_ids.get(name)
+        return [self.occurrence(occurrence) for occurrence in self.definitions_by_name.get(name_id, ())]
+
+    def functions(self):
+        return [self.occurrence(occurrence) for occurrence in self.function_definitions]
+
+    def scope_at(self, line, col):
+        """
+        Returns the innermost scope whose span contains (line, col), or None outside the program.
+        """
+        containing = self.scope_tree.stab((line, col))
+        if not containing:
+            return None
+        return ScopeSpan(*self.scopes[max(containing, key=lambda scope: self.scopes[scope][2])])
+
+    '''
+    ------------------------------------------------------------------------------------------
+    Persistence
+    '''
+    FIELDS = ('names', 'name_ids', 'occurrence_name', 'occurrence_unid', 'occurrence_position',
+              'occurrence_declaration', 'unid_occurrence', 'definitions_by_name',
+              'references_by_definition', 'function_definitions', 'scopes')
+
+    def save(self, path):
+        state = {field: getattr(self, field) for field in self.FIELDS}
+        state['scope_tree'] = self.scope_tree.state()
+        state['version'] = INDEX_FORMAT_VERSION
+        with open(path, 'wb') as f:
+            marshal.dump(state, f)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            state = marshal.load(f)
+        if state.get('version') != INDEX_FORMAT_VERSION:
+            raise ValueError(f"{path} has symbol index version {state.get('version')}, expected {INDEX_FORMAT_VERSION}.")
+        index = cls()
+        for field in cls.FIELDS:
+            setattr(index, field, state[field])
+        index.scope_tree = IntervalTree.from_state(state['scope_tree'])
+        return index
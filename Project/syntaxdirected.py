@@ -0,0 +1,183 @@
+import io
+import sys
+import contextlib
+from lexer import Lexer
+from parser import SLRParser
+
+'''
+===========================================================================================
+Syntax-directed checking with SLRParser reduction hooks.
+
+SinglePassChecker registers hooks (see SLRParser.on_reduce) that build the scopes, bind
+declarations and synthesize the type of every expression while the parser reduces, so
+declarations and types are checked in the same pass that builds the syntax tree. It applies
+the rules of semantic.SemanticAnalyzer, with the same messages, but collects every error
+instead of stopping at the first:
+    - global variables and every function live in the global scope, so any function can
+      call any other, whatever their order or nesting;
+    - a function scope holds the parameters and locals, and its parent is the enclosing
+      function's scope;
+    - functions must return num, operator and call arguments must be num, assignments and
+      returns must match the declared type. Conditions only have their names resolved, and
+      return in the main program is not type checked.
+
+Because the parse is bottom-up, a function scope is opened when its HEADER is reduced and
+closed when its DECL is reduced; calls are resolved when PROG is reduced, once every function
+is declared.
+===========================================================================================
+'''
+
+CONSTANT_TYPES = {'CONST_N': 'num', 'CONST_T': 'text'}
+
+
+class SinglePassChecker:
+    def __init__(self, parser):
+        self.scopes = [{}]  # Variable name -> data type, one dict per open scope (global first)
+        self.functions = {}  # Function name -> return type (functions are visible program-wide)
+        self.open_functions = []  # Names of the open functions, innermost last
+        self.bindings = []  # (name, kind, type, scope depth, line) for every declaration
+        self.calls = []  # FNAME tokens of the calls, resolved when PROG is reduced
+        self.errors = []
+
+        production = parser.production_number
+        parser.on_reduce('VTYP', self.type_keyword)
+        parser.on_reduce('FTYP', self.type_keyword)
+        parser.on_reduce(production('GLOBVARS', ['GLOBVARS', 'VTYP', 'VNAME', 'COMMA']), self.global_variable)
+        parser.on_reduce('LOCVARS', self.local_variables)
+        parser.on_reduce('HEADER', self.function_header)
+        parser.on_reduce('DECL', self.function_end)
+        parser.on_reduce(production('ATOMIC', ['VNAME']), self.variable_use)
+        parser.on_reduce('CONST', self.constant)
+        parser.on_reduce('CALL', self.call)
+        parser.on_reduce('OP', self.operation)
+        parser.on_reduce('ASSIGN', self.assignment)
+        parser.on_reduce(production('COMMAND', ['RETURN', 'ATOMIC']), self.return_command)
+        parser.on_reduce('PROG', self.program)
+
+    def error(self, token, message):
+        self.errors.append(f"Line {token.line_num}, column {token.col_num}: {message}")
+
+    '''
+    ------------------------------------------------------------------------------------------
+    Declarations
+    '''
+    def declare(self, token, data_type, kind):
+        scope = self.scopes[-1]
+        if token.value in scope:
+            if kind == 'param':
+                self.error(token, f"Parameter '{token.value}' is already declared in this scope.")
+            else:
+                scope_name = self.open_functions[-1] if self.open_functions else 'global'
+                self.error(token, f"Variable '{token.value}' is already declared in this scope '{scope_name}'.")
+            return
+        scope[token.value] = data_type
+        self.bindings.append((token.value, kind, data_type, len(self.scopes) - 1, token.line_num))
+
+    def type_keyword(self, values, *_):
+        return values[0].value
+
+    def global_variable(self, values, *_):
+        self.declare(values[2], values[1], 'var')
+
+    def local_variables(self, values, *_):
+        for i in range(0, 9, 3):
+            self.declare(values[i + 1], values[i], 'var')
+
+    def function_header(self, values, *_):
+        return_type, name = values[0], values[1]
+        if name.value in self.functions:
+            self.error(name, f"Function '{name.value}' is already declared in the global scope.")
+        else:
+            self.functions[name.value] = return_type
+            self.bindings.append((name.value, 'func', return_type, 0, name.line_num))
+        if return_type != 'num':
+            self.error(name, f"Function '{name.value}' has an invalid return type '{return_type}'. Only 'num' return types are allowed.")
+
+        # Parameters live in the function's own scope
+        self.scopes.append({})
+        self.open_functions.append(name.value)
+        for parameter in (values[3], values[5], values[7]):
+            self.declare(parameter, 'num', 'param')
+        return name
+
+    def function_end(self, values, *_):
+        self.open_functions.pop()
+        self.scopes.pop()
+        return values[0]
+
+    '''
+    ------------------------------------------------------------------------------------------
+    Expressions
+    '''
+    def lookup(self, token):
+        for scope in reversed(self.scopes):
+            if token.value in scope:
+                return scope[token.value]
+        self.error(token, f"'{token.value}' is used but not declared in any scope.")
+        return None
+
+    def variable_use(self, values, *_):
+        return self.lookup(values[0])
+
+    def constant(self, values, *_):
+        return CONSTANT_TYPES[values[0].type]
+
+    def call(self, values, *_):
+        name = values[0]
+        for position, argument in enumerate((values[2], values[4], values[6]), 1):
+            if argument not in ('num', None):
+                self.error(name, f"Function '{name.value}' expects 'num' type arguments, but got '{argument}' for argument {position}.")
+        self.calls.append(name)
+        return 'num'
+
+    def operation(self, values, *_):
+        # OP -> UNOP ( ARG ) | BINOP ( ARG , ARG )
+        operator = values[0]
+        for position, argument in zip(('first', 'second'), values[2::2]):
+            if argument not in ('num', None):
+                self.error(operator, f"Operator '{operator.value}' requires 'num' type arguments, but got '{argument}' for the {position} argument.")
+        return 'num'
+
+    '''
+    ------------------------------------------------------------------------------------------
+    Commands
+    '''
+    def assignment(self, values, *_):
+        # ASSIGN -> VNAME < input | VNAME = TERM
+        var_type = self.lookup(values[0])
+        expr_type = 'num' if values[1].value == '<' else values[2]
+        if var_type is not None and expr_type is not None and var_type != expr_type:
+            self.error(values[0], f"Type mismatch: Cannot assign {expr_type} to {var_type}.")
+
+    def return_command(self, values, *_):
+        if self.open_functions and values[1] is not None:
+            function = self.open_functions[-1]
+            expected = self.functions.get(function)
+            if expected is not None and expected != values[1]:
+                self.error(values[0], f"Return type mismatch in function '{function}': expected {expected}, got {values[1]}.")
+
+    def program(self, values, *_):
+        for name in self.calls:
+            if name.value not in self.functions:
+                self.error(name, f"'{name.value}' is used but not declared in any scope.")
+        return self
+
+
+def check_single_pass(input_text, input_file):
+    """
+    Lexes and parses the input with a SinglePassChecker attached and returns the checker.
+    """
+    parser = SLRParser(None, input_text, input_file, tokens=Lexer(input_text).tokenize())
+    checker = SinglePassChecker(parser)
+    with contextlib.redirect_stdout(io.StringIO()):
+        parser.parse()
+    return checker
+
+
+if __name__ == "__main__":
+    for path in sys.argv[1:]:
+        with open(path) as f:
+            checker = check_single_pass(f.read(), path)
+        print(f"{path}: {len(checker.bindings)} declarations, {len(checker.errors)} errors")
+        for message in checker.errors:
+            print("  " + message)
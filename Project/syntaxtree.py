@@ -0,0 +1,205 @@
+from array import array
+from lexer import Interner, NO_WORD
+
+'''
+===========================================================================================
+Array-backed syntax tree.
+
+Every node is an index (its UNID) into a set of parallel int arrays instead of a Python
+object, so a node costs a handful of machine ints and lookup by UNID is O(1):
+    symbol[unid]        symbol ID (index into symbol_names)
+    parent[unid]        parent UNID, or NO_NODE for the root
+    first_child[unid]   first child UNID, or NO_NODE for leaves / empty productions
+    next_sibling[unid]  next sibling UNID, or NO_NODE for the last child
+    token[unid]         index into tokens for leaves, NO_NODE for inner nodes
+UNIDs are handed out in creation order, matching the order nodes are created by the parser.
+word_ids maps a token index to the int ID of its word (see lexer.Interner), so later phases
+can key names by ID and only look at the text for output.
+===========================================================================================
+'''
+
+NO_NODE = -1
+
+
+class SyntaxTreeArena:
+    def __init__(self, symbol_names, tokens):
+        self.symbol_names = symbol_names  # Symbol ID -> grammar symbol / token class name
+        self.tokens = tokens  # Token list that leaf token indices refer to
+        self.symbol = array('i')
+        self.parent = array('i')
+        self.first_child = array('i')
+        self.next_sibling = array('i')
+        self.token = array('i')
+        self.root = NO_NODE
+        self.last_child = {}  # List node UNID -> last child UNID, kept by append_children
+        self.cached_word_ids = None
+
+    def __len__(self):
+        return len(self.symbol)
+
+    def add_leaf(self, symbol_id, token_index):
+        """
+        Adds a leaf node for the token at token_index and returns its UNID.
+        """
+        unid = len(self.symbol)
+        self.symbol.append(symbol_id)
+        self.parent.append(NO_NODE)
+        self.first_child.append(NO_NODE)
+        self.next_sibling.append(NO_NODE)
+        self.token.append(token_index)
+        return unid
+
+    def add_inner(self, symbol_id, children):
+        """
+        Adds an inner node over the given child UNIDs (in order) and returns its UNID.
+        """
+        unid = len(self.symbol)
+        self.symbol.append(symbol_id)
+        self.parent.append(NO_NODE)
+        self.next_sibling.append(NO_NODE)
+        self.token.append(NO_NODE)
+
+        parent = self.parent
+        next_sibling = self.next_sibling
+        previous = NO_NODE
+        for child in children:
+            parent[child] = unid
+            if previous != NO_NODE:
+                next_sibling[previous] = child
+            previous = child
+        self.first_child.append(children[0] if children else NO_NODE)
+        return unid
+
+    def append_children(self, unid, children):
+        """
+        Appends child UNIDs to an existing inner node (used for flat list nodes).
+        """
+        if not children:
+            return
+        parent = self.parent
+        next_sibling = self.next_sibling
+        previous = self.last_child.get(unid)
+        if previous is None:
+            # First extension: find the current last child once
+            previous = self.first_child[unid]
+            while previous != NO_NODE and next_sibling[previous] != NO_NODE:
+                previous = next_sibling[previous]
+        if previous == NO_NODE:
+            self.first_child[unid] = children[0]
+        for child in children:
+            parent[child] = unid
+            if previous != NO_NODE:
+                next_sibling[previous] = child
+            previous = child
+        self.last_child[unid] = previous
+
+    @property
+    def word_ids(self):
+        """
+        Token index -> word ID: the lexer's IDs, or IDs interned here for tokens without one.
+        """
+        if self.cached_word_ids is None:
+            word_ids = array('i', [token.word_id for token in self.tokens])
+            if NO_WORD in word_ids:
+                interner = Interner()
+                word_ids = array('i', [interner.intern(token.value) for token in self.tokens])
+            self.cached_word_ids = word_ids
+        return self.cached_word_ids
+
+    '''
+    ------------------------------------------------------------------------------------------
+    '''
+    def is_leaf(self, unid):
+        return self.token[unid] != NO_NODE
+
+    def symb(self, unid):
+        """
+        Returns the grammar symbol (inner nodes) or token class (leaves) of a node.
+        """
+        return self.symbol_names[self.symbol[unid]]
+
+    def terminal(self, unid):
+        """
+        Returns the Token of a leaf node, or None for inner nodes.
+        """
+        index = self.token[unid]
+        return self.tokens[index] if index != NO_NODE else None
+
+    def iter_children(self, unid):
+        child = self.first_child[unid]
+        next_sibling = self.next_sibling
+        while child != NO_NODE:
+            yield child
+            child = next_sibling[child]
+
+    def children(self, unid):
+        return list(self.iter_children(unid))
+
+    def inner_unids(self):
+        """
+        Yields the UNIDs of all inner nodes (including the root) in creation order.
+        """
+        token = self.token
+        return (unid for unid in range(len(token)) if token[unid] == NO_NODE)
+
+    def leaf_unids(self):
+        """
+        Yields the UNIDs of all leaf nodes in creation order.
+        """
+        token = self.token
+        return (unid for unid in range(len(token)) if token[unid] != NO_NODE)
+
+    def node(self, unid):
+        return NodeView(self, unid)
+
+    def memory_usage(self):
+        """
+        Returns the number of bytes used by the node arrays.
+        """
+        return sum(a.itemsize * len(a) for a in
+                   (self.symbol, self.parent, self.first_child, self.next_sibling, self.token))
+
+
+'''
+------------------------------------------------------------------------------------------
+'''
+class NodeView:
+    """
+    Thin read-only view of one node in a SyntaxTreeArena, exposing the same attributes as
+    the old node objects (unid, symb, parent, children, terminal).
+    """
+    __slots__ = ('arena', 'unid')
+
+    def __init__(self, arena, unid):
+        self.arena = arena
+        self.unid = unid
+
+    @property
+    def symb(self):
+        return self.arena.symb(self.unid)
+
+    @property
+    def parent(self):
+        parent = self.arena.parent[self.unid]
+        return parent if parent != NO_NODE else None
+
+    @property
+    def children(self):
+        return self.arena.children(self.unid)
+
+    @property
+    def terminal(self):
+        return self.arena.terminal(self.unid)
+
+    @property
+    def is_leaf(self):
+        return self.arena.is_leaf(self.unid)
+
+    def __eq__(self, other):
+        return isinstance(other, NodeView) and other.arena is self.arena and other.unid == self.unid
+
+    def __hash__(self):
+        return hash(self.unid)
+
+    def __repr__(self):
+        return f"NodeView({self.unid}, {self.symb})"
@@ -0,0 +1,402 @@
+from array import array
+import hashlib
+import marshal
+import os
+import tempfile
+
+'''
+===========================================================================================
+SLR(1) parsing table generator.
+
+Builds the canonical LR(0) item sets for the grammar rules used by SLRParser, computes
+FIRST/FOLLOW sets and fills the action/goto tables from them. The generated tables are
+cached on disk (keyed by a hash of the grammar) so parser construction is a cheap load.
+===========================================================================================
+'''
+
+# Bump whenever the layout of the cached tables changes
+TABLE_CACHE_VERSION = 1
+
+# Default cache location, next to the parser modules
+DEFAULT_CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'slr_tables.cache')
+
+# Grammar terminals whose token class (as produced by the lexer) has a different name,
+# because the token class is also the name of a nonterminal
+TERMINAL_ALIASES = {
+    'FNAME_ID': 'FNAME',
+    'ASSIGN_OP': 'ASSIGN',
+}
+
+END_MARKER = 'EOF'
+
+
+class TableConflictError(Exception):
+    """Exception raised when the grammar is not SLR(1)."""
+
+    def __init__(self, conflicts):
+        lines = [f"state {state}, lookahead {symbol}: {first} / {second}"
+                 for state, symbol, first, second in conflicts]
+        super().__init__("Grammar is not SLR(1):\n" + "\n".join(lines))
+        self.conflicts = conflicts
+
+
+'''
+------------------------------------------------------------------------------------------
+'''
+def grammar_symbols(grammar_rules):
+    """
+    Returns (nonterminals, terminals) in order of first appearance in the grammar.
+    """
+    nonterminals = []
+    for rule in grammar_rules:
+        if rule.lhs not in nonterminals:
+            nonterminals.append(rule.lhs)
+
+    terminals = []
+    for rule in grammar_rules:
+        for symbol in rule.rhs:
+            if symbol not in nonterminals and symbol not in terminals:
+                terminals.append(symbol)
+    terminals.append(END_MARKER)
+
+    return nonterminals, terminals
+
+
+def compute_first_sets(grammar_rules, nonterminals):
+    """
+    Computes FIRST sets for every nonterminal. Epsilon is represented by ''.
+    """
+    first = {nt: set() for nt in nonterminals}
+
+    changed = True
+    while changed:
+        changed = False
+        for rule in grammar_rules:
+            before = len(first[rule.lhs])
+            first[rule.lhs] |= first_of_sequence(rule.rhs, first)
+            if len(first[rule.lhs]) != before:
+                changed = True
+
+    return first
+
+
+def first_of_sequence(symbols, first):
+    """
+    Computes the FIRST set of a sequence of grammar symbols.
+    """
+    result = set()
+    for symbol in symbols:
+        if symbol not in first:
+            # Terminal symbol
+            result.add(symbol)
+            return result
+        result |= first[symbol] - {''}
+        if '' not in first[symbol]:
+            return result
+    # Every symbol in the sequence can derive epsilon
+    result.add('')
+    return result
+
+
+def compute_follow_sets(grammar_rules, nonterminals, first):
+    """
+    Computes FOLLOW sets for every nonterminal. The start symbol is followed by EOF.
+    """
+    follow = {nt: set() for nt in nonterminals}
+    follow[grammar_rules[0].lhs].add(END_MARKER)
+
+    changed = True
+    while changed:
+        changed = False
+        for rule in grammar_rules:
+            for i, symbol in enumerate(rule.rhs):
+                if symbol not in follow:
+                    continue
+                before = len(follow[symbol])
+                rest = first_of_sequence(rule.rhs[i + 1:], first)
+                follow[symbol] |= rest - {''}
+                if '' in rest:
+                    follow[symbol] |= follow[rule.lhs]
+                if len(follow[symbol]) != before:
+                    changed = True
+
+    return follow
+
+
+'''
+------------------------------------------------------------------------------------------
+'''
+def build_lr0_item_sets(grammar_rules, nonterminals, terminals):
+    """
+    Builds the canonical collection of LR(0) item sets.
+
+    Items are (production_number, dot_position) pairs. The augmented start production
+    PROG' -> PROG uses production number -1. Returns (item_sets, transitions) where
+    transitions maps (state, symbol) to the target state.
+    """
+    productions_for = {nt: [] for nt in nonterminals}
+    for number, rule in enumerate(grammar_rules):
+        productions_for[rule.lhs].append(number)
+
+    start_symbol = grammar_rules[0].lhs
+
+    def rhs_of(number):
+        return [start_symbol] if number == -1 else grammar_rules[number].rhs
+
+    def closure(items):
+        result = set(items)
+        worklist = list(items)
+        while worklist:
+            number, dot = worklist.pop()
+            rhs = rhs_of(number)
+            if dot < len(rhs) and rhs[dot] in productions_for:
+                for next_number in productions_for[rhs[dot]]:
+                    item = (next_number, 0)
+                    if item not in result:
+                        result.add(item)
+                        worklist.append(item)
+        return frozenset(result)
+
+    symbols = nonterminals + terminals
+    item_sets = [closure([(-1, 0)])]
+    state_of = {item_sets[0]: 0}
+    transitions = {}
+
+    state = 0
+    while state < len(item_sets):
+        items = item_sets[state]
+        for symbol in symbols:
+            moved = [(number, dot + 1) for number, dot in items
+                     if dot < len(rhs_of(number)) and rhs_of(number)[dot] == symbol]
+            if not moved:
+                continue
+            target = closure(moved)
+            if target not in state_of:
+                state_of[target] = len(item_sets)
+                item_sets.append(target)
+            transitions[(state, symbol)] = state_of[target]
+        state += 1
+
+    return item_sets, transitions
+
+
+def build_slr_tables(grammar_rules):
+    """
+    Builds the SLR(1) action and goto tables for the given grammar rules.
+
+    Returns (action_table, goto_table, conflicts). Action table keys use lexer token classes
+    (see TERMINAL_ALIASES); conflicts is a list of (state, lookahead, kept, rejected).
+    """
+    nonterminals, terminals = grammar_symbols(grammar_rules)
+    first = compute_first_sets(grammar_rules, nonterminals)
+    follow = compute_follow_sets(grammar_rules, nonterminals, first)
+    item_sets, transitions = build_lr0_item_sets(grammar_rules, nonterminals, terminals)
+
+    action_table = {}
+    goto_table = {}
+    conflicts = []
+
+    def set_action(state, symbol, action):
+        key = (state, TERMINAL_ALIASES.get(symbol, symbol))
+        existing = action_table.get(key)
+        if existing is None:
+            action_table[key] = action
+        elif existing != action:
+            conflicts.append((state, key[1], existing, action))
+
+    for state, items in enumerate(item_sets):
+        for number, dot in sorted(items):
+            rhs = [grammar_rules[0].lhs] if number == -1 else grammar_rules[number].rhs
+            if dot < len(rhs):
+                symbol = rhs[dot]
+                if symbol not in follow:
+                    set_action(state, symbol, ('shift', transitions[(state, symbol)]))
+            elif number == -1:
+                set_action(state, END_MARKER, ('accept',))
+            else:
+                for lookahead in sorted(follow[grammar_rules[number].lhs], key=terminals.index):
+                    set_action(state, lookahead, ('reduce', number))
+
+        for nonterminal in nonterminals:
+            if (state, nonterminal) in transitions:
+                goto_table[(state, nonterminal)] = transitions[(state, nonterminal)]
+
+    return action_table, goto_table, conflicts
+
+
+'''
+------------------------------------------------------------------------------------------
+'''
+def grammar_hash(grammar_rules):
+    """
+    Returns a stable hash of the grammar used to key the table cache.
+    """
+    text = "\n".join(repr(rule) for rule in grammar_rules)
+    text += "\n" + repr(sorted(TERMINAL_ALIASES.items()))
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def write_file_atomically(path, data):
+    """
+    Writes data (bytes) to a temporary file next to path and renames it into place, so a
+    concurrent reader sees either the old file or the complete new one, never a partial one.
+    """
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', prefix=os.path.basename(path) + '.',
+                                     suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def load_parsing_tables(grammar_rules, cache_file=DEFAULT_CACHE_FILE):
+    """
+    Returns (action_table, goto_table) for the grammar, loading them from the cache file
+    when it matches the grammar and cache version, and regenerating (and re-caching) them
+    otherwise. Raises TableConflictError if the grammar has SLR(1) conflicts.
+    """
+    digest = grammar_hash(grammar_rules)
+
+    if cache_file and os.path.exists(cache_file):
+        try:
+            with open(cache_file, 'rb') as f:
+                cached = marshal.load(f)
+            if cached.get('version') == TABLE_CACHE_VERSION and cached.get('grammar') == digest:
+                return cached['action'], cached['goto']
+        except (OSError, EOFError, ValueError, TypeError, AttributeError):
+            pass  # Stale, truncated or corrupt cache: a miss, regenerate below
+
+    action_table, goto_table, conflicts = build_slr_tables(grammar_rules)
+    if conflicts:
+        raise TableConflictError(conflicts)
+
+    if cache_file:
+        try:
+            write_file_atomically(cache_file, marshal.dumps({
+                'version': TABLE_CACHE_VERSION,
+                'grammar': digest,
+                'action': action_table,
+                'goto': goto_table,
+            }))
+        except OSError:
+            pass  # Read-only location (e.g. a packaged executable), keep tables in memory
+
+    return action_table, goto_table
+
+
+'''
+------------------------------------------------------------------------------------------
+'''
+class DenseTables:
+    """
+    Integer-coded form of the action/goto tables used by the parse loop.
+
+    Every terminal (token class) and nonterminal gets a small integer ID. Actions are stored
+    in a flat array indexed by state * n_terminals + terminal_id:
+        0            error
+        s + 1        shift and go to state s
+        -(p + 1)     reduce by production p
+        accept_code  accept
+    Gotos are stored in a flat array indexed by state * n_nonterminals + nonterminal_id.
+    prod_lhs/prod_len hold the LHS nonterminal ID and RHS length of every production, and
+    prod_is_list marks left-recursive list productions (A -> A ...), whose reductions extend
+    the existing A node instead of nesting a new one.
+    """
+
+    def __init__(self, action_table, goto_table, grammar_rules):
+        nonterminals, _ = grammar_symbols(grammar_rules)
+        self.nonterminals = nonterminals
+        self.nonterminal_ids = {symbol: i for i, symbol in enumerate(nonterminals)}
+
+        self.terminals = []
+        for _, symbol in action_table:
+            if symbol not in self.terminals:
+                self.terminals.append(symbol)
+        self.terminal_ids = {symbol: i for i, symbol in enumerate(self.terminals)}
+
+        self.n_states = 1 + max(state for state, _ in list(action_table) + list(goto_table))
+        self.n_terminals = len(self.terminals)
+        self.n_nonterminals = len(nonterminals)
+        self.accept_code = -(len(grammar_rules) + 1)
+
+        self.action = array('i', bytes(4 * self.n_states * self.n_terminals))
+        for (state, symbol), action in action_table.items():
+            self.action[state * self.n_terminals + self.terminal_ids[symbol]] = self.encode_action(action)
+
+        self.goto = array('i', [-1]) * (self.n_states * self.n_nonterminals)
+        for (state, symbol), target in goto_table.items():
+            self.goto[state * self.n_nonterminals + self.nonterminal_ids[symbol]] = target
+
+        self.prod_lhs = array('i', [self.nonterminal_ids[rule.lhs] for rule in grammar_rules])
+        self.prod_len = array('i', [len(rule.rhs) for rule in grammar_rules])
+        self.prod_is_list = array('b', [bool(rule.rhs) and rule.rhs[0] == rule.lhs for rule in grammar_rules])
+
+        # Token classes with a non-error action, per state (used for syntax error reporting)
+        self.expected_by_state = [self.expected_terminals(state) for state in range(self.n_states)]
+
+    def encode_action(self, action):
+        """
+        Encodes an ('shift', s) / ('reduce', p) / ('accept',) tuple as a signed int.
+        """
+        if action[0] == 'shift':
+            return action[1] + 1
+        if action[0] == 'reduce':
+            return -(action[1] + 1)
+        return self.accept_code
+
+    def decode_action(self, code):
+        """
+        Decodes a signed int action back to its tuple form (None for an error entry).
+        """
+        if code == 0:
+            return None
+        if code == self.accept_code:
+            return ('accept',)
+        if code > 0:
+            return ('shift', code - 1)
+        return ('reduce', -code - 1)
+
+    def encode_tokens(self, tokens):
+        """
+        Maps a list of tokens to terminal IDs. Unknown token classes map to -1.
+        """
+        terminal_ids = self.terminal_ids
+        return [terminal_ids.get(token.type, -1) for token in tokens]
+
+    def expected_terminals(self, state):
+        """
+        Returns the token classes that have a non-error action in the given state.
+        """
+        row = state * self.n_terminals
+        return [symbol for i, symbol in enumerate(self.terminals) if self.action[row + i] != 0]
+
+
+def print_tables(action_table, goto_table):
+    """
+    Prints the action and goto tables, one state per line.
+    """
+    states = sorted({state for state, _ in action_table} | {state for state, _ in goto_table})
+    for state in states:
+        actions = [f"{symbol}:{action[0][0]}{action[1] if len(action) > 1 else ''}"
+                   for (s, symbol), action in action_table.items() if s == state]
+        gotos = [f"{symbol}:{target}" for (s, symbol), target in goto_table.items() if s == state]
+        print(f"{state:4}  {' '.join(actions)}  |  {' '.join(gotos)}")
+
+
+if __name__ == "__main__":
+    from parser import SLRParser
+
+    rules = SLRParser.__new__(SLRParser)
+    rules.initialize_grammar_rules()
+    action_table, goto_table, conflicts = build_slr_tables(rules.grammar_rules)
+    print_tables(action_table, goto_table)
+    if conflicts:
+        print(TableConflictError(conflicts))
+    else:
+        print(f"{len(action_table)} actions, {len(goto_table)} gotos, no conflicts.")
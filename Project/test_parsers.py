@@ -0,0 +1,223 @@
+import io
+import os
+import sys
+import random
+import tempfile
+import unittest
+import contextlib
+import inspect
+import parsergen
+from lexer import Lexer, Token
+from parser import SLRParser, PARSE_ENGINES
+from tablegen import TERMINAL_ALIASES, grammar_symbols
+from lowering import lower, count_nodes
+from semantic import analyze_syntax_tree
+from translate import translate_condition
+from benchmark import (EXAMPLE_INPUTS, generate_program, parse_with_engine, same_tree, deep_expression,
+                       deep_condition, nested_functions_program)
+
+'''
+===========================================================================================
+Correctness checks for the parse engines, without timing (benchmark.py has the
+measurements). Run from this folder with: python -m unittest test_parsers
+===========================================================================================
+'''
+EXAMPLE_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "inputholder")
+
+
+def read_example(name):
+    with open(os.path.join(EXAMPLE_FOLDER, name)) as f:
+        return f.read()
+
+
+def quiet_parser(text, name="test", **options):
+    """
+    Returns an SLRParser for the text that does not write the XML output on accept.
+    """
+    parser = SLRParser(None, text, name, tokens=Lexer(text).tokenize(), **options)
+    parser.accept = lambda: True
+    return parser
+
+
+def run_quietly(parse, parser):
+    """
+    Runs parse(parser) with its progress output suppressed and returns the parser.
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        parse(parser)
+    return parser
+
+
+def minimal_heights(grammar_rules, nonterminals):
+    """
+    Returns the height of the smallest derivation of every nonterminal.
+    """
+    heights = {}
+    changed = True
+    while changed:
+        changed = False
+        for rule in grammar_rules:
+            if all(symbol in heights or symbol not in nonterminals for symbol in rule.rhs):
+                height = 1 + max((heights.get(symbol, 0) for symbol in rule.rhs), default=0)
+                if height < heights.get(rule.lhs, height + 1):
+                    heights[rule.lhs] = height
+                    changed = True
+    return heights
+
+
+def random_token_stream(grammar_rules, rng, max_depth=8):
+    """
+    Derives a random sentence of the grammar and returns it as a token list (with EOF).
+    Below max_depth productions are picked at random, beyond it the shallowest one is.
+    """
+    nonterminals, _ = grammar_symbols(grammar_rules)
+    heights = minimal_heights(grammar_rules, nonterminals)
+    productions = {symbol: [rule.rhs for rule in grammar_rules if rule.lhs == symbol] for symbol in nonterminals}
+    tokens = []
+    pending = [(grammar_rules[0].lhs, 0)]
+    while pending:
+        symbol, depth = pending.pop()
+        if symbol not in productions:
+            token_type = TERMINAL_ALIASES.get(symbol, symbol)
+            tokens.append(Token(token_type, token_type.lower(), len(tokens) + 1, 1))
+            continue
+        options = productions[symbol]
+        if depth < max_depth:
+            rhs = rng.choice(options)
+        else:
+            rhs = min(options, key=lambda rhs: max((heights.get(s, 0) for s in rhs), default=0))
+        pending.extend((child, depth + 1) for child in reversed(rhs))
+    tokens.append(Token('EOF', '$', len(tokens) + 1, 1))
+    return tokens
+
+
+def mutate(tokens, rng):
+    """
+    Returns a copy of tokens with one token (before EOF) deleted or duplicated.
+    """
+    mutated = list(tokens)
+    index = rng.randrange(len(mutated) - 1)
+    if rng.random() < 0.5:
+        del mutated[index]
+    else:
+        mutated.insert(index, mutated[rng.randrange(len(mutated) - 1)])
+    return mutated
+
+
+'''
+------------------------------------------------------------------------------------------
+'''
+class GeneratedParserTest(unittest.TestCase):
+    def assert_same_as_table_parser(self, text, name="test"):
+        generated = run_quietly(parsergen.parse_generated, quiet_parser(text, name))
+        reference = run_quietly(SLRParser.parse_tables, quiet_parser(text, name))
+        self.assertTrue(same_tree(generated.syntax_tree, reference.syntax_tree))
+
+    def test_examples(self):
+        for name in EXAMPLE_INPUTS:
+            with self.subTest(name):
+                self.assert_same_as_table_parser(read_example(name), name)
+
+    def test_generated_program(self):
+        self.assert_same_as_table_parser(generate_program(200, n_functions=20))
+
+    def test_cache_file_is_written_whole(self):
+        parser = quiet_parser("")
+        loaded = dict(parsergen._loaded_parsers)
+        parsergen._loaded_parsers.clear()  # Force a regeneration into the cache file
+        try:
+            with tempfile.TemporaryDirectory() as directory:
+                cache_file = os.path.join(directory, 'slr_parser_generated.py')
+                module = parsergen.load_generated_parser(parser.dense_tables, parser.grammar_rules, cache_file)
+                self.assertEqual(os.listdir(directory), ['slr_parser_generated.py'])
+                self.assertEqual(module.GRAMMAR_HASH, parsergen.grammar_hash(parser.grammar_rules))
+                self.assertEqual(module.__file__, cache_file)
+        finally:
+            parsergen._loaded_parsers.clear()
+            parsergen._loaded_parsers.update(loaded)
+
+
+class ParseEngineTest(unittest.TestCase):
+    """
+    Differential check: every engine must build the same tree as the table parser, or raise
+    the same syntax error, for valid programs and for copies with one token deleted or
+    duplicated.
+    """
+    def assert_engines_agree(self, tokens):
+        reference, reference_error = parse_with_engine(tokens, 'table')
+        for engine in PARSE_ENGINES[1:]:
+            parser, error = parse_with_engine(tokens, engine)
+            self.assertEqual(error, reference_error, engine)
+            if reference_error is None:
+                self.assertTrue(same_tree(parser.syntax_tree, reference.syntax_tree), engine)
+        return reference_error
+
+    def test_random_token_streams(self, n_programs=300, seed=341):
+        rng = random.Random(seed)
+        grammar_rules = quiet_parser("").grammar_rules
+        for i in range(n_programs):
+            tokens = random_token_stream(grammar_rules, rng, max_depth=rng.randint(4, 12))
+            with self.subTest(program=i):
+                self.assertIsNone(self.assert_engines_agree(tokens))
+                self.assert_engines_agree(mutate(tokens, rng))
+
+    def test_many_functions(self, n_programs=20, seed=40):
+        # Enough top-level DECLs for the parallel engine to split the input
+        rng = random.Random(seed)
+        tokens = Lexer(generate_program(20, n_functions=8)).tokenize()
+        self.assertIsNone(self.assert_engines_agree(tokens))
+        for i in range(n_programs):
+            with self.subTest(program=i):
+                self.assert_engines_agree(mutate(tokens, rng))
+
+
+class DeepNestingTest(unittest.TestCase):
+    """
+    Every phase must handle input nested far deeper than the recursion limit allows.
+    """
+    depth = 3000
+
+    def setUp(self):
+        self.recursion_limit = sys.getrecursionlimit()
+        sys.setrecursionlimit(len(inspect.stack()) + 100)
+
+    def tearDown(self):
+        sys.setrecursionlimit(self.recursion_limit)
+
+    def compile(self, text):
+        """
+        Parses text with every engine, then writes the XML, lowers and analyzes the tree.
+        """
+        tokens = Lexer(text).tokenize()
+        reference, error = parse_with_engine(tokens, 'table')
+        self.assertIsNone(error)
+        for engine in PARSE_ENGINES[1:]:
+            parser, error = parse_with_engine(tokens, engine)
+            self.assertIsNone(error, engine)
+            self.assertTrue(same_tree(parser.syntax_tree, reference.syntax_tree), engine)
+        with tempfile.TemporaryDirectory() as directory:
+            reference.generate_syntax_tree_xml(os.path.join(directory, "syntaxtree.xml"))
+        program = lower(reference.syntax_tree)
+        analyze_syntax_tree(reference.syntax_tree, text.splitlines(), "test")
+        return program
+
+    def test_deep_expression(self):
+        text = "\n".join(["main", "num V_x ,", "begin", f"  V_x = {deep_expression(self.depth)} ;", "end"]) + "\n"
+        # Program, Decl, 3 Vars, Assign, one node per level and a constant per add level
+        self.assertEqual(count_nodes(self.compile(text)), 6 + self.depth + self.depth // 2)
+
+    def test_deep_branches(self):
+        branch = "skip ;"
+        for _ in range(self.depth):
+            branch = f"if eq ( V_x , 1 ) then begin {branch} end else begin halt ; end ;"
+        self.compile("\n".join(["main", "num V_x ,", "begin", branch, "end"]) + "\n")
+
+    def test_deep_functions(self):
+        self.compile(nested_functions_program(self.depth // 10, 1))
+
+    def test_deep_condition(self):
+        self.assertEqual(translate_condition(deep_condition(self.depth)).count(" And "), self.depth)
+
+
+if __name__ == "__main__":
+    unittest.main()
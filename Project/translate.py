@@ -1,4 +1,5 @@
 import re
+from treewalk import fold, parse_call_expression, expr_children, join_pieces
 
 def translate_condition(condition_str):
     """
@@ -20,57 +21,49 @@ def translate_condition(condition_str):
         'or': 'Or'
     }
     
-    def parse_condition(cond):
-        cond = cond.strip()
-        
-        # Match logical operators with two operands: and(cond1, cond2) or or(cond1, cond2)
-        logical_match = re.match(r'^(and|or)\s*\(\s*(.+)\s*,\s*(.+)\s*\)$', cond, re.IGNORECASE)
-        if logical_match:
-            logical_op = logical_match.group(1).lower()
-            operand1 = logical_match.group(2).strip()
-            operand2 = logical_match.group(3).strip()
-            
-            # Recursively parse operands
-            translated_operand1 = parse_condition(operand1)
-            translated_operand2 = parse_condition(operand2)
-            
+    # Each node translates to a string or a rope of its pieces (see treewalk.join_pieces)
+    def translate_node(node, operands):
+        # Logical operators with two operands: and(cond1, cond2) or or(cond1, cond2)
+        if node.kind == 'call' and node.name.lower() in ('and', 'or') and len(operands) == 2 and all(operands):
+            logical_op = node.name.lower()
+
             # Map logical operator
             mapped_logical_op = operator_mapping.get(logical_op, logical_op)
-            
-            return f"{translated_operand1} {mapped_logical_op} {translated_operand2}"
-        
-        # Match binary comparison operators: grt(V_x, V_y), lt(V_a, V_b), eq(V_a, 0), etc.
-        binary_match = re.match(r'^(grt|lt|eq)\s*\(\s*(\w+)\s*,\s*([\w"]+)\s*\)$', cond, re.IGNORECASE)
-        if binary_match:
-            comp_op = binary_match.group(1).lower()
-            left_operand = binary_match.group(2)
-            right_operand = binary_match.group(3)
-            
-            # Map comparison operator
-            mapped_comp_op = operator_mapping.get(comp_op, comp_op)
-            
-            return f"{left_operand} {mapped_comp_op} {right_operand}"
-        
+
+            return (operands[0], f" {mapped_logical_op} ", operands[1])
+
+        # Binary comparison operators: grt(V_x, V_y), lt(V_a, V_b), eq(V_a, 0), etc.
+        if node.kind == 'call' and node.name.lower() in ('grt', 'lt', 'eq') and len(operands) == 2:
+            left_operand, right_operand = (operand.text for operand in node.children)
+            if re.fullmatch(r'\w+', left_operand) and re.fullmatch(r'[\w"]+', right_operand):
+                # Map comparison operator
+                mapped_comp_op = operator_mapping.get(node.name.lower())
+
+                return f"{left_operand} {mapped_comp_op} {right_operand}"
+
         # If condition is a simple comparison like V_x > V_y
+        cond = node.text
         simple_cmp_match = re.match(r'^(\w+)\s*([><=]+)\s*([\w"]+)$', cond)
         if simple_cmp_match:
             left = simple_cmp_match.group(1)
             operator = simple_cmp_match.group(2)
             right = simple_cmp_match.group(3)
             return f"{left} {operator} {right}"
-        
+
         # Handle cases where condition might be enclosed in parentheses
-        parenthesis_match = re.match(r'^\(\s*(.+)\s*\)$', cond)
-        if parenthesis_match:
-            inner_cond = parenthesis_match.group(1).strip()
-            return f"({parse_condition(inner_cond)})"
-        
+        if node.kind == 'group' and operands[0]:
+            return ("(", operands[0], ")")
+
         # If none of the above, return the condition as is
         return cond
 
-    # Start parsing from the full condition string
-    translated_condition = parse_condition(condition_str)
-    return translated_condition
+    # Parse the condition once and translate it bottom-up (see treewalk.py)
+    try:
+        tree = parse_call_expression(condition_str)
+    except ValueError:
+        return condition_str.strip()
+    translated_condition = fold(tree, expr_children, translate_node)
+    return join_pieces(translated_condition)
 
 def translate_expression(expr):
     """
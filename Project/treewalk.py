@@ -0,0 +1,187 @@
+import re
+
+'''
+===========================================================================================
+Explicit-stack tree traversals.
+
+Every tree walk in the compiler goes through these helpers instead of recursing once per
+nesting level, so deeply nested expressions and long statement chains cost heap memory,
+not Python stack frames, and never hit the recursion limit:
+    fold(root, children, combine)   bottom-up: combine(node, child_results) per node
+    preorder(root, children)        top-down: yields (node, depth) in document order
+children(node) returns the child nodes of any tree (arena UNIDs, AST objects, ExprNodes).
+
+parse_call_expression() turns the "name(arg, arg, ...)" expression strings that the
+line-based translator (translate.py) works on into an ExprNode tree in one left to right
+scan, so it can fold over it instead of re-matching regexes per level.
+===========================================================================================
+'''
+
+NAME_PATTERN = re.compile(r'\w+')
+
+
+def fold(root, children, combine):
+    """
+    Computes combine(node, child_results) for every node below root, children first (in
+    order), and returns the result for root.
+    """
+    results = []
+    # (node, index in results where its child results start, or None before expansion)
+    pending = [(root, None)]
+    while pending:
+        node, start = pending.pop()
+        if start is None:
+            pending.append((node, len(results)))
+            pending.extend((child, None) for child in reversed(children(node)))
+            continue
+        child_results = results[start:]
+        del results[start:]
+        results.append(combine(node, child_results))
+    return results[0]
+
+
+def preorder(root, children):
+    """
+    Yields (node, depth) for every node below root in document order.
+    """
+    pending = [(root, 0)]
+    while pending:
+        node, depth = pending.pop()
+        yield node, depth
+        pending.extend((child, depth + 1) for child in reversed(children(node)))
+
+
+'''
+------------------------------------------------------------------------------------------
+'''
+class ExprNode:
+    """
+    Node of an expression string:
+        'call'   name(args...)  children are the arguments
+        'group'  ( ... )        children is the single inner expression
+        'text'   anything else (a name, literal or unparsed span), no children
+    text is the stripped source span of the node, sliced on demand so that building the
+    tree stays linear in the length of the expression.
+    """
+    __slots__ = ('kind', 'name', 'children', 'source', 'start', 'end')
+
+    def __init__(self, kind, name, children, source, start, end):
+        self.kind = kind
+        self.name = name
+        self.children = children
+        self.source = source
+        self.start = start
+        self.end = end
+
+    @property
+    def text(self):
+        return self.source[self.start:self.end]
+
+    def __repr__(self):
+        return f"ExprNode({self.kind}, {self.text!r})"
+
+
+class ExprFrame:
+    """
+    An open call, group or the whole expression while scanning.
+    """
+    __slots__ = ('kind', 'name', 'start', 'args', 'arg_start', 'arg_node', 'mixed')
+
+    def __init__(self, kind, name, start, arg_start):
+        self.kind = kind
+        self.name = name
+        self.start = start  # Index where the node's text starts
+        self.args = []
+        self.arg_start = arg_start  # Index where the current argument starts
+        self.arg_node = None  # Call or group that makes up the current argument so far
+        self.mixed = False  # A group with a top-level comma stays text
+
+
+def stripped_bounds(text, start, end):
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return start, end
+
+
+def finish_argument(text, frame, end):
+    start, end = stripped_bounds(text, frame.arg_start, end)
+    node = frame.arg_node
+    frame.arg_node = None
+    if node is not None and node.start == start and node.end == end:
+        return node
+    return ExprNode('text', None, [], text, start, end)
+
+
+def parse_call_expression(text):
+    """
+    Parses an expression string into an ExprNode tree without recursion. Raises ValueError
+    for unbalanced parentheses or quotes.
+    """
+    frames = [ExprFrame('top', None, 0, 0)]
+    index = 0
+    length = len(text)
+    while index < length:
+        char = text[index]
+        if char == '"':
+            index = text.find('"', index + 1)
+            if index < 0:
+                raise ValueError(f"Unterminated string in {text!r}")
+        elif char == '(':
+            frame = frames[-1]
+            before = text[frame.arg_start:index]
+            name = before.strip()
+            if NAME_PATTERN.fullmatch(name):
+                frames.append(ExprFrame('call', name, frame.arg_start + len(before) - len(before.lstrip()),
+                                        index + 1))
+            else:
+                frames.append(ExprFrame('group', None, index, index + 1))
+        elif char == ',':
+            frame = frames[-1]
+            if frame.kind == 'call':
+                frame.args.append(finish_argument(text, frame, index))
+                frame.arg_start = index + 1
+            else:
+                frame.mixed = True
+        elif char == ')':
+            if len(frames) == 1:
+                raise ValueError(f"Unbalanced ')' in {text!r}")
+            frame = frames.pop()
+            last = finish_argument(text, frame, index)
+            if frame.kind == 'call':
+                if last.end > last.start or frame.args:
+                    frame.args.append(last)
+                node = ExprNode('call', frame.name, frame.args, text, frame.start, index + 1)
+            elif frame.mixed:
+                node = ExprNode('text', None, [], text, frame.start, index + 1)
+            else:
+                node = ExprNode('group', None, [last], text, frame.start, index + 1)
+            frames[-1].arg_node = node
+        index += 1
+    if len(frames) != 1:
+        raise ValueError(f"Unbalanced '(' in {text!r}")
+    top = frames[0]
+    node = finish_argument(text, top, length)
+    return ExprNode('text', None, [], text, node.start, node.end) if top.mixed else node
+
+
+def expr_children(node):
+    return node.children
+
+
+def join_pieces(rope):
+    """
+    Joins a rope of nested tuples of strings (as built by folds that produce text) into one
+    string in linear time; building the text by concatenation at every level of a deep tree
+    would copy it once per level.
+    """
+    pieces = []
+    pending = [rope]
+    while pending:
+        item = pending.pop()
+        if isinstance(item, str):
+            pieces.append(item)
+        else:
+            pending.extend(reversed(item))
+    return "".join(pieces)
@@ -0,0 +1,114 @@
+import xml.etree.ElementTree as ET
+from array import array
+from lexer import Token, Interner
+from syntaxtree import SyntaxTreeArena, NO_NODE
+
+'''
+===========================================================================================
+Streaming readers for the token stream and syntax tree XML.
+
+Both readers walk the document with ET.iterparse and yield each TOK / LEAF as soon as its end
+tag has been read. Processed elements are cleared from their parent straight away, so memory
+stays bounded by one record no matter how large the file is, and callers can start working
+on the first records before the rest of the file has been read. read_syntax_tree_xml()
+loads a whole syntax tree into a SyntaxTreeArena in the same single pass.
+===========================================================================================
+'''
+
+
+def iter_records(xml_file, *tags):
+    """
+    Yields every element with one of the given tags once it is complete. Everything outside
+    those records (including other elements, e.g. inner nodes) is cleared as soon as it ends.
+    """
+    open_elements = []
+    in_record = 0
+    for event, elem in ET.iterparse(xml_file, events=('start', 'end')):
+        if event == 'start':
+            open_elements.append(elem)
+            if elem.tag in tags:
+                in_record += 1
+            continue
+        open_elements.pop()
+        if elem.tag in tags:
+            yield elem
+            in_record -= 1
+        if not in_record and open_elements:
+            open_elements[-1].clear()  # Drops this element and any processed siblings
+
+
+def iter_token_stream_xml(xml_file):
+    """
+    Yields a Token for every TOK in a token stream XML file (see write_token_stream_xml).
+    Words are interned in token order, so they get the word IDs the lexer gave them.
+    """
+    interner = Interner()
+    for tok in iter_records(xml_file, 'TOK'):
+        word_id = interner.intern(tok.find('WORD').text or '')
+        yield Token(tok.find('CLASS').text, interner.strings[word_id],
+                    int(tok.find('LINE').text), int(tok.find('COL').text), word_id)
+
+
+def iter_syntax_tree_leaves_xml(xml_file):
+    """
+    Yields (unid, token class, word) for every LEAF in a syntax tree XML file, in document
+    order, like SyntaxTreeReader.leaves() does for the binary format.
+    """
+    for leaf in iter_records(xml_file, 'LEAF'):
+        terminal = leaf.find('TERMINAL')
+        yield int(leaf.find('UNID').text), terminal.find('CLASS').text, terminal.find('WORD').text or ''
+
+
+def read_syntax_tree_xml(xml_file):
+    """
+    Loads a syntax tree XML file into a SyntaxTreeArena with the UNIDs of the file, in one
+    streaming pass. The arena's tokens are the leaf tokens in UNID order, with their words
+    interned in that (document) order.
+    """
+    interner = Interner()
+    symbol_ids = {}
+    symbol_names = []
+    symbols = {}  # UNID -> symbol ID
+    children = {}  # Inner node UNID -> child UNIDs
+    token_indices = {}  # Leaf UNID -> index into tokens
+    tokens = []
+    root = NO_NODE
+
+    def symbol_id(name):
+        if name not in symbol_ids:
+            symbol_ids[name] = len(symbol_names)
+            symbol_names.append(name)
+        return symbol_ids[name]
+
+    for record in iter_records(xml_file, 'ROOT', 'IN', 'LEAF'):
+        unid = int(record.find('UNID').text)
+        if record.tag == 'ROOT':
+            root = unid
+        elif record.tag == 'IN':
+            symbols[unid] = symbol_id(record.find('SYMB').text)
+            children[unid] = [int(child.text) for child in record.iter('ID')]
+        else:
+            terminal = record.find('TERMINAL')
+            token_class = terminal.find('CLASS').text
+            symbols[unid] = symbol_id(token_class)
+            token_indices[unid] = len(tokens)
+            word_id = interner.intern(terminal.find('WORD').text or '')
+            tokens.append(Token(token_class, interner.strings[word_id],
+                                int(terminal.find('LINE').text), int(terminal.find('COL').text), word_id))
+
+    tree = SyntaxTreeArena(symbol_names, tokens)
+    n_nodes = max(symbols) + 1 if symbols else 0
+    tree.symbol = array('i', [symbols.get(unid, 0) for unid in range(n_nodes)])
+    tree.token = array('i', [token_indices.get(unid, NO_NODE) for unid in range(n_nodes)])
+    tree.parent = array('i', [NO_NODE]) * n_nodes
+    tree.first_child = array('i', [NO_NODE]) * n_nodes
+    tree.next_sibling = array('i', [NO_NODE]) * n_nodes
+    for unid, child_unids in children.items():
+        for previous, child in zip([NO_NODE] + child_unids, child_unids):
+            tree.parent[child] = unid
+            if previous == NO_NODE:
+                tree.first_child[unid] = child
+            else:
+                tree.next_sibling[previous] = child
+    tree.root = root
+    return tree
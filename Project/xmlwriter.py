@@ -0,0 +1,137 @@
+from syntaxtree import NO_NODE
+
+'''
+===========================================================================================
+Streaming XML writers for the token stream and the syntax tree.
+
+Both writers emit indented XML straight to a buffered file while walking the data, instead
+of building an ElementTree (and for the syntax tree, a second minidom copy) in memory. The
+output is byte-for-byte what the previous ElementTree/minidom based writers produced.
+===========================================================================================
+'''
+
+WRITE_BUFFER_SIZE = 1 << 20
+
+
+def escape_text(text):
+    """
+    Escapes element text the way ElementTree does (&, <, >).
+    """
+    if '&' in text:
+        text = text.replace('&', '&amp;')
+    if '<' in text:
+        text = text.replace('<', '&lt;')
+    if '>' in text:
+        text = text.replace('>', '&gt;')
+    return text
+
+
+def escape_dom_text(text):
+    """
+    Escapes element text the way xml.dom.minidom does (&, <, ", >).
+    """
+    text = escape_text(text)
+    if '"' in text:
+        text = text.replace('"', '&quot;')
+    return text
+
+
+'''
+------------------------------------------------------------------------------------------
+'''
+def write_token_stream_xml(tokens, output_path):
+    """
+    Writes the token stream XML (TOKENSTREAM/TOK elements) for the list of tokens.
+    """
+    with open(output_path, 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE) as f:
+        write = f.write
+        write("<?xml version='1.0' encoding='utf-8'?>\n")
+        if not tokens:
+            write("<TOKENSTREAM />")
+            return
+        write("<TOKENSTREAM>\n  ")
+        for i, token in enumerate(tokens, start=1):
+            write(f"<TOK>\n    <ID>{i}</ID><CLASS>{escape_text(token.type)}</CLASS>"
+                  f"<WORD>{escape_text(token.value)}</WORD><LINE>{token.line_num}</LINE>"
+                  f"<COL>{token.col_num}</COL></TOK>\n  ")
+        write("</TOKENSTREAM>\n")
+
+
+def write_syntax_tree_xml(tree, output_path):
+    """
+    Writes the syntax tree XML (SYNTREE with ROOT, INNERNODES and LEAFNODES) for a
+    SyntaxTreeArena, walking the node arrays in UNID order.
+    """
+    symbol = tree.symbol
+    symbol_names = tree.symbol_names
+    parent = tree.parent
+    first_child = tree.first_child
+    next_sibling = tree.next_sibling
+    token = tree.token
+    tokens = tree.tokens
+
+    with open(output_path, 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE) as f:
+        write = f.write
+
+        def write_children(unid, indent):
+            child = first_child[unid]
+            if child == NO_NODE:
+                write(f"{indent}<CHILDREN/>\n")
+                return
+            write(f"{indent}<CHILDREN>\n")
+            while child != NO_NODE:
+                write(f"{indent}    <ID>{child}</ID>\n")
+                child = next_sibling[child]
+            write(f"{indent}</CHILDREN>\n")
+
+        write('<?xml version="1.0" ?>\n<SYNTREE>\n')
+
+        # Root node
+        root = tree.root
+        write(f"    <ROOT>\n        <UNID>{root}</UNID>\n"
+              f"        <SYMB>{escape_dom_text(symbol_names[symbol[root]])}</SYMB>\n")
+        write_children(root, "        ")
+        write("    </ROOT>\n")
+
+        # Inner nodes
+        inner_written = False
+        for unid in range(len(token)):
+            if token[unid] != NO_NODE:
+                continue
+            if not inner_written:
+                write("    <INNERNODES>\n")
+                inner_written = True
+            parent_unid = parent[unid]
+            write(f"        <IN>\n"
+                  f"            <PARENT>{parent_unid if parent_unid != NO_NODE else 'None'}</PARENT>\n"
+                  f"            <UNID>{unid}</UNID>\n"
+                  f"            <SYMB>{escape_dom_text(symbol_names[symbol[unid]])}</SYMB>\n")
+            write_children(unid, "            ")
+            write("        </IN>\n")
+        write("    </INNERNODES>\n" if inner_written else "    <INNERNODES/>\n")
+
+        # Leaf nodes
+        leaf_written = False
+        for unid in range(len(token)):
+            if token[unid] == NO_NODE:
+                continue
+            if not leaf_written:
+                write("    <LEAFNODES>\n")
+                leaf_written = True
+            parent_unid = parent[unid]
+            terminal = tokens[token[unid]]
+            token_class = escape_dom_text(terminal.type)
+            write(f"        <LEAF>\n"
+                  f"            <PARENT>{parent_unid if parent_unid != NO_NODE else 'None'}</PARENT>\n"
+                  f"            <UNID>{unid}</UNID>\n"
+                  f"            <TERMINAL>\n"
+                  f"                <ID>{token_class}</ID>\n"
+                  f"                <CLASS>{token_class}</CLASS>\n"
+                  f"                <WORD>{escape_dom_text(terminal.value)}</WORD>\n"
+                  f"                <LINE>{terminal.line_num}</LINE>\n"
+                  f"                <COL>{terminal.col_num}</COL>\n"
+                  f"            </TERMINAL>\n"
+                  f"        </LEAF>\n")
+        write("    </LEAFNODES>\n" if leaf_written else "    <LEAFNODES/>\n")
+
+        write("</SYNTREE>\n")